@@ -0,0 +1,59 @@
+"""
+Microbenchmark del costo de autenticación por request para un cliente que
+reutiliza el mismo token en miles de llamadas.
+
+    python -m benchmarks.auth_benchmark --calls 20000
+
+"before" decodifica y verifica la firma en cada llamada (lo que hacían
+validateuser/validate_token), "after" usa decode_token con la caché de claims.
+"""
+import argparse
+import json
+import os
+import time
+
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-benchmark-secret-key")
+
+import jwt
+
+from utils.security import SECRET_KEY, create_jwt_token, decode_token
+
+
+def _decode_every_time(token: str) -> dict:
+    payload = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
+    if payload.get("email") is None or not payload.get("active"):
+        raise ValueError("invalid token")
+    return payload
+
+
+def _measure(fn, token: str, calls: int) -> dict:
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn(token)
+    elapsed = time.perf_counter() - start
+    return {
+        "calls": calls,
+        "total_ms": round(elapsed * 1000, 3),
+        "per_call_us": round(elapsed / calls * 1_000_000, 3),
+    }
+
+
+def run(calls: int) -> dict:
+    token = create_jwt_token("Benchmark User", "bench@example.com", True, False, "64b7f2e4a1c2b3d4e5f67890")
+
+    before = _measure(_decode_every_time, token, calls)
+    after = _measure(decode_token, token, calls)
+
+    return {
+        "before": before,
+        "after": after,
+        "speedup": round(before["per_call_us"] / after["per_call_us"], 2),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compara jwt.decode por request contra la caché de decode_token")
+    parser.add_argument("--calls", type=int, default=10000)
+    args = parser.parse_args()
+
+    print(json.dumps(run(args.calls), indent=2))
@@ -0,0 +1,34 @@
+"""
+Servidor local que imita el endpoint signInWithPassword de Identity Toolkit,
+para probar el login sin salir a internet.
+
+    uvicorn benchmarks.fake_identity_toolkit:app --port 9099
+    FIREBASE_AUTH_URL=http://127.0.0.1:9099 uvicorn main:app
+
+FAKE_AUTH_LATENCY_MS simula la latencia del servicio real.
+"""
+import os
+import asyncio
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+LATENCY = float(os.getenv("FAKE_AUTH_LATENCY_MS", "0")) / 1000
+
+app = FastAPI()
+
+
+@app.post("/v1/accounts:signInWithPassword")
+async def sign_in_with_password(request: Request):
+    body = await request.json()
+    if LATENCY:
+        await asyncio.sleep(LATENCY)
+
+    if not body.get("email") or not body.get("password"):
+        return JSONResponse(status_code=400, content={"error": {"message": "INVALID_LOGIN_CREDENTIALS"}})
+
+    return {
+        "kind": "identitytoolkit#VerifyPasswordResponse",
+        "email": body["email"],
+        "idToken": "fake-id-token",
+        "registered": True,
+    }
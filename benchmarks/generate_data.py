@@ -0,0 +1,318 @@
+"""
+Generador de datos sintéticos de tableros (usuarios, workspaces, listas y tareas).
+
+    # directo a MongoDB con insert_many en paralelo
+    python -m benchmarks.generate_data --tasks 2000000 --mongo-uri mongodb://127.0.0.1:27017 --db trello_big --drop
+
+    # dump para mongorestore (out/<db>/<colección>.bson) o NDJSON para mongoimport
+    python -m benchmarks.generate_data --tasks 2000000 --format bson --out dump
+    mongorestore dump
+
+Distribución: --huge-boards tableros se llevan --huge-share de las tareas y el resto
+se reparte en la cola larga con pesos Zipf (--skew, 0 = uniforme).
+
+Los documentos cumplen los validadores de models/ (regex de títulos y nombres,
+longitudes); --validate revisa una muestra con los modelos de pydantic antes de escribir.
+Después de cargar conviene crear los índices: python -m utils.indexes
+"""
+import os
+import sys
+import time
+import random
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+from bson import ObjectId, encode
+from bson import json_util
+
+from utils.rank import spread_ranks
+
+WORDS = (
+    "plan review deploy write test design fix update report call meeting budget client "
+    "backend frontend release sprint docs audit migrate refactor invoice draft launch "
+    "email onboarding research survey roadmap security backup monitor cleanup hiring"
+).split()
+
+COLLECTIONS = ("users", "workspaces", "lists", "tasks")
+
+
+def letters(n: int) -> str:
+    """0 -> A, 25 -> Z, 26 -> BA ... (los nombres de usuario solo aceptan letras)"""
+    out = ""
+    while True:
+        out = chr(65 + n % 26) + out
+        n //= 26
+        if n == 0:
+            return out
+
+
+def sentence(rng: random.Random, low: int, high: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(low, high)))
+
+
+def zipf_sizes(total: int, buckets: int, skew: float, rng: random.Random) -> list:
+    """Reparte total elementos en buckets con pesos 1/k^skew, barajados"""
+    if buckets <= 0:
+        return []
+    weights = [1 / (k + 1) ** skew for k in range(buckets)]
+    scale = total / sum(weights)
+    sizes = [int(w * scale) for w in weights]
+    for i in range(total - sum(sizes)):
+        sizes[i % buckets] += 1
+    rng.shuffle(sizes)
+    return sizes
+
+
+def board_sizes(tasks: int, workspaces: int, skew: float, huge_boards: int, huge_share: float,
+                rng: random.Random) -> list:
+    huge_boards = min(huge_boards, workspaces)
+    huge_total = int(tasks * huge_share) if huge_boards else 0
+    huge = zipf_sizes(huge_total, huge_boards, 0, rng)
+    tail = zipf_sizes(tasks - huge_total, workspaces - huge_boards, skew, rng)
+    if not tail and huge:
+        huge[0] += tasks - huge_total
+    return huge + tail
+
+
+#------------------------------------------------------------------------------------
+
+class Generator:
+    """
+    Produce los documentos por lotes sin tenerlos todos en memoria.
+    Las descripciones salen de un pool pre-generado para no gastar CPU en random por tarea
+    """
+
+    def __init__(self, args):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.descriptions = [sentence(self.rng, 5, 60)[:500] for _ in range(2000)]
+
+    def users(self) -> list:
+        return [
+            {
+                "_id": ObjectId(),
+                "name": f"Test User {letters(i)}",
+                "email": f"user{i}@example.com",
+                "active": True,
+                "admin": i == 0,
+            }
+            for i in range(self.args.users)
+        ]
+
+    def workspaces(self, users: list) -> list:
+        owners = zipf_sizes(self.args.workspaces, len(users), self.args.skew, self.rng)
+        docs, number = [], 0
+        for user, count in zip(users, owners):
+            for _ in range(count):
+                docs.append({
+                    "_id": ObjectId(),
+                    "name": f"Workspace {number}",
+                    "description": self.rng.choice(self.descriptions),
+                    "id_user": str(user["_id"]),
+                    "version": 0,
+                })
+                number += 1
+        return docs
+
+    def lists(self, workspace: dict) -> list:
+        count = self.rng.randint(self.args.min_lists, self.args.max_lists)
+        workspace_id = str(workspace["_id"])
+        return [
+            {
+                "_id": ObjectId(),
+                "title": f"List {j}",
+                "description": "",
+                "id_workspace": workspace_id,
+                "rank": rank,
+            }
+            for j, rank in enumerate(spread_ranks(count))
+        ]
+
+    def tasks(self, workspace_lists: list, size: int, first_number: int):
+        """Genera las tareas de un workspace, repartidas al azar entre sus listas"""
+        per_list = [0] * len(workspace_lists)
+        for _ in range(size):
+            per_list[self.rng.randrange(len(workspace_lists))] += 1
+
+        number = first_number
+        descriptions = self.descriptions
+        choice = self.rng.choice
+        for list_doc, count in zip(workspace_lists, per_list):
+            id_list = str(list_doc["_id"])
+            for rank in spread_ranks(count):
+                yield {
+                    "_id": ObjectId(),
+                    "title": f"Task {number}",
+                    "title_terms": ["task", str(number)],
+                    "description": choice(descriptions),
+                    "id_list": id_list,
+                    "id_list_obj": list_doc["_id"],
+                    "id_workspace": list_doc["id_workspace"],
+                    "rank": rank,
+                }
+                number += 1
+
+
+#------------------------------------------------------------------------------------
+
+class MongoWriter:
+    """insert_many por lotes en varios hilos; pymongo suelta el GIL mientras espera la red"""
+
+    def __init__(self, uri: str, db_name: str, workers: int, drop: bool):
+        from pymongo import MongoClient
+        self.client = MongoClient(uri, maxPoolSize=workers + 1)
+        if drop:
+            self.client.drop_database(db_name)
+        self.db = self.client[db_name]
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+        self.pending = []
+        self.max_pending = workers * 2
+
+    def write(self, collection: str, docs: list):
+        self.pending.append(self.pool.submit(self.db[collection].insert_many, docs, ordered=False))
+        if len(self.pending) >= self.max_pending:
+            self.pending.pop(0).result()
+
+    def close(self):
+        for future in self.pending:
+            future.result()
+        self.pool.shutdown()
+        self.client.close()
+
+
+class FileWriter:
+    """out/<db>/<colección>.bson para mongorestore, o .json (NDJSON) para mongoimport"""
+
+    def __init__(self, out: str, db_name: str, fmt: str):
+        directory = os.path.join(out, db_name)
+        os.makedirs(directory, exist_ok=True)
+        self.fmt = fmt
+        mode = "wb" if fmt == "bson" else "w"
+        self.files = {
+            name: open(os.path.join(directory, f"{name}.{fmt}"), mode)
+            for name in COLLECTIONS
+        }
+
+    def write(self, collection: str, docs: list):
+        f = self.files[collection]
+        if self.fmt == "bson":
+            f.write(b"".join(encode(doc) for doc in docs))
+        else:
+            f.write("".join(json_util.dumps(doc) + "\n" for doc in docs))
+
+    def close(self):
+        for f in self.files.values():
+            f.close()
+
+
+#------------------------------------------------------------------------------------
+
+def validate_sample(users: list, workspaces: list, lists: list, tasks: list):
+    from models.users import User
+    from models.workspaces import Workspace
+    from models.lists import List
+    from models.tasks import Task
+
+    for doc in users[:100]:
+        User(name=doc["name"], email=doc["email"], password="Sample1!pass")
+    for doc in workspaces[:100]:
+        Workspace(name=doc["name"], description=doc["description"])
+    for doc in lists[:100]:
+        List(title=doc["title"], description=doc["description"])
+    for doc in tasks[:100]:
+        Task(title=doc["title"], description=doc["description"])
+
+
+def generate(args, writer) -> dict:
+    start = time.perf_counter()
+    generator = Generator(args)
+
+    users = generator.users()
+    workspaces = generator.workspaces(users)
+    if args.validate:
+        validate_sample(users, workspaces, [], [])
+    writer.write("users", users)
+    writer.write("workspaces", workspaces)
+
+    sizes = board_sizes(args.tasks, len(workspaces), args.skew, args.huge_boards, args.huge_share, generator.rng)
+    counts = {"users": len(users), "workspaces": len(workspaces), "lists": 0, "tasks": 0}
+    buffers = {"lists": [], "tasks": []}
+    validated = not args.validate
+    next_report = args.progress
+
+    def flush(collection: str):
+        nonlocal validated
+        docs = buffers[collection]
+        if not docs:
+            return
+        if not validated and collection == "tasks":
+            validate_sample([], [], [], docs)
+            validated = True
+        writer.write(collection, docs)
+        counts[collection] += len(docs)
+        buffers[collection] = []
+
+    number = 0
+    for workspace, size in zip(workspaces, sizes):
+        workspace_lists = generator.lists(workspace)
+        if args.validate and not counts["lists"]:
+            validate_sample([], [], workspace_lists, [])
+        buffers["lists"].extend(workspace_lists)
+        if len(buffers["lists"]) >= args.batch_size:
+            flush("lists")
+
+        for task in generator.tasks(workspace_lists, size, number):
+            buffers["tasks"].append(task)
+            if len(buffers["tasks"]) >= args.batch_size:
+                flush("tasks")
+        number += size
+
+        if args.progress and counts["tasks"] >= next_report:
+            elapsed = time.perf_counter() - start
+            print(f"{counts['tasks']} tasks, {counts['tasks'] / elapsed:.0f}/s", file=sys.stderr)
+            next_report += args.progress
+
+    flush("lists")
+    flush("tasks")
+    writer.close()
+
+    counts["largest_board_tasks"] = max(sizes) if sizes else 0
+    counts["seconds"] = round(time.perf_counter() - start, 2)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera tableros sintéticos a gran escala")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--workspaces", type=int, default=5000)
+    parser.add_argument("--tasks", type=int, default=1000000)
+    parser.add_argument("--min-lists", type=int, default=3)
+    parser.add_argument("--max-lists", type=int, default=8)
+    parser.add_argument("--skew", type=float, default=1.1, help="Exponente Zipf de la cola larga (0 = uniforme)")
+    parser.add_argument("--huge-boards", type=int, default=3, help="Tableros enormes")
+    parser.add_argument("--huge-share", type=float, default=0.3, help="Fracción de las tareas en los tableros enormes")
+    parser.add_argument("--format", choices=("mongo", "bson", "json"), default="mongo")
+    parser.add_argument("--mongo-uri", default="mongodb://127.0.0.1:27017")
+    parser.add_argument("--db", default="trello_synthetic")
+    parser.add_argument("--drop", action="store_true", help="Borra la base antes de insertar")
+    parser.add_argument("--out", default="dump", help="Directorio de salida para bson/json")
+    parser.add_argument("--batch-size", type=int, default=10000)
+    parser.add_argument("--workers", type=int, default=4, help="Hilos de insert_many")
+    parser.add_argument("--validate", action="store_true", help="Valida una muestra con los modelos de pydantic")
+    parser.add_argument("--progress", type=int, default=250000, help="Reporta avance cada N tareas (0 = nunca)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    if args.min_lists < 1 or args.max_lists < args.min_lists:
+        parser.error("--min-lists must be >= 1 and <= --max-lists")
+
+    if args.format == "mongo":
+        writer = MongoWriter(args.mongo_uri, args.db, args.workers, args.drop)
+    else:
+        writer = FileWriter(args.out, args.db, args.format)
+
+    print(json_util.dumps(generate(args, writer), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,423 @@
+"""
+Benchmark de carga de punta a punta contra un mongod local.
+
+    python -m benchmarks.load_benchmark --workspaces 50 --tasks 20000 --output bench.json
+
+1. Siembra usuarios, workspaces, listas y tareas en --db (la base se borra antes).
+   El número de tareas por workspace sigue una distribución Zipf (--skew): pocos
+   tableros enormes y una cola larga de tableros chicos, como en producción.
+2. Levanta `uvicorn main:app` y el fake de Identity Toolkit (para /login) apuntando
+   a esa base. Con --base-url se usa un servidor ya levantado.
+3. Recorre cada ruta de routes/ (y /login, /ready) con --concurrency requests en
+   paralelo, usando JWTs de create_jwt_token del dueño de cada workspace.
+4. Escribe throughput y p50/p95/p99 por endpoint en JSON para comparar entre commits.
+
+No se incluyen POST /users (crea usuarios reales en Firebase) ni el stream SSE
+de /events, que no es un request/respuesta.
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import platform
+import subprocess
+from datetime import datetime, timezone
+
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-benchmark-secret-key")
+
+import httpx
+from pymongo import MongoClient
+
+from utils.rank import spread_ranks
+from utils.security import create_jwt_token
+from benchmarks.generate_data import letters, sentence, zipf_sizes
+
+#------------------------------------------------------------------------------------
+
+def seed(uri: str, db_name: str, users: int, workspaces: int, lists_per_workspace: int,
+         tasks: int, skew: float, rng: random.Random, batch_size: int = 5000) -> dict:
+    db = MongoClient(uri)[db_name]
+    db.client.drop_database(db_name)
+    start = time.perf_counter()
+
+    user_docs = [
+        {"name": f"Bench User {letters(i)}", "email": f"bench{i}@example.com", "active": True, "admin": i == 0}
+        for i in range(users)
+    ]
+    db["users"].insert_many(user_docs)
+
+    workspace_docs = [
+        {
+            "name": f"Workspace {i}",
+            "description": sentence(rng, 3, 12),
+            "id_user": str(user_docs[i % users]["_id"]),
+            "version": 0,
+        }
+        for i in range(workspaces)
+    ]
+    db["workspaces"].insert_many(workspace_docs)
+
+    list_docs = []
+    for workspace in workspace_docs:
+        ranks = spread_ranks(lists_per_workspace)
+        for j in range(lists_per_workspace):
+            list_docs.append({
+                "title": f"List {j}",
+                "description": sentence(rng, 0, 8),
+                "id_workspace": str(workspace["_id"]),
+                "rank": ranks[j],
+            })
+    db["lists"].insert_many(list_docs)
+
+    lists_by_workspace = {}
+    for list_doc in list_docs:
+        lists_by_workspace.setdefault(list_doc["id_workspace"], []).append(list_doc)
+
+    sizes = zipf_sizes(tasks, workspaces, skew, rng)
+    batch, number = [], 0
+    for workspace, size in zip(workspace_docs, sizes):
+        workspace_id = str(workspace["_id"])
+        workspace_lists = lists_by_workspace[workspace_id]
+        per_list = [0] * len(workspace_lists)
+        for _ in range(size):
+            per_list[rng.randrange(len(workspace_lists))] += 1
+        for list_doc, count in zip(workspace_lists, per_list):
+            for rank in spread_ranks(count):
+                batch.append({
+                    "title": f"Task {number}",
+                    "title_terms": ["task", str(number)],
+                    "description": sentence(rng, 5, 60)[:500],
+                    "id_list": str(list_doc["_id"]),
+                    "id_list_obj": list_doc["_id"],
+                    "id_workspace": workspace_id,
+                    "rank": rank,
+                })
+                number += 1
+                if len(batch) >= batch_size:
+                    db["tasks"].insert_many(batch, ordered=False)
+                    batch = []
+    if batch:
+        db["tasks"].insert_many(batch, ordered=False)
+
+    return {
+        "users": users,
+        "workspaces": workspaces,
+        "lists": len(list_docs),
+        "tasks": tasks,
+        "skew": skew,
+        "largest_workspace_tasks": max(sizes) if sizes else 0,
+        "seconds": round(time.perf_counter() - start, 2),
+        "_user_docs": user_docs,
+        "_workspace_docs": workspace_docs,
+        "_lists_by_workspace": lists_by_workspace,
+        "_sizes": sizes,
+    }
+
+
+def sample_tasks(uri: str, db_name: str, per_workspace: int = 20) -> dict:
+    """Algunos ids de tareas por workspace para las lecturas por id"""
+    db = MongoClient(uri)[db_name]
+    cursor = db["tasks"].aggregate([
+        {"$group": {"_id": "$id_workspace", "ids": {"$firstN": {"input": "$_id", "n": per_workspace}}}},
+    ])
+    return {doc["_id"]: [str(i) for i in doc["ids"]] for doc in cursor}
+
+
+#------------------------------------------------------------------------------------
+
+class Scenario:
+    """
+    Un endpoint a medir. build(i) regresa (method, path, kwargs de httpx) para la
+    iteración i; on_response permite guardar ids creados para escenarios posteriores
+    """
+
+    def __init__(self, name: str, build, requests: int, on_response=None):
+        self.name = name
+        self.build = build
+        self.requests = requests
+        self.on_response = on_response
+
+
+def _percentile(sorted_values: list, q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+async def run_scenario(client: httpx.AsyncClient, scenario: Scenario, concurrency: int) -> dict:
+    latencies, statuses = [], {}
+    counter = iter(range(scenario.requests))
+
+    async def worker():
+        for i in counter:
+            method, path, kwargs = scenario.build(i)
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, path, **kwargs)
+                status = response.status_code
+            except httpx.HTTPError as e:
+                response, status = None, type(e).__name__
+            latencies.append(time.perf_counter() - start)
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+            if scenario.on_response and response is not None and response.status_code < 400:
+                scenario.on_response(i, response.json())
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    errors = sum(count for status, count in statuses.items() if not status.isdigit() or int(status) >= 400)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "status": statuses,
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(_percentile(latencies, 0.50) * 1000, 3),
+        "p95_ms": round(_percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(_percentile(latencies, 0.99) * 1000, 3),
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0,
+    }
+
+
+def build_scenarios(dataset: dict, task_ids: dict, requests: int, rng: random.Random) -> list:
+    users = dataset["_user_docs"]
+    workspaces = [str(w["_id"]) for w in dataset["_workspace_docs"]]
+    owner = {str(w["_id"]): w["id_user"] for w in dataset["_workspace_docs"]}
+    lists = {ws: [str(l["_id"]) for l in docs] for ws, docs in dataset["_lists_by_workspace"].items()}
+    hot = workspaces[max(range(len(workspaces)), key=lambda i: dataset["_sizes"][i])]
+
+    tokens = {
+        str(u["_id"]): create_jwt_token(u["name"], u["email"], True, u["admin"], str(u["_id"]))
+        for u in users
+    }
+    token_by_workspace = {ws: tokens[owner[ws]] for ws in workspaces}
+
+    def auth(ws: str) -> dict:
+        return {"Authorization": f"Bearer {token_by_workspace[ws]}"}
+
+    def any_ws() -> str:
+        return rng.choice(workspaces)
+
+    def get(path_fn, ws_fn=any_ws):
+        def build(i):
+            ws = ws_fn()
+            return "GET", path_fn(ws), {"headers": auth(ws)}
+        return build
+
+    created = {"workspaces": [], "lists": [], "tasks": []}
+    run_id = letters(rng.randrange(26 ** 6))
+
+    def remember(kind: str, ws_of=None):
+        def on_response(i, body):
+            data = body.get("data") or {}
+            items = data if isinstance(data, list) else [data]
+            for item in items:
+                if isinstance(item, dict) and item.get("id"):
+                    created[kind].append((ws_of(i) if ws_of else item.get("id_workspace"), item["id"]))
+        return on_response
+
+    # Las escrituras se reparten entre workspaces fijos para poder asociar lo creado
+    write_ws = [workspaces[i % len(workspaces)] for i in range(requests)]
+
+    def created_at(kind: str, i: int) -> tuple:
+        items = created[kind]
+        return items[i % len(items)] if items else (write_ws[i], "000000000000000000000000")
+
+    def other_list(ws: str, list_id: str) -> str:
+        choices = [l for l in lists.get(ws, []) if l != list_id]
+        return rng.choice(choices) if choices else list_id
+
+    first_user = str(users[0]["_id"])
+
+    scenarios = [
+        Scenario("GET /ready", lambda i: ("GET", "/ready", {}), requests),
+        Scenario("POST /login", lambda i: ("POST", "/login", {"json": {
+            "email": users[i % len(users)]["email"], "password": "Benchmark1!"}}), requests),
+        Scenario("GET /workspaces", lambda i: ("GET", "/workspaces", {
+            "headers": {"Authorization": f"Bearer {tokens[owner[any_ws()]]}"}}), requests),
+        Scenario("GET /workspaces{workspace_id}", get(lambda ws: f"/workspaces{ws}"), requests),
+        Scenario("GET /workspaces/{workspace_id}/board", get(lambda ws: f"/workspaces/{ws}/board"), requests),
+        Scenario("GET /workspaces/{workspace_id}/board [hot]", get(lambda ws: f"/workspaces/{ws}/board", lambda: hot), requests),
+        Scenario("GET /workspaces/{workspace_id}/lists", get(lambda ws: f"/workspaces/{ws}/lists"), requests),
+        Scenario("GET /workspaces/{workspace_id}/lists/{list_id}",
+                 get(lambda ws: f"/workspaces/{ws}/lists/{rng.choice(lists[ws])}"), requests),
+        Scenario("GET /workspaces/{workspace_id}/tasks", get(lambda ws: f"/workspaces/{ws}/tasks"), requests),
+        Scenario("GET /workspaces/{workspace_id}/tasks [hot]", get(lambda ws: f"/workspaces/{ws}/tasks", lambda: hot), requests),
+        Scenario("GET /workspaces/{workspace_id}/tasks?limit=100 [hot]",
+                 get(lambda ws: f"/workspaces/{ws}/tasks?limit=100", lambda: hot), requests),
+        Scenario("GET /workspaces/{workspace_id}/search?q=deploy [hot]",
+                 get(lambda ws: f"/workspaces/{ws}/search?q=deploy&prefix=false", lambda: hot), requests),
+        Scenario("GET /workspaces/{workspace_id}/search?q=ta [hot]",
+                 get(lambda ws: f"/workspaces/{ws}/search?q=ta", lambda: hot), requests),
+        Scenario("GET /workspaces/{workspace_id}/tasks/{task_id}",
+                 get(lambda ws: f"/workspaces/{ws}/tasks/{rng.choice(task_ids.get(ws) or ['000000000000000000000000'])}"),
+                 requests),
+
+        Scenario("POST /workspaces", lambda i: ("POST", "/workspaces", {
+            "headers": {"Authorization": f"Bearer {tokens[first_user]}"},
+            "json": {"name": f"Bench {run_id} {i}", "description": "benchmark"}}),
+            requests, remember("workspaces", lambda i: None)),
+        Scenario("POST /workspaces/{workspace_id}/lists", lambda i: ("POST", f"/workspaces/{write_ws[i]}/lists", {
+            "headers": auth(write_ws[i]), "json": {"title": f"Bench {run_id} {i}"}}),
+            requests, remember("lists", lambda i: write_ws[i])),
+        Scenario("POST /workspaces/{workspace_id}/lists/{list_id}/tasks", lambda i: (
+            "POST", f"/workspaces/{write_ws[i]}/lists/{lists[write_ws[i]][0]}/tasks", {
+                "headers": auth(write_ws[i]),
+                "json": {"title": f"Bench {run_id} {i}", "description": sentence(rng, 5, 40)}}),
+            requests, remember("tasks", lambda i: write_ws[i])),
+        Scenario("POST /workspaces/{workspace_id}/lists/{list_id}/tasks:batch", lambda i: (
+            "POST", f"/workspaces/{write_ws[i]}/lists/{lists[write_ws[i]][0]}/tasks:batch", {
+                "headers": auth(write_ws[i]),
+                "json": {"tasks": [{"title": f"Bench {run_id} batch {i} {k}"} for k in range(10)]}}),
+            max(1, requests // 10)),
+        Scenario("PUT /workspaces/{workspace_id}/tasks/{id_task}", lambda i: (
+            lambda ws, task_id: ("PUT", f"/workspaces/{ws}/tasks/{task_id}", {
+                "headers": auth(ws),
+                "json": {"title": f"Bench {run_id} {i} edited", "description": sentence(rng, 5, 40)}})
+        )(*created_at("tasks", i)), requests),
+        Scenario("PUT /workspaces/{workspace_id}/tasks/{task_id}/move", lambda i: (
+            lambda ws, task_id: ("PUT", f"/workspaces/{ws}/tasks/{task_id}/move", {
+                "headers": auth(ws),
+                "params": {"new_list_id": other_list(ws, lists[ws][0])}})
+        )(*created_at("tasks", i)), requests),
+        Scenario("POST /workspaces/{workspace_id}/tasks:move", lambda i: (
+            lambda ws, task_id: ("POST", f"/workspaces/{ws}/tasks:move", {
+                "headers": auth(ws),
+                "json": {"task_ids": [task_id], "new_list_id": lists[ws][0]}})
+        )(*created_at("tasks", i)), requests),
+        Scenario("PUT /workspaces/{workspace_id}/lists/{list_id}", lambda i: (
+            lambda ws, list_id: ("PUT", f"/workspaces/{ws}/lists/{list_id}", {
+                "headers": auth(ws), "json": {"title": f"Bench {run_id} {i} edited"}})
+        )(*created_at("lists", i)), requests),
+        Scenario("PUT /workspaces/{workspace_id}/lists/{list_id}/move", lambda i: (
+            lambda ws, list_id: ("PUT", f"/workspaces/{ws}/lists/{list_id}/move", {
+                "headers": auth(ws), "params": {"next_list_id": lists[ws][0]}})
+        )(*created_at("lists", i)), requests),
+        Scenario("PUT /workspaces{workspace_id}", lambda i: (
+            lambda _, ws: ("PUT", f"/workspaces{ws}", {
+                "headers": {"Authorization": f"Bearer {tokens[first_user]}"},
+                "json": {"name": f"Bench {run_id} {i} edited", "description": f"benchmark {i}"}})
+        )(*created_at("workspaces", i)), requests),
+        Scenario("DELETE /workspaces/{workspace_id}/tasks/{task_id}", lambda i: (
+            lambda ws, task_id: ("DELETE", f"/workspaces/{ws}/tasks/{task_id}", {"headers": auth(ws)})
+        )(*created_at("tasks", i)), requests),
+        Scenario("DELETE /workspaces/{workspace_id}/lists/{list_id}", lambda i: (
+            lambda ws, list_id: ("DELETE", f"/workspaces/{ws}/lists/{list_id}", {"headers": auth(ws)})
+        )(*created_at("lists", i)), requests),
+        Scenario("DELETE /workspaces{workspace_id}", lambda i: (
+            lambda _, ws: ("DELETE", f"/workspaces{ws}", {
+                "headers": {"Authorization": f"Bearer {tokens[first_user]}"}})
+        )(*created_at("workspaces", i)), requests),
+    ]
+    return scenarios
+
+
+#------------------------------------------------------------------------------------
+
+def _wait_until_up(url: str, timeout: float = 60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(url, timeout=1).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.25)
+    raise RuntimeError(f"{url} did not come up in {timeout}s")
+
+
+def start_servers(args) -> list:
+    env = {
+        **os.environ,
+        "MONGODB_URI": args.mongo_uri,
+        "DATABASE_NAME": args.db,
+        "MONGODB_TLS": "false",
+        "FIREBASE_AUTH_URL": f"http://127.0.0.1:{args.port + 1}",
+        "FIREBASE_API_KEY": "benchmark",
+    }
+    processes = [
+        subprocess.Popen([sys.executable, "-m", "uvicorn", "benchmarks.fake_identity_toolkit:app",
+                          "--port", str(args.port + 1), "--log-level", "warning"], env=env),
+        subprocess.Popen([sys.executable, "-m", "uvicorn", "main:app",
+                          "--port", str(args.port), "--log-level", "warning"], env=env),
+    ]
+    _wait_until_up(f"http://127.0.0.1:{args.port}/health")
+    return processes
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except Exception:
+        return None
+
+
+async def drive(base_url: str, scenarios: list, concurrency: int) -> dict:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    results = {}
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        for scenario in scenarios:
+            results[scenario.name] = await run_scenario(client, scenario, concurrency)
+            print(f"{scenario.name}: {results[scenario.name]['throughput_rps']} req/s, "
+                  f"p99 {results[scenario.name]['p99_ms']} ms", file=sys.stderr)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de carga por endpoint con datos sembrados")
+    parser.add_argument("--mongo-uri", default="mongodb://127.0.0.1:27017")
+    parser.add_argument("--db", default="trello_benchmark")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--workspaces", type=int, default=50)
+    parser.add_argument("--lists-per-workspace", type=int, default=5)
+    parser.add_argument("--tasks", type=int, default=20000)
+    parser.add_argument("--skew", type=float, default=1.1, help="Exponente Zipf del tamaño de los tableros")
+    parser.add_argument("--requests", type=int, default=500, help="Requests por endpoint")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--base-url", default=None, help="Usar un servidor ya levantado sobre la misma base")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=None, help="Archivo JSON de salida (por defecto stdout)")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    dataset = seed(args.mongo_uri, args.db, args.users, args.workspaces, args.lists_per_workspace,
+                   args.tasks, args.skew, rng)
+    task_ids = sample_tasks(args.mongo_uri, args.db)
+    scenarios = build_scenarios(dataset, task_ids, args.requests, rng)
+
+    processes = [] if args.base_url else start_servers(args)
+    base_url = args.base_url or f"http://127.0.0.1:{args.port}"
+    try:
+        results = asyncio.run(drive(base_url, scenarios, args.concurrency))
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait()
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "requests_per_endpoint": args.requests,
+            "concurrency": args.concurrency,
+        },
+        "dataset": {k: v for k, v in dataset.items() if not k.startswith("_")},
+        "endpoints": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Microbenchmark de serialización de la respuesta de GET /workspaces/{id}/tasks.
+
+    python -m benchmarks.serialization_benchmark --tasks 10000
+
+"before" es el camino por defecto de FastAPI: jsonable_encoder sobre el dict
+(con _id ya convertido a texto por $toString) y JSONResponse.
+"after" es FastJSONResponse con _id como ObjectId, sin jsonable_encoder.
+"""
+import argparse
+import json
+import random
+import time
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from benchmarks.generate_data import sentence
+from utils.rank import spread_ranks
+from utils.responses import FastJSONResponse
+
+
+def tasks_payload(tasks: int, lists: int = 8, seed: int = 42) -> dict:
+    """Mismo shape que get_tasks_by_workspace, con _id como ObjectId"""
+    rng = random.Random(seed)
+    list_ids = [str(ObjectId()) for _ in range(lists)]
+    ranks = spread_ranks(tasks)
+    data = [
+        {
+            "_id": ObjectId(),
+            "title": f"Task {i}",
+            "description": sentence(rng, 5, 40),
+            "id_list": list_ids[i % lists],
+            "rank": ranks[i],
+            "list_title": f"List {i % lists}",
+        }
+        for i in range(tasks)
+    ]
+    return {"success": True, "message": "Tasks retrieved successfully", "data": data, "next_cursor": None}
+
+
+def _stringify_ids(payload: dict) -> dict:
+    return {**payload, "data": [{**task, "_id": str(task["_id"])} for task in payload["data"]]}
+
+
+def _before(payload: dict) -> bytes:
+    return JSONResponse(jsonable_encoder(payload)).body
+
+
+def _after(payload: dict) -> bytes:
+    return FastJSONResponse(payload).body
+
+
+def _measure(fn, payload: dict, repeat: int) -> dict:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = fn(payload)
+        times.append(time.perf_counter() - start)
+    times.sort()
+    return {
+        "best_ms": round(times[0] * 1000, 3),
+        "median_ms": round(times[len(times) // 2] * 1000, 3),
+        "bytes": len(body),
+    }
+
+
+def run(tasks: int, repeat: int) -> dict:
+    payload = tasks_payload(tasks)
+    string_payload = _stringify_ids(payload)
+
+    if json.loads(_before(string_payload)) != json.loads(_after(payload)):
+        raise AssertionError("FastJSONResponse output differs from JSONResponse")
+
+    before = _measure(_before, string_payload, repeat)
+    after = _measure(_after, payload, repeat)
+    return {
+        "tasks": tasks,
+        "before": before,
+        "after": after,
+        "speedup": round(before["median_ms"] / after["median_ms"], 2),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compara jsonable_encoder + JSONResponse contra FastJSONResponse")
+    parser.add_argument("--tasks", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(json.dumps(run(args.tasks, args.repeat), indent=2))
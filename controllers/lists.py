@@ -1,45 +1,74 @@
 from models.lists import List
-from utils.mongodb import get_collection
+from utils.mongodb import lazy_collection
 from bson import ObjectId
+from utils.rank import rank_after, rank_between, RankBoundsError
+from utils.rank_rebalance import rebalance_group, flag_long_ranks
 from fastapi import HTTPException
-from pipelines.list_pipline import get_lists_by_workspace_pipeline ,count_tasks_in_list_pipeline, get_list_by_name_in_workspace_pipeline
-
-lists_collection = get_collection("lists")
-workspaces_collection = get_collection("workspaces")
-tasks_collection = get_collection("tasks")
+from utils.indexes import CASE_INSENSITIVE
+from utils.workspace_access import get_workspace_owner
+from utils.versioning import mark_workspace_changed
+from utils.response_cache import response_cache, cache_key
+from utils.pagination import decode_keyset_cursor, paginate, DEFAULT_PAGE_SIZE
+from utils.streaming import CURSOR_BATCH_SIZE
+from utils.fields import LIST_FIELDS, parse_fields, find_projection, pick_fields
+from pipelines.list_pipline import LIST_ORDER, get_lists_by_workspace_pipeline ,count_tasks_in_list_pipeline, get_list_by_name_in_workspace_pipeline
+
+lists_collection = lazy_collection("lists")
+tasks_collection = lazy_collection("tasks")
+lists_read_collection = lazy_collection("lists", read=True)
+
+
+async def _last_rank(workspace_id: str):
+    last = await lists_collection.find_one(
+        {"id_workspace": workspace_id, "rank": {"$exists": True}},
+        {"rank": 1},
+        sort=[("rank", -1)]
+    )
+    return last["rank"] if last else None
+
+async def _ranks_of(workspace_id: str, list_ids: list) -> dict:
+    found = await lists_collection.find(
+        {"_id": {"$in": [ObjectId(item) for item in list_ids]}, "id_workspace": workspace_id},
+        {"rank": 1}
+    ).to_list()
+    return {str(item["_id"]): item.get("rank") for item in found}
 
 async def create_list(list_data: List, workspace_id: str, user_id: str) -> dict:
 
     try:
-        workspace =  workspaces_collection.find_one({"_id": ObjectId(workspace_id)})
-        if not workspace:
+        owner = await get_workspace_owner(workspace_id, fresh=True)
+        if not owner:
             return {"success": False, "message": "Workspace not found", "data": None}
 
-        if workspace["id_user"] != user_id:
+        if owner != user_id:
             return {"success": False, "message": "Unauthorized", "data": None}
 
         title = list_data.title.strip().lower()
         description = list_data.description.strip().lower()
 
-        existing_list = lists_collection.aggregate(
-            get_list_by_name_in_workspace_pipeline(workspace_id, title)
+        existing_list = await lists_collection.aggregate(
+            get_list_by_name_in_workspace_pipeline(workspace_id, title),
+            collation=CASE_INSENSITIVE
         )
-        existing_list = list(existing_list)
+        existing_list = await existing_list.to_list()
 
         if existing_list:
             raise HTTPException(status_code=400, detail="List with this title already exists in the workspace.")
 
         list_dic = list_data.model_dump(exclude={"id"})
         list_dic["id_workspace"] = workspace_id
+        list_dic["rank"] = rank_after(await _last_rank(workspace_id))
 
-        result =  lists_collection.insert_one(list_dic)
+        result = await lists_collection.insert_one(list_dic)
         inserted_id = result.inserted_id
+        await mark_workspace_changed(workspace_id)
 
         response_data = {
             "id": str(inserted_id),
             "title": list_data.title,
             "description": list_data.description,
-            "id_workspace": workspace_id
+            "id_workspace": workspace_id,
+            "rank": list_dic["rank"]
         }
         return {"success": True, "message": "List created successfully", "data": response_data}
 
@@ -49,39 +78,85 @@ async def create_list(list_data: List, workspace_id: str, user_id: str) -> dict:
 
 #------------------------------------------------------------------------------------
 
-async def get_lists(workspace_id: str) -> list:
+async def get_lists(workspace_id: str, after: str = None, limit: int = None, fields: str = None, version: int = None) -> list:
     try:
-       
-        workspace =  workspaces_collection.find_one({"_id": ObjectId(workspace_id)})
-        if not workspace:
+        selected = parse_fields(fields, LIST_FIELDS)
+
+        owner = await get_workspace_owner(workspace_id)
+        if not owner:
             return {"success": False, "message": "Workspace not found", "data": None}
 
-        pipeline = get_lists_by_workspace_pipeline(workspace_id)
-        lists_with_tasks =  lists_collection.aggregate(pipeline)
-        lists_with_tasks = list(lists_with_tasks)
+        if after and not limit:
+            limit = DEFAULT_PAGE_SIZE
+        after_key = decode_keyset_cursor(after, LIST_ORDER) if after else None
+
+        key = cache_key("lists", workspace_id, version, after, limit, selected)
+        cached = await response_cache.get(key)
+        if cached is not None:
+            return cached
+
+        pipeline = get_lists_by_workspace_pipeline(workspace_id, after=after_key, limit=limit, fields=selected)
+        lists_with_tasks = await lists_read_collection.aggregate(pipeline)
+        lists_with_tasks = await lists_with_tasks.to_list()
 
-        return {"success": True, "message": "Lists retrieved successfully", "data": lists_with_tasks}
+        next_cursor = None
+        if limit:
+            lists_with_tasks, next_cursor = paginate(lists_with_tasks, limit, keys=LIST_ORDER)
+
+        result = {"success": True, "message": "Lists retrieved successfully", "data": lists_with_tasks, "next_cursor": next_cursor}
+        await response_cache.set(key, result, tag=workspace_id)
+        return result
 
     except Exception as e:
         return {"success": False, "message": str(e), "data": None}
 
 #------------------------------------------------------------------------------------
 
-async def get_list_by_id (list_id:str, workspace_id:str)-> dict:
+async def stream_lists(workspace_id: str, batch_size: int = CURSOR_BATCH_SIZE, fields: str = None) -> dict:
+    """
+    Igual que get_lists pero regresa el cursor abierto para escribirlo como NDJSON
+    """
+    try:
+        selected = parse_fields(fields, LIST_FIELDS)
+
+        owner = await get_workspace_owner(workspace_id)
+        if not owner:
+            return {"success": False, "message": "Workspace not found", "data": None}
+
+        cursor = await lists_read_collection.aggregate(
+            get_lists_by_workspace_pipeline(workspace_id, fields=selected),
+            batchSize=batch_size
+        )
+        return {"success": True, "message": "Lists stream opened", "data": cursor}
+
+    except Exception as e:
+        return {"success": False, "message": str(e), "data": None}
+
+#------------------------------------------------------------------------------------
+
+async def get_list_by_id (list_id:str, workspace_id:str, fields: str = None)-> dict:
    try:
-        workspace = workspaces_collection.find_one({"_id": ObjectId(workspace_id)})
-        if not workspace:
+        selected = parse_fields(fields, LIST_FIELDS)
+
+        owner = await get_workspace_owner(workspace_id)
+        if not owner:
             return {"success": False, "message": "Workspace not found", "data": None}
-        list_data = lists_collection.find_one({"_id": ObjectId(list_id), "id_workspace": workspace_id})
+        list_data = await lists_read_collection.find_one(
+            {"_id": ObjectId(list_id), "id_workspace": workspace_id},
+            find_projection(selected)
+        )
         if not list_data:
             return {"success": False, "message": "List not found", "data": None}
 
-        response_data = {
-            "id": str(list_data["_id"]),
-            "title": list["title"],
-            "description": list["description"],
-            "id_workspace": list["id_workspace"]
-        }
+        if selected:
+            response_data = pick_fields(list_data, selected)
+        else:
+            response_data = {
+                "id": str(list_data["_id"]),
+                "title": list_data["title"],
+                "description": list_data["description"],
+                "id_workspace": list_data["id_workspace"]
+            }
         return {"success": True, "message": "List retrieved successfully", "data": response_data}
 
    except Exception as e:
@@ -92,16 +167,16 @@ async def get_list_by_id (list_id:str, workspace_id:str)-> dict:
 async def update_list(list_id: str, user_id: str, list_data: List) -> dict:
     try:
        
-        existing_list =  lists_collection.find_one({"_id": ObjectId(list_id)})
+        existing_list = await lists_collection.find_one({"_id": ObjectId(list_id)})
         if not existing_list:
             return {"success": False, "message": "List not found", "data": None}
 
         workspace_id = existing_list["id_workspace"]
-        workspace =  workspaces_collection.find_one({"_id": ObjectId(workspace_id)})
-        if not workspace:
+        owner = await get_workspace_owner(workspace_id, fresh=True)
+        if not owner:
             return {"success": False, "message": "Workspace not found", "data": None}
 
-        if workspace["id_user"] != user_id:
+        if owner != user_id:
             return {"success": False, "message": "Unauthorized", "data": None}
 
 
@@ -117,17 +192,18 @@ async def update_list(list_id: str, user_id: str, list_data: List) -> dict:
         if list_data.title == existing_list["title"] and list_data.description == existing_list["description"]:
             return {"success": False, "message": "You are not making changes to the list", "data": None}
 
-        list_duplicate = lists_collection.aggregate(
-            get_list_by_name_in_workspace_pipeline(workspace_id, list_data.title)
+        list_duplicate = await lists_collection.aggregate(
+            get_list_by_name_in_workspace_pipeline(workspace_id, list_data.title),
+            collation=CASE_INSENSITIVE
         )
 
         if list_data.description == existing_list["description"]:
 
-            if list(list_duplicate):
+            if await list_duplicate.to_list():
                 raise HTTPException(status_code=400, detail="List with this title already exists in the workspace.")
 
         
-        result = lists_collection.update_one(
+        result = await lists_collection.update_one(
             {"_id": ObjectId(list_id)},
             {"$set": list_data.model_dump(exclude={"id"})}
         )
@@ -135,7 +211,8 @@ async def update_list(list_id: str, user_id: str, list_data: List) -> dict:
         if result.modified_count == 0:
             return {"success": False, "message": "List not found or no changes made", "data": None}
 
-        
+        await mark_workspace_changed(workspace_id)
+
         response_data = {
             "id": list_id,
             "title": list_data.title,
@@ -156,23 +233,22 @@ async def update_list(list_id: str, user_id: str, list_data: List) -> dict:
 
 async def delete_list(list_id: str, user_id: str) -> dict:
     try:
-        list_data =  lists_collection.find_one({"_id": ObjectId(list_id)})
+        list_data = await lists_collection.find_one({"_id": ObjectId(list_id)})
         if not list_data:
             return {"success": False, "message": "List not found", "data": None}
 
         workspace_id = list_data.get("id_workspace")
-        workspace =  workspaces_collection.find_one({"_id": ObjectId(workspace_id)})
-        if not workspace:
+        owner = await get_workspace_owner(workspace_id, fresh=True)
+        if not owner:
             return {"success": False, "message": "Workspace not found", "data": None}
 
-        is_owner = str(workspace.get("id_user")) == user_id
+        is_owner = owner == user_id
         if not is_owner:
             return {"success": False, "message": "Unauthorized", "data": None}
 
         pipeline = count_tasks_in_list_pipeline(list_id)
-        result =  tasks_collection.aggregate(pipeline)
-        result = list(result)
-# Si hay algun error borrar el .to_list
+        result = await tasks_collection.aggregate(pipeline)
+        result = await result.to_list()
 
         if result:
             task_count = result[0]["task_count"]
@@ -186,8 +262,58 @@ async def delete_list(list_id: str, user_id: str) -> dict:
                 "data": None
             }
 
-        lists_collection.delete_one({"_id": ObjectId(list_id)})
+        await lists_collection.delete_one({"_id": ObjectId(list_id)})
+        await mark_workspace_changed(workspace_id)
         return {"success": True, "message": "List deleted successfully", "data": None}
 
     except Exception as e:
-        return {"success": False, "message": str(e), "data": None}
\ No newline at end of file
+        return {"success": False, "message": str(e), "data": None}
+
+#------------------------------------------------------------------------------------
+
+async def move_list(list_id: str, user_id: str, workspace_id: str, prev_list_id: str = None, next_list_id: str = None) -> dict:
+    """
+    Reordena una lista dentro de su workspace calculando un rank entre sus nuevos vecinos.
+    Sin vecinos la lista pasa al final
+    """
+    try:
+        owner = await get_workspace_owner(workspace_id, fresh=True)
+        if not owner:
+            return {"success": False, "message": "Workspace not found", "data": None}
+
+        if owner != user_id:
+            return {"success": False, "message": "Unauthorized", "data": None}
+
+        wanted = [list_id] + [neighbour for neighbour in (prev_list_id, next_list_id) if neighbour]
+        ranks = await _ranks_of(workspace_id, wanted)
+
+        for item in wanted:
+            if item not in ranks:
+                return {"success": False, "message": f"List {item} not found in workspace", "data": None}
+
+        if prev_list_id or next_list_id:
+            try:
+                rank = rank_between(ranks.get(prev_list_id), ranks.get(next_list_id))
+            except RankBoundsError:
+                # Dos altas concurrentes pueden repetir un rank; el rebalanceo los vuelve distintos
+                await rebalance_group("lists", workspace_id)
+                ranks = await _ranks_of(workspace_id, wanted)
+                rank = rank_between(ranks.get(prev_list_id), ranks.get(next_list_id))
+            await flag_long_ranks("lists", workspace_id, [rank])
+        else:
+            rank = rank_after(await _last_rank(workspace_id))
+
+        await lists_collection.update_one(
+            {"_id": ObjectId(list_id)},
+            {"$set": {"rank": rank}}
+        )
+        await mark_workspace_changed(workspace_id)
+
+        return {
+            "success": True,
+            "message": "List moved successfully",
+            "data": {"id": list_id, "rank": rank}
+        }
+
+    except Exception as e:
+        return {"success": False, "message": str(e), "data": None}
@@ -1,47 +1,121 @@
 from models.tasks import Task
-from utils.mongodb import get_collection
+from utils.mongodb import lazy_collection
 from fastapi import HTTPException
+from utils.indexes import CASE_INSENSITIVE
+from utils.workspace_access import get_workspace_owner
+from utils.versioning import mark_workspace_changed
+from utils.response_cache import response_cache, cache_key
+from utils.pagination import decode_keyset_cursor, paginate, DEFAULT_PAGE_SIZE
+from utils.streaming import CURSOR_BATCH_SIZE
+from utils.fields import TASK_FIELDS, SEARCH_FIELDS, parse_fields, find_projection, pick_fields
+from utils.search import title_terms, parse_query, PREFIX_INDEX, DEFAULT_SEARCH_LIMIT
 from bson import ObjectId
-from pipelines.task_pipline import get_task_by_title_in_workspace_pipeline, get_tasks_by_workspace_pipeline
-tasks_collection = get_collection("tasks")
-lists_collection = get_collection("lists")
-workspaces_collection = get_collection("workspaces")
+from utils.rank import rank_after, ranks_between, RankBoundsError
+from utils.rank_rebalance import rebalance_group, flag_long_ranks
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from pipelines.task_pipline import (
+    TASK_ORDER,
+    get_task_by_title_in_workspace_pipeline,
+    get_tasks_by_titles_in_workspace_pipeline,
+    get_tasks_by_workspace_pipeline,
+    search_tasks_pipeline
+)
+tasks_collection = lazy_collection("tasks")
+lists_collection = lazy_collection("lists")
+tasks_read_collection = lazy_collection("tasks", read=True)
+lists_read_collection = lazy_collection("lists", read=True)
+
+
+async def _last_rank(id_list: str):
+    last = await tasks_collection.find_one(
+        {"id_list": id_list, "rank": {"$exists": True}},
+        {"rank": 1},
+        sort=[("rank", -1)]
+    )
+    return last["rank"] if last else None
+
+
+async def _neighbour_ranks(id_list: str, prev_task_id: str = None, next_task_id: str = None) -> tuple:
+    """Ranks de las tareas vecinas en la lista destino, en una sola consulta"""
+    wanted = [task_id for task_id in (prev_task_id, next_task_id) if task_id]
+    neighbours = await tasks_collection.find(
+        {"_id": {"$in": [ObjectId(task_id) for task_id in wanted]}, "id_list": id_list},
+        {"rank": 1}
+    ).to_list()
+    ranks = {str(task["_id"]): task.get("rank") for task in neighbours}
+
+    for task_id in wanted:
+        if task_id not in ranks:
+            raise ValueError(f"Task {task_id} not found in the target list")
+    return ranks.get(prev_task_id), ranks.get(next_task_id)
+
+
+async def _ranks_for_position(id_list: str, count: int, prev_task_id: str = None, next_task_id: str = None) -> list:
+    """count ranks consecutivos entre los vecinos indicados, o al final de la lista"""
+    if prev_task_id or next_task_id:
+        prev_rank, next_rank = await _neighbour_ranks(id_list, prev_task_id, next_task_id)
+        try:
+            ranks = ranks_between(prev_rank, next_rank, count)
+        except RankBoundsError:
+            # Dos altas concurrentes pueden repetir un rank; el rebalanceo los vuelve distintos
+            await rebalance_group("tasks", id_list)
+            prev_rank, next_rank = await _neighbour_ranks(id_list, prev_task_id, next_task_id)
+            ranks = ranks_between(prev_rank, next_rank, count)
+        await flag_long_ranks("tasks", id_list, ranks)
+        return ranks
+
+    ranks = []
+    rank = await _last_rank(id_list)
+    for _ in range(count):
+        rank = rank_after(rank)
+        ranks.append(rank)
+    return ranks
+
+
+async def _rank_for_position(id_list: str, prev_task_id: str = None, next_task_id: str = None) -> str:
+    return (await _ranks_for_position(id_list, 1, prev_task_id, next_task_id))[0]
 
 
 async def create_task(user_id:str,id_workspace: str, task: Task, id_list: str) -> dict:
     try:
-        workspace =  workspaces_collection.find_one({"_id": ObjectId(id_workspace)})
-        if not workspace:
+        owner = await get_workspace_owner(id_workspace, fresh=True)
+        if not owner:
             return {"success": False, "message": "Workspace not found", "data": None}
-        if workspace["id_user"] != user_id:
+        if owner != user_id:
             return {"success": False, "message": "Unauthorized", "data": None}
 
-        list_data = lists_collection.find_one({"_id": ObjectId(id_list), "id_workspace": id_workspace})
+        list_data = await lists_collection.find_one({"_id": ObjectId(id_list), "id_workspace": id_workspace})
         if not list_data:
             return {"success": False, "message": "List not found in workspace", "data": None}
         normalized_title = task.title.strip().lower()
 
 
-        existing_task = tasks_collection.aggregate(
-            get_task_by_title_in_workspace_pipeline(id_workspace, normalized_title)
+        existing_task = await tasks_collection.aggregate(
+            get_task_by_title_in_workspace_pipeline(id_workspace, normalized_title),
+            collation=CASE_INSENSITIVE
         )
-        existing_task = list(existing_task)
+        existing_task = await existing_task.to_list()
 
         if existing_task:
             return {"success": False, "message": "Task already exists", "data": None}
 
         task_dict = task.model_dump(exclude={"id"})
         task_dict["id_list"] = id_list
+        task_dict["id_list_obj"] = ObjectId(id_list)
+        task_dict["id_workspace"] = id_workspace
+        task_dict["title_terms"] = title_terms(task_dict["title"])
+        task_dict["rank"] = rank_after(await _last_rank(id_list))
 
-        inserted =  tasks_collection.insert_one(task_dict)
-        
-# A considerar agregar las fechas de creacion y actualizacion
+        inserted = await tasks_collection.insert_one(task_dict)
+        await mark_workspace_changed(id_workspace)
 
         response_data = {
             "id": str(inserted.inserted_id),
             "title": task.title,
             "description": task.description,
             "id_list": id_list, 
+            "rank": task_dict["rank"],
         }
         return {"success": True, "message": "Task created successfully", "data": response_data}
 
@@ -49,26 +123,112 @@ async def create_task(user_id:str,id_workspace: str, task: Task, id_list: str) -
         return {"success": False, "message": str(e), "data": None}
 
 #------------------------------------------------------------------------------------
-async def get_task_by_id(task_id: str, workspace_id: str) -> Task:
+
+async def create_tasks_batch(user_id: str, id_workspace: str, tasks: list, id_list: str) -> dict:
+    """
+    Crea varias tareas en una lista con una sola revisión de duplicados ($in)
+    y un solo insert_many sin orden. Regresa el resultado de cada tarea
+    """
+    try:
+        owner = await get_workspace_owner(id_workspace, fresh=True)
+        if not owner:
+            return {"success": False, "message": "Workspace not found", "data": None}
+        if owner != user_id:
+            return {"success": False, "message": "Unauthorized", "data": None}
+
+        list_data = await lists_collection.find_one({"_id": ObjectId(id_list), "id_workspace": id_workspace}, {"_id": 1})
+        if not list_data:
+            return {"success": False, "message": "List not found in workspace", "data": None}
+
+        titles = [task.title.strip() for task in tasks]
+        existing = await tasks_collection.aggregate(
+            get_tasks_by_titles_in_workspace_pipeline(id_workspace, list(set(titles))),
+            collation=CASE_INSENSITIVE
+        )
+        taken = {doc["title"].strip().lower() for doc in await existing.to_list()}
+
+        results = [None] * len(tasks)
+        documents = []
+        positions = []
+        for index, task in enumerate(tasks):
+            key = titles[index].lower()
+            if key in taken:
+                results[index] = {"index": index, "success": False, "id": None, "message": "Task already exists"}
+                continue
+            taken.add(key)
+
+            task_dict = task.model_dump(exclude={"id"})
+            task_dict["id_list"] = id_list
+            task_dict["id_list_obj"] = ObjectId(id_list)
+            task_dict["id_workspace"] = id_workspace
+            task_dict["title_terms"] = title_terms(task_dict["title"])
+            documents.append(task_dict)
+            positions.append(index)
+
+        for document, rank in zip(documents, await _ranks_for_position(id_list, len(documents))):
+            document["rank"] = rank
+
+        failed = {}
+        if documents:
+            try:
+                await tasks_collection.insert_many(documents, ordered=False)
+            except BulkWriteError as e:
+                failed = {error["index"]: error["errmsg"] for error in e.details.get("writeErrors", [])}
+
+        for doc_index, index in enumerate(positions):
+            if doc_index in failed:
+                results[index] = {"index": index, "success": False, "id": None, "message": failed[doc_index]}
+            else:
+                results[index] = {"index": index, "success": True, "id": str(documents[doc_index]["_id"]), "message": "Task created successfully"}
+
+        created = sum(1 for r in results if r["success"])
+        if created:
+            await mark_workspace_changed(id_workspace)
+        response_data = {
+            "id_list": id_list,
+            "created": created,
+            "failed": len(results) - created,
+            "results": results
+        }
+        return {"success": True, "message": f"{created} of {len(results)} tasks created", "data": response_data}
+
+    except Exception as e:
+        return {"success": False, "message": str(e), "data": None}
+
+#------------------------------------------------------------------------------------
+async def get_task_by_id(task_id: str, workspace_id: str, fields: str = None) -> Task:
+    """
+    Con fields regresa un dict solo con los campos pedidos (list_title no aplica aquí)
+    """
+    try:
+        selected = parse_fields(fields, TASK_FIELDS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
     try:
-        workspace =  workspaces_collection.find_one({"_id": ObjectId(workspace_id)})
-        if not workspace:
+        owner = await get_workspace_owner(workspace_id)
+        if not owner:
             raise HTTPException(status_code=404, detail="Workspace not found")
 
-        task =  tasks_collection.find_one({"_id": ObjectId(task_id)})
+        task = await tasks_read_collection.find_one(
+            {"_id": ObjectId(task_id)},
+            find_projection(selected, required=("id_list",))
+        )
         if not task:
             raise HTTPException(status_code=404, detail="Task not found")
 
        
-        list_data =  lists_collection.find_one({
+        list_data = await lists_read_collection.find_one({
             "_id": ObjectId(task["id_list"]),
             "id_workspace": workspace_id 
-        })
+        }, {"_id": 1})
 
         if not list_data:
             raise HTTPException(status_code=404, detail="List not found or does not belong to workspace")
 
-        
+        if selected:
+            return pick_fields(task, tuple(field for field in selected if field != "list_title"))
+
         return Task(
             id=str(task["_id"]),
             title=task["title"],
@@ -82,18 +242,96 @@ async def get_task_by_id(task_id: str, workspace_id: str) -> Task:
 
 #-------------------------------------------------------------------------------------------
 
-async def get_tasks_by_workspace(workspace_id: str) -> list:
+async def get_tasks_by_workspace(workspace_id: str, after: str = None, limit: int = None, fields: str = None, version: int = None) -> list:
     try:
-        workspace = workspaces_collection.find_one({"_id": ObjectId(workspace_id)})
-        if not workspace:
+        selected = parse_fields(fields, TASK_FIELDS)
+
+        owner = await get_workspace_owner(workspace_id)
+        if not owner:
             return {"success": False, "message": "Workspace not found", "data": None}
 
-        pipeline = get_tasks_by_workspace_pipeline(workspace_id)
-        tasks_with_lists = tasks_collection.aggregate(pipeline)
+        if after and not limit:
+            limit = DEFAULT_PAGE_SIZE
+        after_key = decode_keyset_cursor(after, TASK_ORDER) if after else None
+
+        key = cache_key("tasks", workspace_id, version, after, limit, selected)
+        cached = await response_cache.get(key)
+        if cached is not None:
+            return cached
+
+        pipeline = get_tasks_by_workspace_pipeline(workspace_id, after=after_key, limit=limit, fields=selected)
+        tasks_with_lists = await tasks_read_collection.aggregate(pipeline)
+        tasks_with_lists = await tasks_with_lists.to_list()
+
+        next_cursor = None
+        if limit:
+            tasks_with_lists, next_cursor = paginate(tasks_with_lists, limit, id_field="_id", keys=TASK_ORDER)
+
+        result = {"success": True, "message": "Tasks retrieved successfully", "data": tasks_with_lists, "next_cursor": next_cursor}
+        await response_cache.set(key, result, tag=workspace_id)
+        return result
 
-        tasks_with_lists = list(tasks_with_lists)
+    except Exception as e:
+        return {"success": False, "message": str(e), "data": None}
 
-        return {"success": True, "message": "Tasks retrieved successfully", "data": tasks_with_lists}
+#------------------------------------------------------------------------------------
+
+async def stream_tasks_by_workspace(workspace_id: str, batch_size: int = CURSOR_BATCH_SIZE, fields: str = None) -> dict:
+    """
+    Igual que get_tasks_by_workspace pero regresa el cursor abierto para escribirlo como NDJSON
+    """
+    try:
+        selected = parse_fields(fields, TASK_FIELDS)
+
+        owner = await get_workspace_owner(workspace_id)
+        if not owner:
+            return {"success": False, "message": "Workspace not found", "data": None}
+
+        cursor = await tasks_read_collection.aggregate(
+            get_tasks_by_workspace_pipeline(workspace_id, fields=selected),
+            batchSize=batch_size
+        )
+        return {"success": True, "message": "Tasks stream opened", "data": cursor}
+
+    except Exception as e:
+        return {"success": False, "message": str(e), "data": None}
+
+#------------------------------------------------------------------------------------
+
+async def search_tasks(workspace_id: str, q: str, prefix: bool = True, skip: int = 0,
+                       limit: int = DEFAULT_SEARCH_LIMIT, fields: str = None, version: int = None) -> dict:
+    """
+    Busca tareas del workspace por palabras completas ($text, por relevancia) y por el
+    prefijo de la última palabra (title_terms). Se pagina con skip; next_skip es None en la última página
+    """
+    try:
+        selected = parse_fields(fields, SEARCH_FIELDS)
+        words, partial = parse_query(q, prefix)
+
+        owner = await get_workspace_owner(workspace_id)
+        if not owner:
+            return {"success": False, "message": "Workspace not found", "data": None}
+
+        key = cache_key("search", workspace_id, version, " ".join(words), partial, skip, limit, selected)
+        cached = await response_cache.get(key)
+        if cached is not None:
+            return cached
+
+        options = {} if words else {"hint": PREFIX_INDEX}
+        cursor = await tasks_read_collection.aggregate(
+            search_tasks_pipeline(workspace_id, words, partial, skip=skip, limit=limit, fields=selected),
+            **options
+        )
+        tasks = await cursor.to_list()
+
+        next_skip = None
+        if len(tasks) > limit:
+            tasks = tasks[:limit]
+            next_skip = skip + limit
+
+        result = {"success": True, "message": "Tasks found", "data": tasks, "next_skip": next_skip}
+        await response_cache.set(key, result, tag=workspace_id)
+        return result
 
     except Exception as e:
         return {"success": False, "message": str(e), "data": None}
@@ -103,19 +341,19 @@ async def get_tasks_by_workspace(workspace_id: str) -> list:
 async def update_task(user_id: str, id_task: str, workspace_id: str,  task_data: Task) -> dict:
     try:
        
-        task =  tasks_collection.find_one({"_id": ObjectId(id_task)})
+        task = await tasks_collection.find_one({"_id": ObjectId(id_task)})
         if not task:
             return {"success": False, "message": "Task not found", "data": None}
      
-        workspace =  workspaces_collection.find_one({"_id": ObjectId(workspace_id)})
-        if not workspace_id:
-            return {"success": False, "message": "Workspace ID not found in list", "data": None}
+        owner = await get_workspace_owner(workspace_id, fresh=True)
+        if not owner:
+            return {"success": False, "message": "Workspace not found", "data": None}
 
-        list_data = get_list_by_id(ObjectId(task["id_list"]), workspace_id)
+        list_data = await lists_collection.find_one({"_id": ObjectId(task["id_list"]), "id_workspace": workspace_id})
         if not list_data:
             return {"success": False, "message": "List not found", "data": None}
 
-        if workspace["id_user"] != user_id:
+        if owner != user_id:
             return {"success": False, "message": "Unauthorized", "data": None}
 
         if not task_data.description:
@@ -132,10 +370,11 @@ async def update_task(user_id: str, id_task: str, workspace_id: str,  task_data:
         if title_new == title_old and description_new == description_old:
             return {"success": False, "message": "No changes made to the task", "data": None}
 
-        existing_task = tasks_collection.aggregate(
-            get_task_by_title_in_workspace_pipeline(workspace_id, task_data.title.strip())
+        existing_task = await tasks_collection.aggregate(
+            get_task_by_title_in_workspace_pipeline(workspace_id, task_data.title.strip()),
+            collation=CASE_INSENSITIVE
         )
-        existing_task = list(existing_task)
+        existing_task = await existing_task.to_list()
 
         if description_new == description_old:
             if existing_task:
@@ -143,10 +382,12 @@ async def update_task(user_id: str, id_task: str, workspace_id: str,  task_data:
 
         new_task = task_data.model_dump(exclude={"id"})
         new_task["id_list"] = task["id_list"]
-        result =  tasks_collection.update_one(
+        new_task["title_terms"] = title_terms(new_task["title"])
+        result = await tasks_collection.update_one(
             {"_id": ObjectId(id_task)},
             {"$set": new_task}
         )
+        await mark_workspace_changed(workspace_id)
 
         response_data = {
             "id": id_task,
@@ -164,32 +405,34 @@ async def update_task(user_id: str, id_task: str, workspace_id: str,  task_data:
 
 async def delete_task(task_id: str, user_id: str) -> dict:
     try:
-        task =  tasks_collection.find_one({"_id": ObjectId(task_id)})
+        task = await tasks_collection.find_one({"_id": ObjectId(task_id)})
         if not task:
             return {"success": False, "message": "Task not found", "data": None}
 
-        list_id = task.get("id_list")
-        if not list_id:
-            return {"success": False, "message": "List ID not found in task", "data": None}
+        workspace_id = task.get("id_workspace")
+        if not workspace_id:
+            list_id = task.get("id_list")
+            if not list_id:
+                return {"success": False, "message": "List ID not found in task", "data": None}
+
+            list_data = await lists_collection.find_one({"_id": ObjectId(list_id)})
+            if not list_data:
+                return {"success": False, "message": "List not found", "data": None}
 
-        list_data =  lists_collection.find_one({"_id": ObjectId(list_id)})
-        if not list_data:
-            return {"success": False, "message": "List not found", "data": None}
+            workspace_id = list_data.get("id_workspace")
 
-        workspace_id = list_data.get("id_workspace")
         if not workspace_id:
             return {"success": False, "message": "Workspace ID not found in list", "data": None}
 
-        workspace =  workspaces_collection.find_one({"_id": ObjectId(workspace_id)})
-        if not workspace:
+        owner = await get_workspace_owner(workspace_id, fresh=True)
+        if not owner:
             return {"success": False, "message": "Workspace not found", "data": None}
 
-        if str(workspace.get("id_user")) != user_id:
+        if owner != user_id:
             return {"success": False, "message": "Unauthorized", "data": None}
 
-        tasks_collection.delete_one({"_id": ObjectId(task_id)})
-
-        task_delete.model_dump()
+        await tasks_collection.delete_one({"_id": ObjectId(task_id)})
+        await mark_workspace_changed(workspace_id)
         return {"success": True, "message": "Task deleted successfully", "data": None}
 
     except Exception as e:
@@ -197,9 +440,14 @@ async def delete_task(task_id: str, user_id: str) -> dict:
 
 #------------------------------------------------------------------------------------
 
-async def move_task_to_list(workspace_id: str, task_id: str, new_list_id: str) -> dict:
+async def move_task_to_list(workspace_id: str, task_id: str, new_list_id: str, prev_task_id: str = None, next_task_id: str = None) -> dict:
+    """
+    Mueve una tarea a otra lista (o la reordena dentro de la misma).
+    prev_task_id y next_task_id son los vecinos en la lista destino; sin ellos la tarea
+    se agrega al final. Solo se escribe el documento de la tarea movida
+    """
     try:
-        task = tasks_collection.find_one({"_id": ObjectId(task_id)})
+        task = await tasks_collection.find_one({"_id": ObjectId(task_id)}, {"id_list": 1})
         if not task:
             return {"success": False, "message": "Task not found", "data": None}
 
@@ -207,30 +455,148 @@ async def move_task_to_list(workspace_id: str, task_id: str, new_list_id: str) -
         if not current_list_id:
             return {"success": False, "message": "Task has no associated list", "data": None}
 
-        current_list = lists_collection.find_one({"_id": ObjectId(current_list_id)})
-        new_list = lists_collection.find_one({"_id": ObjectId(new_list_id)})
+        lists = await lists_collection.find(
+            {"_id": {"$in": [ObjectId(current_list_id), ObjectId(new_list_id)]}},
+            {"id_workspace": 1}
+        ).to_list()
+        lists = {str(list_data["_id"]): list_data for list_data in lists}
 
-        if not current_list or not new_list:
+        if current_list_id not in lists or new_list_id not in lists:
             return {"success": False, "message": "One or both lists not found", "data": None}
 
-        
-        if str(current_list.get("id_workspace")) != workspace_id or str(new_list.get("id_workspace")) != workspace_id:
+        if any(str(list_data.get("id_workspace")) != workspace_id for list_data in lists.values()):
             return {"success": False, "message": "Lists are not in the given workspace", "data": None}
 
-        
-        tasks_collection.update_one(
+        rank = await _rank_for_position(new_list_id, prev_task_id, next_task_id)
+
+        await tasks_collection.update_one(
             {"_id": ObjectId(task_id)},
-            {"$set": {"id_list": new_list_id}}
+            {"$set": {
+                "id_list": new_list_id,
+                "id_list_obj": ObjectId(new_list_id),
+                "id_workspace": workspace_id,
+                "rank": rank
+            }}
         )
+        await mark_workspace_changed(workspace_id)
 
         return {
             "success": True,
             "message": "Task moved successfully",
             "data": {
                 "task_id": task_id,
-                "new_list_id": new_list_id
+                "new_list_id": new_list_id,
+                "rank": rank
             }
         }
     except Exception as e:
         return {"success": False, "message": str(e), "data": None}
 
+#------------------------------------------------------------------------------------
+
+async def move_tasks_to_list(user_id: str, workspace_id: str, task_ids: list, new_list_id: str, prev_task_id: str = None, next_task_id: str = None) -> dict:
+    """
+    Mueve varias tareas a una lista: una lectura de tareas, una validación de listas con $in
+    y un solo bulk_write. Las tareas quedan en el orden recibido, entre prev_task_id y
+    next_task_id o al final de la lista. Regresa el resultado de cada tarea
+    """
+    positioned = bool(prev_task_id or next_task_id)
+    try:
+        owner = await get_workspace_owner(workspace_id, fresh=True)
+        if not owner:
+            return {"success": False, "message": "Workspace not found", "data": None}
+        if owner != user_id:
+            return {"success": False, "message": "Unauthorized", "data": None}
+
+        results = {}
+        object_ids = {}
+        for task_id in task_ids:
+            if ObjectId.is_valid(task_id):
+                object_ids[task_id] = ObjectId(task_id)
+            else:
+                results[task_id] = {"task_id": task_id, "success": False, "message": "Invalid task ID"}
+
+        tasks = await tasks_collection.find(
+            {"_id": {"$in": list(object_ids.values())}},
+            {"id_list": 1}
+        ).to_list()
+        tasks = {str(task["_id"]): task for task in tasks}
+
+        list_ids = {ObjectId(new_list_id)}
+        list_ids.update(ObjectId(task["id_list"]) for task in tasks.values() if ObjectId.is_valid(task.get("id_list")))
+        valid_lists = await lists_collection.find(
+            {"_id": {"$in": list(list_ids)}, "id_workspace": workspace_id},
+            {"_id": 1}
+        ).to_list()
+        valid_lists = {str(list_data["_id"]) for list_data in valid_lists}
+
+        if new_list_id not in valid_lists:
+            return {"success": False, "message": "Target list not found in workspace", "data": None}
+
+        operation_task_ids = []
+        for task_id in object_ids:
+            task = tasks.get(task_id)
+            if not task:
+                results[task_id] = {"task_id": task_id, "success": False, "message": "Task not found"}
+            elif task.get("id_list") not in valid_lists:
+                results[task_id] = {"task_id": task_id, "success": False, "message": "Task is not in the given workspace"}
+            elif task["id_list"] == new_list_id and not positioned:
+                results[task_id] = {"task_id": task_id, "success": True, "message": "Task already in list"}
+            else:
+                operation_task_ids.append(task_id)
+
+        ranks = await _ranks_for_position(new_list_id, len(operation_task_ids), prev_task_id, next_task_id)
+        operations = [
+            UpdateOne(
+                {"_id": object_ids[task_id], "id_list": tasks[task_id]["id_list"]},
+                {"$set": {
+                    "id_list": new_list_id,
+                    "id_list_obj": ObjectId(new_list_id),
+                    "id_workspace": workspace_id,
+                    "rank": rank
+                }}
+            )
+            for task_id, rank in zip(operation_task_ids, ranks)
+        ]
+
+        failed = {}
+        if operations:
+            try:
+                result = await tasks_collection.bulk_write(operations, ordered=False)
+                matched = result.matched_count
+            except BulkWriteError as e:
+                failed = {error["index"]: error["errmsg"] for error in e.details.get("writeErrors", [])}
+                matched = e.details.get("nMatched", 0)
+
+            if matched < len(operations) - len(failed):
+                # Alguna tarea cambió de lista entre la lectura y el bulk_write y su UpdateOne
+                # no encontró el id_list esperado: se reporta como conflicto en vez de movida.
+                # Solo cuenta como movida si tiene la lista y el rank que escribió este request
+                pending = [object_ids[task_id] for index, task_id in enumerate(operation_task_ids) if index not in failed]
+                current = await tasks_collection.find({"_id": {"$in": pending}}, {"id_list": 1, "rank": 1}).to_list()
+                current = {str(task["_id"]): (task.get("id_list"), task.get("rank")) for task in current}
+                for index, (task_id, rank) in enumerate(zip(operation_task_ids, ranks)):
+                    if index not in failed and current.get(task_id) != (new_list_id, rank):
+                        failed[index] = "Conflict: task was moved or deleted concurrently"
+
+            if len(failed) < len(operations):
+                await mark_workspace_changed(workspace_id)
+
+        for index, task_id in enumerate(operation_task_ids):
+            if index in failed:
+                results[task_id] = {"task_id": task_id, "success": False, "message": failed[index]}
+            else:
+                results[task_id] = {"task_id": task_id, "success": True, "message": "Task moved successfully"}
+
+        ordered_results = [results[task_id] for task_id in dict.fromkeys(task_ids)]
+        moved = sum(1 for r in ordered_results if r["success"])
+        response_data = {
+            "new_list_id": new_list_id,
+            "moved": moved,
+            "failed": len(ordered_results) - moved,
+            "results": ordered_results
+        }
+        return {"success": True, "message": f"{moved} of {len(ordered_results)} tasks moved", "data": response_data}
+
+    except Exception as e:
+        return {"success": False, "message": str(e), "data": None}
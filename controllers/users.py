@@ -1,30 +1,54 @@
 import os
+import asyncio
 import logging
-import firebase_admin
-import requests
+import threading
+import httpx
 import base64
 import json
 from fastapi import HTTPException
-from firebase_admin import credentials, auth as firebase_auth
 from dotenv import load_dotenv
 from models.users import User
 from models.login import Login
 
 from utils.security import create_jwt_token
-from utils.mongodb import get_collection
+from utils.mongodb import get_async_collection
+from utils.http import post_json
+from utils.indexes import CASE_INSENSITIVE
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 load_dotenv()
 
+FIREBASE_AUTH_URL = os.getenv("FIREBASE_AUTH_URL", "https://identitytoolkit.googleapis.com").rstrip("/")
+
 """
 Function to create a new user in Firebase and MongoDB (Funcion tomada del repositorio del maestro)
 """
 
+_firebase_pid = None
+_firebase_lock = threading.Lock()
+
 def initialize_firebase():
+    """
+    Inicializa la app de Firebase y regresa el módulo auth. Es trabajo bloqueante
+    (import de firebase_admin y lectura de credenciales): el lifespan lo corre en un hilo
+    con asyncio.to_thread, y create_user lo repite en un hilo solo si aquel falló
+    """
+    with _firebase_lock:
+        return _initialize_firebase()
+
+
+def _initialize_firebase():
+    global _firebase_pid
+    import firebase_admin
+    from firebase_admin import credentials, auth as firebase_auth
+
     if firebase_admin._apps:
-        return
+        if _firebase_pid == os.getpid():
+            return firebase_auth
+        # App heredada de un proceso padre: cada worker crea la suya
+        firebase_admin.delete_app(firebase_admin.get_app())
 
     try:
         firebase_creds_base64 = os.getenv("FIREBASE_CREDENTIALS_BASE64")
@@ -39,20 +63,23 @@ def initialize_firebase():
             cred = credentials.Certificate("secrets/trello-secrets.json")
             firebase_admin.initialize_app(cred)
             logger.info("Firebase initialized with JSON file")
+        _firebase_pid = os.getpid()
 
     except Exception as e:
         logger.error(f"Failed to initialize Firebase: {e}")
         raise HTTPException(status_code=500, detail=f"Firebase configuration error: {str(e)}")
 
+    return firebase_auth
 
-initialize_firebase()
 
 async def create_user(user: User) -> User:
 
       user_record = {}
+      firebase_auth = await asyncio.to_thread(initialize_firebase)
 
       try:
-          user_record = firebase_auth.create_user(
+          user_record = await asyncio.to_thread(
+              firebase_auth.create_user,
               email=user.email,
               password=user.password,
           )
@@ -61,7 +88,7 @@ async def create_user(user: User) -> User:
           raise HTTPException(status_code=400, detail=f"Error creating user in Firebase: {e}")
 
       try:
-         col = get_collection("users")
+         col = get_async_collection("users")
 
          new_user = User(
             name=user.name,
@@ -70,13 +97,13 @@ async def create_user(user: User) -> User:
         )
 
          user_dict = new_user.model_dump(exclude= {"id","password"})
-         inserted_user =  col.insert_one(user_dict)
+         inserted_user = await col.insert_one(user_dict)
          new_user.id = str(inserted_user.inserted_id)
          new_user.password = "********" 
          return new_user
 
       except Exception as e:
-         firebase_auth.delete_user(user_record.uid)
+         await asyncio.to_thread(firebase_auth.delete_user, user_record.uid)
          logger.error(f"Error creating user: {e}")
          raise HTTPException(status_code=500, detail=f"Error creating user in database: {e}")
 
@@ -84,7 +111,7 @@ async def create_user(user: User) -> User:
 
 async def login(user: Login) -> dict:
    api_key = os.getenv("FIREBASE_API_KEY")
-   url = f"https://identitytoolkit.googleapis.com/v1/accounts:signInWithPassword?key={api_key}"
+   url = f"{FIREBASE_AUTH_URL}/v1/accounts:signInWithPassword"
 
    payload = {
        "email": user.email,
@@ -92,7 +119,14 @@ async def login(user: Login) -> dict:
        "returnSecureToken": True
    }
 
-   response = requests.post(url, json=payload)
+   try:
+       response = await post_json(url, payload, params={"key": api_key})
+   except httpx.TimeoutException:
+       raise HTTPException(status_code=504, detail="Authentication service timed out")
+   except httpx.HTTPError as e:
+       logger.error(f"Error calling authentication service: {e}")
+       raise HTTPException(status_code=502, detail="Authentication service unavailable")
+
    response_data = response.json()
 
    if response.status_code != 200:
@@ -101,8 +135,8 @@ async def login(user: Login) -> dict:
             detail=response_data.get("error", {}).get("message", "Login failed")
         )
 
-   coll = get_collection("users")
-   user_data = coll.find_one({"email": user.email})
+   coll = get_async_collection("users")
+   user_data = await coll.find_one({"email": user.email}, collation=CASE_INSENSITIVE)
 
    if not user_data:
        raise HTTPException(status_code=404, detail="User not found")
@@ -1,11 +1,17 @@
 from models.workspaces import Workspace
-from utils.mongodb import get_collection
+from utils.mongodb import lazy_collection
 from bson import ObjectId
 from fastapi import HTTPException
-from pipelines.workspace_pipelines import get_lists_in_workspace_pipeline
+from utils.indexes import CASE_INSENSITIVE
+from utils.workspace_access import prime_workspace_owner, invalidate_workspace_owner
+from utils.response_cache import response_cache
+from pipelines.workspace_pipelines import get_lists_in_workspace_pipeline, get_workspaces_pipeline, get_board_pipeline
+from utils.pagination import decode_cursor, paginate
+from utils.fields import WORKSPACE_FIELDS, BOARD_TASK_FIELDS, parse_fields, find_projection, pick_fields
 
-workspaces_collection = get_collection("workspaces")
-users_collection = get_collection("users")
+workspaces_collection = lazy_collection("workspaces")
+users_collection = lazy_collection("users")
+workspaces_read_collection = lazy_collection("workspaces", read=True)
 
 
 #------------------------------------------------------------------------------------
@@ -16,17 +22,17 @@ async def create_workspace(workspace: Workspace, user_id: str) -> dict:
     """
     try:
         
-        user =  users_collection.find_one({"_id": ObjectId(user_id)})
+        user = await users_collection.find_one({"_id": ObjectId(user_id)})
         if not user:
             return {"success": False, "message": "User not found", "data": None}
 
         workspace.name = workspace.name.strip()
         workspace.description = workspace.description.strip()
 
-        existing_workspace =  workspaces_collection.find_one({
-            "name": {"$regex": f"^{workspace.name}$", "$options": "i"},
-            "id_user": user_id
-        })
+        existing_workspace = await workspaces_collection.find_one(
+            {"id_user": user_id, "name": workspace.name},
+            collation=CASE_INSENSITIVE
+        )
 
         if existing_workspace:
             raise HTTPException(status_code=400, detail="You already have a workspace with that name.")
@@ -34,8 +40,9 @@ async def create_workspace(workspace: Workspace, user_id: str) -> dict:
         workspace_dict = workspace.model_dump(exclude={"id", "id_user"})
         workspace_dict["id_user"] = user_id
 
-        result =  workspaces_collection.insert_one(workspace_dict)
+        result = await workspaces_collection.insert_one(workspace_dict)
         inserted_id = result.inserted_id
+        prime_workspace_owner(str(inserted_id), user_id)
 
         response_data = {
             "id": str(inserted_id),
@@ -51,55 +58,21 @@ async def create_workspace(workspace: Workspace, user_id: str) -> dict:
 
 #------------------------------------------------------------------------------------
 
-async def get_workspaces(skip: int = 0, limit: int = 50, user_id: str = None) -> dict:
+async def get_workspaces(skip: int = 0, limit: int = 50, user_id: str = None, after: str = None, fields: str = None) -> dict:
     
     try:
+        selected = parse_fields(fields, WORKSPACE_FIELDS)
         if user_id:
-            user_exists =  users_collection.find_one({"_id": ObjectId(user_id)})
+            user_exists = await users_collection.find_one({"_id": ObjectId(user_id)}, {"_id": 1})
             if not user_exists:
                 return {"success": False, "message": "User not found", "data": None}
-        
-            pipeline = [
-                {"$match": {"id_user": user_id}},
-                {"$skip": skip},
-                {"$limit": limit},
-                {
-                    "$addFields": {
-                        "id": {"$toString": "$_id"}
-                    }
-                },
-                {
-                    "$project": {
-                        "_id": 0,
-                        "id": 1,
-                        "name": 1,
-                        "description": 1,
-                        "id_user": 1
-                    }
-                }
-            ]
 
-        else:
-              pipeline = [
-                {"$skip": skip},
-                {"$limit": limit},
-                {
-                    "$addFields": {
-                        "id": {"$toString": "$_id"}
-                    }
-                },
-                {
-                    "$project": {
-                        "_id": 0,
-                        "id": 1,
-                        "name": 1,
-                        "description": 1,
-                        "id_user": 1
-                    }
-                }
-            ]
-        cursor = workspaces_collection.aggregate(pipeline)
-        workspaces =  cursor.to_list(length=None)  
+        after_id = decode_cursor(after) if after else None
+        pipeline = get_workspaces_pipeline(user_id, skip=skip, limit=limit, after=after_id, fields=selected)
+
+        cursor = await workspaces_read_collection.aggregate(pipeline)
+        workspaces = await cursor.to_list()
+        workspaces, next_cursor = paginate(workspaces, limit)
 
         if not workspaces:
             return {"success": False, "message": "No workspaces found", "data": None}
@@ -107,37 +80,61 @@ async def get_workspaces(skip: int = 0, limit: int = 50, user_id: str = None) ->
         return {
             "success": True,
             "message": "Workspaces retrieved successfully",
-            "data": workspaces
+            "data": workspaces,
+            "next_cursor": next_cursor
         }
     except Exception as e:
         return {"success": False, "message": str(e), "data": None}
 
 #------------------------------------------------------------------------------------
 
-async def get_workspace_by_id(workspace_id: str, user_id: str ) -> dict:
+async def get_workspace_by_id(workspace_id: str, user_id: str, fields: str = None) -> dict:
     try: 
-        workspace =  workspaces_collection.find_one({"_id": ObjectId(workspace_id)})
+        selected = parse_fields(fields, WORKSPACE_FIELDS)
+
+        workspace = await workspaces_read_collection.find_one({"_id": ObjectId(workspace_id)}, find_projection(selected))
         if not workspace:
             return {"success": False, "message": "Workspace not found", "data": None}
 
-        response_data = {
-            "id": str(workspace["_id"]),
-            "name": workspace["name"],
-            "description": workspace.get("description"),
-            "id_user": workspace["id_user"]
-        }
+        if selected:
+            response_data = pick_fields(workspace, selected)
+        else:
+            response_data = {
+                "id": str(workspace["_id"]),
+                "name": workspace["name"],
+                "description": workspace.get("description"),
+                "id_user": workspace["id_user"]
+            }
 
         return {"success": True, "message": "Workspace retrieved successfully", "data": response_data}
     except Exception as e:
         return {"success": False, "message": str(e), "data": None}
 
+#------------------------------------------------------------------------------------
+
+async def get_board(workspace_id: str, task_fields: str = None) -> dict:
+    """
+    Workspace, listas y tareas agrupadas por lista en una sola agregación.
+    task_fields limita los campos de cada tarea (BOARD_TASK_FIELDS)
+    """
+    try:
+        selected = parse_fields(task_fields, BOARD_TASK_FIELDS)
+        cursor = await workspaces_read_collection.aggregate(get_board_pipeline(workspace_id, task_fields=selected))
+        board = await cursor.to_list()
+        if not board:
+            return {"success": False, "message": "Workspace not found", "data": None}
+
+        return {"success": True, "message": "Board retrieved successfully", "data": board[0]}
+    except Exception as e:
+        return {"success": False, "message": str(e), "data": None}
+
 
 #------------------------------------------------------------------------------------
 
 async def update_workspace(workspace_id: str, user_id: str, workspace: Workspace) -> dict:
     try:
         workspace = Workspace(**workspace) 
-        workspace_data =  workspaces_collection.find_one({"_id": ObjectId(workspace_id)})
+        workspace_data = await workspaces_collection.find_one({"_id": ObjectId(workspace_id)})
         if not workspace_data:
             return {"success": False, "message": "Workspace not found", "data": None}
 
@@ -155,11 +152,10 @@ async def update_workspace(workspace_id: str, user_id: str, workspace: Workspace
         if workspace.name == workspace_data["name"] and workspace.description == workspace_data["description"]:
             return {"success": False, "message": "You are not making changes to the workspace", "data": None}
 
-        existing_workspace =  workspaces_collection.find_one({
-                "name": {"$regex": f"^{workspace.name}$", "$options": "i"},
-                "id_user": user_id,
-                "_id": {"$ne": ObjectId(workspace_id)}
-                 })
+        existing_workspace = await workspaces_collection.find_one(
+            {"id_user": user_id, "name": workspace.name, "_id": {"$ne": ObjectId(workspace_id)}},
+            collation=CASE_INSENSITIVE
+        )
 
 
         if workspace.description == workspace_data["description"]:
@@ -167,10 +163,11 @@ async def update_workspace(workspace_id: str, user_id: str, workspace: Workspace
                 raise HTTPException(status_code=400, detail="You already have a workspace with that name.")
             
 
-        result =  workspaces_collection.update_one(
+        result = await workspaces_collection.update_one(
             {"_id": ObjectId(workspace_id)},
-            {"$set": workspace.model_dump(exclude={"id"})}
+            {"$set": workspace.model_dump(exclude={"id"}), "$inc": {"version": 1}}
         )
+        invalidate_workspace_owner(workspace_id)
      
         if result.modified_count == 0:
             return {"success": False, "message": "Workspace not found", "data": None}  
@@ -196,7 +193,7 @@ async def update_workspace(workspace_id: str, user_id: str, workspace: Workspace
 async def delete_workspace(workspace_id: str, user_id: str) -> dict:
      try:
 
-        workspace =  workspaces_collection.find_one({"_id": ObjectId(workspace_id)})
+        workspace = await workspaces_collection.find_one({"_id": ObjectId(workspace_id)})
 
         if not workspace:
             return {"success": False, "message": "Workspace not found", "data": None}
@@ -205,8 +202,8 @@ async def delete_workspace(workspace_id: str, user_id: str) -> dict:
             return {"success": False, "message": "You are not authorized to delete this workspace", "data": None}
 
         pipeline = get_lists_in_workspace_pipeline(workspace_id)
-        cursor = workspaces_collection.aggregate(pipeline)
-        result =  list(cursor)
+        cursor = await workspaces_collection.aggregate(pipeline)
+        result = await cursor.to_list()
 
         if not result:
             return {"success": False, "message": "Workspace not found", "data": None}
@@ -215,7 +212,9 @@ async def delete_workspace(workspace_id: str, user_id: str) -> dict:
         if list_count > 0:
             return {"success": False, "message": "Workspace has associated lists and cannot be deleted", "data": None}
 
-        workspaces_collection.delete_one({"_id": ObjectId(workspace_id)})
+        await workspaces_collection.delete_one({"_id": ObjectId(workspace_id)})
+        invalidate_workspace_owner(workspace_id)
+        await response_cache.invalidate(workspace_id)
         return {"success": True, "message": "Workspace deleted successfully", "data": None}
 
      except Exception as e:
@@ -1,8 +1,13 @@
-import uvicorn 
+import time
+_import_started = time.perf_counter()
+
+import asyncio
 import logging
 
-from fastapi import FastAPI ,requests
-from controllers.users import create_user ,login
+from contextlib import asynccontextmanager
+from fastapi import FastAPI ,requests, Depends, Query
+from fastapi.responses import PlainTextResponse
+from controllers.users import create_user ,login, initialize_firebase
 
 from models.users import User
 from models.login import Login
@@ -11,8 +16,58 @@ from routes.workspaces import router as workspaces_router
 from routes.tasks import router as tasks_router
 from routes.lists import router as lists_router
 from fastapi.middleware.cors import CORSMiddleware
+from utils.mongodb import get_async_mongo_client, close_mongo_clients, pool_config
+from utils.indexes import ensure_indexes
+from utils.http import init_http_client, close_http_client
+from utils.rank_rebalance import rebalance_loop
+from utils.workspace_access import begin_request_scope, end_request_scope, workspace_cache_stats
+from utils.security import token_cache_stats, require_admin, require_metrics_token
+from utils.response_cache import response_cache
+from utils.change_events import change_hub
+from utils.metrics import metrics_middleware, render_metrics, pool_stats
+from utils.slow_queries import slow_query_recorder, slow_query_middleware
+from utils.startup import record_import, startup_phase, startup_finished, startup_report
+from utils.worker_state import publish_loop, remove_state, other_workers, readiness, is_leader
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Los clientes se crean aquí y no al importar los módulos
+    with startup_phase("mongo_client"):
+        get_async_mongo_client()
+    with startup_phase("firebase"):
+        try:
+            await asyncio.to_thread(initialize_firebase)
+        except Exception as e:
+            # create_user lo vuelve a intentar y responde 500 si sigue fallando
+            logger.error(f"Firebase initialization failed: {e}")
+    # Con varios workers (server.py) solo el líder revisa y crea los índices
+    if is_leader():
+        with startup_phase("indexes"):
+            try:
+                await ensure_indexes()
+            except Exception as e:
+                logger.error(f"Index bootstrap failed: {e}")
+    with startup_phase("http_client"):
+        init_http_client()
+    rebalance_task = asyncio.create_task(rebalance_loop())
+    state_task = asyncio.create_task(publish_loop())
+    startup_finished()
+    report = startup_report()
+    logger.info(f"Startup finished: import {report['import_seconds']}s, startup {report['startup_seconds']}s {report['phases']}")
+    yield
+    rebalance_task.cancel()
+    state_task.cancel()
+    remove_state()
+    await change_hub.stop()
+    await close_http_client()
+    await close_mongo_clients()
+
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -22,8 +77,22 @@ app.add_middleware(
     allow_headers=["*"],  # Allow all headers
 )
 
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
+
+@app.middleware("http")
+async def workspace_request_scope(request, call_next):
+    token = begin_request_scope()
+    try:
+        return await call_next(request)
+    finally:
+        end_request_scope(token)
+
+
+if slow_query_recorder is not None:
+    app.middleware("http")(slow_query_middleware)
+
+# Se registra al final para que sea el middleware más externo y mida todo el request
+app.middleware("http")(metrics_middleware)
+
 
 app.include_router(workspaces_router)
 app.include_router(tasks_router)
@@ -49,19 +118,64 @@ def health_check():
         }
 
 @app.get("/ready")
-def readiness_check():
+async def readiness_check():
     try:
-        from utils.mongodb import get_collection
-        db_status = test_connection()
+        from utils.mongodb import t_connection_async
+        db_status = await t_connection_async()
+        workers = readiness(db_status)
 
-        return {"status": "ready" if db_status else "not ready",
+        return {"status": "ready" if workers["ready"] else "not ready",
                 "database":"connected" if db_status else "not connected",
-                "service": "Trello Clone API"
+                "service": "Trello Clone API",
+                "workers": workers["workers"]
                }
     except Exception as e:
         return {"status": "not ready", "error": str(e)}
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics(authorized: None = Depends(require_metrics_token)):
+    # Prometheus envía METRICS_TOKEN como bearer_token en su scrape_config
+    others = [state["metrics"] for state in other_workers()]
+    return PlainTextResponse(render_metrics(others), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/stats/cache")
+def cache_stats(admin: dict = Depends(require_admin)):
+    return {
+        "workspace_owner": workspace_cache_stats(),
+        "jwt_claims": token_cache_stats(),
+        "responses": response_cache.stats(),
+        "change_events": change_hub.stats()
+    }
+
+
+@app.get("/stats/startup")
+def startup_stats(admin: dict = Depends(require_admin)):
+    return startup_report()
+
+
+@app.get("/stats/pool")
+def mongo_pool_stats(admin: dict = Depends(require_admin)):
+    return {
+        "config": pool_config(),
+        "servers": pool_stats()
+    }
+
+
+@app.get("/debug/slow-queries")
+def slow_queries(
+    limit: int = Query(default=50, ge=1, le=1000),
+    admin: dict = Depends(require_admin)
+):
+    if slow_query_recorder is None:
+        return {"enabled": False, "threshold_ms": None, "data": []}
+    return {
+        "enabled": True,
+        "threshold_ms": slow_query_recorder.threshold_ms,
+        "explain": slow_query_recorder.explain,
+        "data": slow_query_recorder.recent(limit)
+    }
 
 
 @app.post("/users")
@@ -74,4 +188,7 @@ async def register_user(user: User) -> User:
 
 @app.post("/login")
 async def login_access(l: Login) -> dict:
-    return await login(l)
\ No newline at end of file
+    return await login(l)
+
+
+record_import(time.perf_counter() - _import_started)
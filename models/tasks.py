@@ -1,5 +1,5 @@
 from  pydantic import BaseModel, Field, field_validator
-from typing import Optional
+from typing import Optional, List
 from datetime import datetime
 import re
 
@@ -44,5 +44,35 @@ class Task(BaseModel):
             raise ValueError("Title must contain only alphanumeric characters and spaces.")
         return value
 
-    
-    
\ No newline at end of file
+
+MAX_TASKS_PER_BATCH = 1000
+
+
+class TaskBatch(BaseModel):
+    tasks: List[Task] = Field(
+        description="Tasks to create in the list",
+        min_length=1,
+        max_length=MAX_TASKS_PER_BATCH
+    )
+
+
+class TaskMoveBatch(BaseModel):
+    task_ids: List[str] = Field(
+        description="IDs of the tasks to move",
+        min_length=1,
+        max_length=MAX_TASKS_PER_BATCH
+    )
+
+    new_list_id: str = Field(
+        description="ID of the list the tasks are moved to"
+    )
+
+    prev_task_id: Optional[str] = Field(
+        default=None,
+        description="Task in the target list that will be right before the moved tasks"
+    )
+
+    next_task_id: Optional[str] = Field(
+        default=None,
+        description="Task in the target list that will be right after the moved tasks"
+    )
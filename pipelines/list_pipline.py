@@ -1,47 +1,60 @@
 from bson import ObjectId
+from utils.pagination import keyset_stages
+from utils.fields import select_projection
 
-def get_lists_by_workspace_pipeline(workspace_id: str) -> list:
+# Orden de la paginación por cursor: (rank, _id), índice id_workspace_rank
+LIST_ORDER = ("rank",)
+
+def get_lists_by_workspace_pipeline(workspace_id: str, after: tuple = None, limit: int = None, fields: tuple = None) -> list:
     """
-    Pipeline para obtener todas las listas de un workspace específico
+    Pipeline para obtener todas las listas de un workspace específico.
+    Se ordenan por rank; con limit se pagina por (rank, _id) y after es la tupla de
+    decode_keyset_cursor(cursor, LIST_ORDER).
+    id sale como ObjectId; FastJSONResponse lo escribe como texto.
+    fields (parse_fields) recorta el $project a los campos pedidos
     """
-    return [
+    pipeline = [
         {
             "$match": {
                 "id_workspace": workspace_id
             }
-        },
-        {
-            "$addFields": {
-                "id": {"$toString": "$_id"}
-            }
-        },
-        {
-            "$project": {
-                "_id": 0,
-                "id": 1,
-                "title": 1,
-                "description": 1,
-                "id_workspace": 1
-            }
-        },
-        {
-            "$sort": {
-                "title": 1
-            }
         }
     ]
 
+    if limit:
+        pipeline.extend(keyset_stages(after, limit, LIST_ORDER))
+        # El cursor de la siguiente página necesita el rank aunque no se haya pedido
+        fields = fields and tuple(dict.fromkeys((*fields, *LIST_ORDER)))
+    else:
+        pipeline.append({"$sort": {"rank": 1, "title": 1}})
+
+    pipeline.append({
+        "$project": select_projection({
+            "_id": 0,
+            "id": "$_id",
+            "title": 1,
+            "description": 1,
+            "id_workspace": 1,
+            "rank": 1
+        }, fields)
+    })
+    return pipeline
+
 def get_list_by_name_in_workspace_pipeline(workspace_id: str, title: str) -> list:
+    """
+    Pipeline para buscar una lista por título dentro de un workspace.
+    Se debe ejecutar con la collation CASE_INSENSITIVE para usar el índice id_workspace_title_ci
+    """
     return [
          {
             "$match": {
                 "id_workspace": workspace_id,
-                "title": {
-                    "$regex": f"^{title}$",
-                    "$options": "i"  
-                }
+                "title": title
             }
         },
+        {
+            "$limit": 1
+        },
         {
             "$project": {
                 "_id": { "$toString": "$_id" },
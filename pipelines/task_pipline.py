@@ -1,35 +1,25 @@
 from bson import ObjectId
+from utils.pagination import keyset_stages
+from utils.fields import select_projection
+from utils.search import prefix_regex
+
+# Orden de la paginación por cursor: (id_list, rank, _id), índice id_workspace_id_list_rank
+TASK_ORDER = ("id_list", "rank")
 
 def get_task_by_title_in_workspace_pipeline(workspace_id: str, title: str) -> list:
+      """
+      Pipeline para buscar una tarea por título dentro de un workspace.
+      Se debe ejecutar con la collation CASE_INSENSITIVE para usar el índice id_workspace_title_ci
+      """
       return [
         {
             "$match": {
-                "title": {
-                    "$regex": f"^{title}$",
-                    "$options": "i"
-                }
-            }
-        },
-        {
-            "$addFields": {
-                "id_list_obj": { "$toObjectId": "$id_list" }
+                "id_workspace": workspace_id,
+                "title": title
             }
         },
         {
-            "$lookup": {
-                "from": "lists",
-                "localField": "id_list_obj",
-                "foreignField": "_id",
-                "as": "list_data"
-            }
-        },
-        {
-            "$unwind": "$list_data"
-        },
-        {
-            "$match": {
-                "list_data.id_workspace": workspace_id   
-            }
+            "$limit": 1
         },
         {
             "$project": {
@@ -38,42 +28,106 @@ def get_task_by_title_in_workspace_pipeline(workspace_id: str, title: str) -> li
         }
     ]
 
-def get_tasks_by_workspace_pipeline(workspace_id: str) -> list:
-    return [
-        {
-           
-            "$addFields": {
-                "id_list_obj": {"$toObjectId": "$id_list"}
-            }
-        },
-        {
-            "$lookup": {
-                "from": "lists",
-                "localField": "id_list_obj",
-                "foreignField": "_id",
-                "as": "list_data"
-            }
-        },
-        {
-            "$unwind": "$list_data"
-        },
+def get_tasks_by_titles_in_workspace_pipeline(workspace_id: str, titles: list) -> list:
+      """
+      Pipeline para revisar de una sola vez qué títulos ya existen en un workspace.
+      Se debe ejecutar con la collation CASE_INSENSITIVE para usar el índice id_workspace_title_ci
+      """
+      return [
         {
             "$match": {
-                "list_data.id_workspace": workspace_id
+                "id_workspace": workspace_id,
+                "title": {"$in": titles}
             }
         },
         {
-            "$sort": {
-                "id_list": 1
+            "$project": {
+                "_id": 0,
+                "title": 1
             }
-        },
+        }
+    ]
+
+def get_tasks_by_workspace_pipeline(workspace_id: str, after: tuple = None, limit: int = None, fields: tuple = None) -> list:
+    """
+    Pipeline para obtener las tareas de un workspace con el título de su lista.
+    Filtra primero por id_workspace (guardado en cada tarea) y solo después une con lists.
+    Se ordenan por lista y rank; con limit se pagina por (id_list, rank, _id), after es la
+    tupla de decode_keyset_cursor(cursor, TASK_ORDER) y el $lookup solo se hace para la página pedida.
+    Con fields (parse_fields) se recorta el $project, y si no se pidió list_title no se une con lists
+    """
+    pipeline = [
         {
-            "$project": {
-                "_id": {"$toString": "$_id"},
-                "title": 1,
-                "description": 1,
-                "id_list": 1,
-                "list_title": "$list_data.title"
+            "$match": {
+                "id_workspace": workspace_id
             }
         }
-    ]
\ No newline at end of file
+    ]
+
+    if limit:
+        pipeline.extend(keyset_stages(after, limit, TASK_ORDER))
+        # El cursor de la siguiente página necesita id_list y rank aunque no se hayan pedido
+        fields = fields and tuple(dict.fromkeys((*fields, *TASK_ORDER)))
+    else:
+        pipeline.append({"$sort": {"id_list": 1, "rank": 1}})
+
+    project = {
+        "_id": 1,
+        "title": 1,
+        "description": 1,
+        "id_list": 1,
+        "rank": 1,
+        "list_title": "$list_data.title"
+    }
+    if fields is None or "list_title" in fields:
+        pipeline.extend([
+            {
+                "$lookup": {
+                    "from": "lists",
+                    "localField": "id_list_obj",
+                    "foreignField": "_id",
+                    "pipeline": [
+                        {"$project": {"_id": 0, "title": 1}}
+                    ],
+                    "as": "list_data"
+                }
+            },
+            {
+                "$unwind": "$list_data"
+            }
+        ])
+    pipeline.append({"$project": select_projection(project, fields, id_key="_id")})
+    return pipeline
+
+def search_tasks_pipeline(workspace_id: str, words: list, partial: str = None, skip: int = 0, limit: int = 20, fields: tuple = None) -> list:
+    """
+    Pipeline de búsqueda (utils/search.py). Con words usa $text y ordena por relevancia;
+    solo con partial recorre el rango ^partial de id_workspace_title_terms en orden del índice
+    (hay que pasar hint para que el planner no elija otro índice de id_workspace).
+    Pide un documento extra para saber si hay otra página
+    """
+    match = {"id_workspace": workspace_id}
+    if words:
+        match["$text"] = {"$search": " ".join(words)}
+    if partial:
+        match["title_terms"] = {"$regex": prefix_regex(partial)}
+
+    pipeline = [{"$match": match}]
+    if words:
+        pipeline.append({"$sort": {"score": {"$meta": "textScore"}, "_id": 1}})
+    pipeline.extend([
+        {"$skip": skip},
+        {"$limit": limit + 1}
+    ])
+
+    project = select_projection({
+        "_id": 1,
+        "title": 1,
+        "description": 1,
+        "id_list": 1,
+        "rank": 1
+    }, fields, id_key="_id")
+    if words:
+        project["score"] = {"$meta": "textScore"}
+    pipeline.append({"$project": project})
+    return pipeline
@@ -1,4 +1,6 @@
 from bson import ObjectId
+from utils.pagination import keyset_stages
+from utils.fields import select_projection
 
 def get_lists_in_workspace_pipeline(workspace_id: str) -> list:
     return [
@@ -25,4 +27,108 @@ def get_lists_in_workspace_pipeline(workspace_id: str) -> list:
                 "list_count": {"$size": "$lists"}
             }
         }
-    ]
\ No newline at end of file
+    ]
+
+def get_workspaces_pipeline(user_id: str = None, skip: int = 0, limit: int = 50, after: ObjectId = None, fields: tuple = None) -> list:
+    """
+    Pipeline para listar workspaces ordenados por _id.
+    Con after se pagina por cursor (índice id_user_id); sin él se mantiene $skip por compatibilidad.
+    fields (parse_fields) recorta el $project a los campos pedidos
+    """
+    pipeline = [{"$match": {"id_user": user_id}}] if user_id else []
+
+    if after is not None:
+        pipeline.extend(keyset_stages(after, limit))
+    else:
+        pipeline.extend([
+            {"$sort": {"_id": 1}},
+            {"$skip": skip},
+            {"$limit": limit + 1}
+        ])
+
+    pipeline.append({
+        "$project": select_projection({
+            "_id": 0,
+            "id": "$_id",
+            "name": 1,
+            "description": 1,
+            "id_user": 1
+        }, fields)
+    })
+    return pipeline
+
+
+def get_board_pipeline(workspace_id: str, task_fields: tuple = None) -> list:
+    """
+    Pipeline para obtener un tablero completo en una sola consulta:
+    el workspace, sus listas en orden y las tareas de cada lista con su conteo.
+    Los $toString que quedan son llaves de los $lookup (id_workspace e id_list se guardan como texto).
+    task_fields (parse_fields) recorta los campos de cada tarea, p. ej. solo títulos para las tarjetas
+    """
+    return [
+        {
+            "$match": {
+                "_id": ObjectId(workspace_id)
+            }
+        },
+        {
+            "$addFields": {
+                "id_str": {"$toString": "$_id"}
+            }
+        },
+        {
+            "$lookup": {
+                "from": "lists",
+                "localField": "id_str",
+                "foreignField": "id_workspace",
+                "pipeline": [
+                    {"$sort": {"rank": 1, "title": 1}},
+                    {"$addFields": {"id": {"$toString": "$_id"}}},
+                    {
+                        "$lookup": {
+                            "from": "tasks",
+                            "localField": "id",
+                            "foreignField": "id_list",
+                            "pipeline": [
+                                {"$sort": {"rank": 1}},
+                                {
+                                    "$project": select_projection({
+                                        "_id": 0,
+                                        "id": "$_id",
+                                        "title": 1,
+                                        "description": 1,
+                                        "rank": 1
+                                    }, task_fields)
+                                }
+                            ],
+                            "as": "tasks"
+                        }
+                    },
+                    {
+                        "$project": {
+                            "_id": 0,
+                            "id": 1,
+                            "title": 1,
+                            "description": 1,
+                            "rank": 1,
+                            "task_count": {"$size": "$tasks"},
+                            "tasks": 1
+                        }
+                    }
+                ],
+                "as": "lists"
+            }
+        },
+        {
+            "$project": {
+                "_id": 0,
+                "id": "$id_str",
+                "name": 1,
+                "description": 1,
+                "id_user": 1,
+                "list_count": {"$size": "$lists"},
+                "task_count": {"$sum": "$lists.task_count"},
+                "lists": 1
+            }
+        }
+    ]
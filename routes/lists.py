@@ -1,24 +1,30 @@
-from fastapi import APIRouter, HTTPException, Request
-from utils.security import validateuser, validateadmin
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from utils.security import get_current_user
+from utils.responses import FastJSONResponse
+from utils.pagination import MAX_PAGE_SIZE
+from utils.versioning import conditional_get, etag_headers
+from utils.streaming import wants_ndjson, CursorStreamingResponse, CURSOR_BATCH_SIZE, MAX_CURSOR_BATCH_SIZE
 from models.lists import List
 from controllers.lists import (
     create_list,
     get_lists,
+    stream_lists,
     update_list,
     delete_list,
-    get_list_by_id
+    get_list_by_id,
+    move_list
 ) 
 
-router = APIRouter(prefix="/workspaces")
+router = APIRouter(prefix="/workspaces", default_response_class=FastJSONResponse)
 
 @router.post("/{workspace_id}/lists", tags=["Lists"])
-@validateuser
 async def create_list_route(
     workspace_id: str,
     list_data: List,
-    request: Request
+    current_user: dict = Depends(get_current_user)
 ):
-    user_id = request.state.id
+    user_id = current_user["id"]
     result = await create_list(list_data, workspace_id, user_id)
 
     if not result["success"]:
@@ -29,29 +35,44 @@ async def create_list_route(
 # ----------------------------------------------------------------------------------
 
 @router.get("/{workspace_id}/lists", tags=["Lists"])
-@validateuser
-async def get_lists_route(workspace_id: str, request: Request):
-    user_id = request.state.id 
+async def get_lists_route(
+    workspace_id: str,
+    after: Optional[str] = Query(default=None, description="Cursor next_cursor de la página anterior"),
+    limit: Optional[int] = Query(default=None, ge=1, le=MAX_PAGE_SIZE, description="Tamaño de página; sin él se regresan todas las listas"),
+    batch_size: int = Query(default=CURSOR_BATCH_SIZE, ge=1, le=MAX_CURSOR_BATCH_SIZE, description="batchSize del cursor en modo NDJSON"),
+    fields: Optional[str] = Query(default=None, description="Campos a regresar separados por coma, p. ej. title,rank"),
+    request: Request = None,
+    current_user: dict = Depends(get_current_user)
+):
+
+    not_modified, etag, version = await conditional_get(request, workspace_id)
+    if not_modified:
+        return not_modified
 
-    result = await get_lists(workspace_id)
+    if wants_ndjson(request):
+        result = await stream_lists(workspace_id, batch_size=batch_size, fields=fields)
+        if not result["success"]:
+            raise HTTPException(status_code=400, detail=result["message"])
+        return CursorStreamingResponse(result["data"], headers=etag_headers(etag))
+
+    result = await get_lists(workspace_id, after=after, limit=limit, fields=fields, version=version)
 
     if not result["success"]:
         raise HTTPException(status_code=400, detail=result["message"])
 
-    return result
+    return FastJSONResponse(result, headers=etag_headers(etag))
 
 # ----------------------------------------------------------------------------------
 
 @ router.get("/{workspace_id}/lists/{list_id}", tags=["Lists"])
-@validateuser
 async def get_list_by_id_route(
     workspace_id: str,
     list_id: str,
-    request: Request
+    fields: Optional[str] = Query(default=None, description="Campos a regresar separados por coma, p. ej. title,rank"),
+    current_user: dict = Depends(get_current_user)
 ):
-    user_id = request.state.id
 
-    result = await get_list_by_id(list_id=list_id, workspace_id=workspace_id)
+    result = await get_list_by_id(list_id=list_id, workspace_id=workspace_id, fields=fields)
 
     if not result["success"]:
         raise HTTPException(status_code=400, detail=result["message"])
@@ -61,15 +82,14 @@ async def get_list_by_id_route(
 # ----------------------------------------------------------------------------------
 
 @router.put("/{workspace_id}/lists/{list_id}", tags=["Lists"])
-@validateuser
 async def update_list_route(
     workspace_id: str,
     list_id: str,
     list_data: List,
-    request: Request 
+    current_user: dict = Depends(get_current_user)
 ):
 
-    user_id = request.state.id
+    user_id = current_user["id"]
 
     result = await update_list(list_id=list_id, user_id=user_id, list_data=list_data)
 
@@ -81,18 +101,37 @@ async def update_list_route(
 # ----------------------------------------------------------------------------------
 
 @router.delete("/{workspace_id}/lists/{list_id}", tags=["Lists"])
-@validateuser
 async def delete_list_route(
     workspace_id: str,
     list_id: str,
-    request: Request
+    current_user: dict = Depends(get_current_user)
 ):
 
-    user_id = request.state.id
+    user_id = current_user["id"]
 
     result = await delete_list(list_id=list_id, user_id=user_id)
 
     if not result["success"]:
         raise HTTPException(status_code=400, detail=result["message"])
 
-    return result
\ No newline at end of file
+    return result
+
+# ----------------------------------------------------------------------------------
+
+@router.put("/{workspace_id}/lists/{list_id}/move", tags=["Lists"])
+async def move_list_route(
+    workspace_id: str,
+    list_id: str,
+    prev_list_id: Optional[str] = Query(default=None, description="Lista que queda antes"),
+    next_list_id: Optional[str] = Query(default=None, description="Lista que queda después"),
+    current_user: dict = Depends(get_current_user)
+):
+
+    user_id = current_user["id"]
+
+    result = await move_list(list_id, user_id, workspace_id, prev_list_id, next_list_id)
+
+    if not result["success"]:
+        raise HTTPException(status_code=400, detail=result["message"])
+
+    return result
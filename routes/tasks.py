@@ -1,27 +1,36 @@
-from fastapi import APIRouter, HTTPException, Request, Query, Path
-from utils.security import validateuser, validateadmin
-from models.tasks import Task
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query, Depends, Request
+from utils.security import get_current_user
+from utils.responses import FastJSONResponse
+from utils.pagination import MAX_PAGE_SIZE
+from utils.search import DEFAULT_SEARCH_LIMIT, MAX_SEARCH_LIMIT, MAX_SEARCH_SKIP
+from utils.versioning import conditional_get, etag_headers
+from utils.streaming import wants_ndjson, CursorStreamingResponse, CURSOR_BATCH_SIZE, MAX_CURSOR_BATCH_SIZE
+from models.tasks import Task, TaskBatch, TaskMoveBatch
 from controllers.tasks import (
     create_task,
+    create_tasks_batch,
     get_task_by_id,
     update_task,
     delete_task,
     move_task_to_list,
-    get_tasks_by_workspace
+    move_tasks_to_list,
+    get_tasks_by_workspace,
+    stream_tasks_by_workspace,
+    search_tasks
 )
 
-router = APIRouter(prefix="/workspaces")
+router = APIRouter(prefix="/workspaces", default_response_class=FastJSONResponse)
 
 
 @router.post("/{workspace_id}/lists/{list_id}/tasks", tags=["Tasks"])
-@validateuser
 async def create_task_route(
-    request: Request,
     workspace_id: str,
     list_id: str,
     task_data: Task,
+    current_user: dict = Depends(get_current_user)
 ):
-    user_id = request.state.id
+    user_id = current_user["id"]
     result = await create_task(user_id, workspace_id, task_data, list_id)
 
     if not result["success"]:
@@ -31,35 +40,99 @@ async def create_task_route(
 
 #------------------------------------------------------------------------------------------
 
+@router.post("/{workspace_id}/lists/{list_id}/tasks:batch", tags=["Tasks"])
+async def create_tasks_batch_route(
+    workspace_id: str,
+    list_id: str,
+    batch: TaskBatch,
+    current_user: dict = Depends(get_current_user)
+):
+    user_id = current_user["id"]
+    result = await create_tasks_batch(user_id, workspace_id, batch.tasks, list_id)
+
+    if not result["success"]:
+        raise HTTPException(status_code=400, detail=result["message"])
+
+    return result
+
+#------------------------------------------------------------------------------------------
+
 @router.get("/{workspace_id}/tasks/{task_id}", tags=["Tasks"])
-@validateuser
-async def get_task_route(workspace_id: str, task_id: str, request: Request):
+async def get_task_route(
+    workspace_id: str,
+    task_id: str,
+    fields: Optional[str] = Query(default=None, description="Campos a regresar separados por coma, p. ej. title,rank"),
+    current_user: dict = Depends(get_current_user)
+):
 
-    task = await get_task_by_id(task_id,workspace_id)
+    task = await get_task_by_id(task_id, workspace_id, fields=fields)
     return {"success": True, "message": "Task retrieved successfully", "data": task}
 
 #-----------------------------------------------------------------------------------------------
 
 @router.get("/{workspace_id}/tasks", tags=["Tasks"])
-@validateuser
-async def get_task_route(request: Request, workspace_id: str):
-    result = await get_tasks_by_workspace(workspace_id)
+async def get_tasks_route(
+    workspace_id: str,
+    after: Optional[str] = Query(default=None, description="Cursor next_cursor de la página anterior"),
+    limit: Optional[int] = Query(default=None, ge=1, le=MAX_PAGE_SIZE, description="Tamaño de página; sin él se regresan todas las tareas"),
+    batch_size: int = Query(default=CURSOR_BATCH_SIZE, ge=1, le=MAX_CURSOR_BATCH_SIZE, description="batchSize del cursor en modo NDJSON"),
+    fields: Optional[str] = Query(default=None, description="Campos a regresar separados por coma, p. ej. title,rank"),
+    request: Request = None,
+    current_user: dict = Depends(get_current_user)
+):
+    not_modified, etag, version = await conditional_get(request, workspace_id)
+    if not_modified:
+        return not_modified
+
+    if wants_ndjson(request):
+        result = await stream_tasks_by_workspace(workspace_id, batch_size=batch_size, fields=fields)
+        if not result["success"]:
+            raise HTTPException(status_code=400, detail=result["message"])
+        return CursorStreamingResponse(result["data"], headers=etag_headers(etag))
+
+    result = await get_tasks_by_workspace(workspace_id, after=after, limit=limit, fields=fields, version=version)
 
     if not result["success"]:
         raise HTTPException(status_code=400, detail=result["message"])
-    return result
+    return FastJSONResponse(result, headers=etag_headers(etag))
+
+#---------------------------------------------------------------------------------------------
+
+@router.get("/{workspace_id}/search", tags=["Tasks"])
+async def search_tasks_route(
+    workspace_id: str,
+    q: str = Query(..., min_length=1, max_length=200, description="Texto a buscar en título y descripción"),
+    prefix: bool = Query(default=True, description="Tomar la última palabra como prefijo (type-ahead)"),
+    skip: int = Query(default=0, ge=0, le=MAX_SEARCH_SKIP, description="Número de resultados a omitir"),
+    limit: int = Query(default=DEFAULT_SEARCH_LIMIT, ge=1, le=MAX_SEARCH_LIMIT, description="Número de resultados a obtener"),
+    fields: Optional[str] = Query(default=None, description="Campos a regresar separados por coma, p. ej. title,rank"),
+    request: Request = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Búsqueda por relevancia dentro del workspace. Mientras se escribe, la última palabra
+    se busca como prefijo del título; con un espacio al final se busca como palabra completa
+    """
+    not_modified, etag, version = await conditional_get(request, workspace_id)
+    if not_modified:
+        return not_modified
+
+    result = await search_tasks(workspace_id, q, prefix=prefix, skip=skip, limit=limit, fields=fields, version=version)
+
+    if not result["success"]:
+        raise HTTPException(status_code=400, detail=result["message"])
+    return FastJSONResponse(result, headers=etag_headers(etag))
 
 #---------------------------------------------------------------------------------------------
 
 @router.put("/{workspace_id}/tasks/{id_task}", tags=["Tasks"])
-@validateuser
 async def update_task_route(
     id_task: str,
     workspace_id: str,
     task : Task,
-    request: Request
+    current_user: dict = Depends(get_current_user)
 ):
-    user_id = request.state.id  
+    user_id = current_user["id"]
     
     result = await update_task(user_id, id_task, workspace_id, task)
     
@@ -71,13 +144,12 @@ async def update_task_route(
 #-------------------------------------------------------------------------------------------------
 
 @router.delete("/{workspace_id}/tasks/{task_id}", tags=["Tasks"])
-@validateuser
 async def delete_task_route(
     workspace_id: str,
     task_id: str,
-    request: Request 
+    current_user: dict = Depends(get_current_user)
 ):
-    user_id = request.state.id
+    user_id = current_user["id"]
 
     result = await delete_task(task_id,user_id)
 
@@ -89,14 +161,34 @@ async def delete_task_route(
 #----------------------------------------------------------------------------------------------
 
 @router.put("/{workspace_id}/tasks/{task_id}/move", tags=["Tasks"])
-@validateuser
 async def move_task_route(
-    request: Request,
     workspace_id: str,
     task_id: str,
     new_list_id: str = Query(..., description="ID de la nueva lista"),
+    prev_task_id: Optional[str] = Query(default=None, description="Tarea que queda antes en la nueva lista"),
+    next_task_id: Optional[str] = Query(default=None, description="Tarea que queda después en la nueva lista"),
+    current_user: dict = Depends(get_current_user)
 ):
-    result = await move_task_to_list(workspace_id, task_id, new_list_id)
+    result = await move_task_to_list(workspace_id, task_id, new_list_id, prev_task_id, next_task_id)
     if not result["success"]:
         raise HTTPException(status_code=400, detail=result["message"])
     return result
+
+#----------------------------------------------------------------------------------------------
+
+@router.post("/{workspace_id}/tasks:move", tags=["Tasks"])
+async def move_tasks_route(
+    workspace_id: str,
+    batch: TaskMoveBatch,
+    current_user: dict = Depends(get_current_user)
+):
+    user_id = current_user["id"]
+    result = await move_tasks_to_list(
+        user_id, workspace_id, batch.task_ids, batch.new_list_id,
+        prev_task_id=batch.prev_task_id, next_task_id=batch.next_task_id
+    )
+
+    if not result["success"]:
+        raise HTTPException(status_code=400, detail=result["message"])
+
+    return result
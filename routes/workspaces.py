@@ -1,20 +1,27 @@
-from fastapi import APIRouter, Query, HTTPException, Request, Path, Body
-from utils.security import validateuser, validateadmin
+from typing import Optional
+from fastapi import APIRouter, Query, HTTPException, Path, Body, Depends, Request, Header
+from fastapi.responses import StreamingResponse
+from bson.errors import InvalidId
+from utils.security import get_current_user
+from utils.responses import FastJSONResponse
+from utils.versioning import conditional_get, etag_headers
+from utils.workspace_access import get_workspace_owner
+from utils.change_events import change_hub
 from models.workspaces import Workspace
 from controllers.workspaces import (
     create_workspace,
     get_workspaces,
     get_workspace_by_id,
+    get_board,
     update_workspace,
     delete_workspace
 )
 
-router = APIRouter(prefix="/workspaces")
+router = APIRouter(prefix="/workspaces", default_response_class=FastJSONResponse)
 
 @router.post("", tags=["Workspaces"])
-@validateuser
-async def create_workspace_route(workspace: Workspace, request: Request) -> dict:
-    user_id = request.state.id
+async def create_workspace_route(workspace: Workspace, current_user: dict = Depends(get_current_user)) -> dict:
+    user_id = current_user["id"]
     result = await create_workspace(workspace, user_id)
 
     if not result["success"]:
@@ -23,42 +30,85 @@ async def create_workspace_route(workspace: Workspace, request: Request) -> dict
     return result
 
 @router.get("", tags=["Workspaces"])
-@validateuser
 async def get_workspaces_route(
-    request: Request,
     skip: int = Query(default=0, ge=0, description="Número de registros a omitir"),
-    limit: int = Query(default=50, ge=1, le=100, description="Número de registros a obtener")
+    limit: int = Query(default=50, ge=1, le=100, description="Número de registros a obtener"),
+    after: Optional[str] = Query(default=None, description="Cursor next_cursor de la página anterior"),
+    fields: Optional[str] = Query(default=None, description="Campos a regresar separados por coma, p. ej. title,rank"),
+    current_user: dict = Depends(get_current_user)
 ):
-    user_id = request.state.id
+    user_id = current_user["id"]
 
-    result = await get_workspaces(skip=skip, limit=limit, user_id=user_id)
+    result = await get_workspaces(skip=skip, limit=limit, user_id=user_id, after=after, fields=fields)
 
-    return result
+    return FastJSONResponse(result)
  
 
 @router.get("{workspace_id}", tags=["Workspaces"])
-@validateuser
 async def get_workspace_by_id_route(
     workspace_id: str = Path(..., description="ID of the workspace to retrieve"),
-    request: Request = None
+    fields: Optional[str] = Query(default=None, description="Campos a regresar separados por coma, p. ej. title,rank"),
+    current_user: dict = Depends(get_current_user)
 ):
-    user_id = request.state.id
+    user_id = current_user["id"]
 
-    result = await get_workspace_by_id(workspace_id, user_id)
+    result = await get_workspace_by_id(workspace_id, user_id, fields=fields)
 
     return result
 
 
+@router.get("/{workspace_id}/board", tags=["Workspaces"])
+async def get_board_route(
+    workspace_id: str = Path(..., description="ID of the workspace to retrieve"),
+    task_fields: Optional[str] = Query(default=None, description="Campos de cada tarea separados por coma, p. ej. title para las tarjetas"),
+    request: Request = None,
+    current_user: dict = Depends(get_current_user)
+):
+    not_modified, etag, version = await conditional_get(request, workspace_id)
+    if not_modified:
+        return not_modified
+
+    result = await get_board(workspace_id, task_fields=task_fields)
+
+    if not result["success"]:
+        raise HTTPException(status_code=400, detail=result["message"])
+
+    return FastJSONResponse(result, headers=etag_headers(etag))
+
+
+@router.get("/{workspace_id}/events", tags=["Workspaces"])
+async def workspace_events_route(
+    workspace_id: str = Path(..., description="ID of the workspace to follow"),
+    last_event_id: Optional[str] = Header(default=None, description="Último id recibido, para reanudar"),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Server-Sent Events con los cambios de listas y tareas del workspace
+    (list.inserted, task.updated, task.moved, task.deleted, ...).
+    Un evento "reset" indica que el cliente debe volver a pedir el tablero
+    """
+    try:
+        owner = await get_workspace_owner(workspace_id)
+    except InvalidId:
+        owner = None
+    if not owner:
+        raise HTTPException(status_code=404, detail="Workspace not found")
+
+    return StreamingResponse(
+        change_hub.subscribe(workspace_id, last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 
 @router.put("{workspace_id}", tags=["Workspaces"])
-@validateuser
 async def update_workspace_route(
     workspace_id: str,
     body: dict = Body(...),
-    request: Request = None
+    current_user: dict = Depends(get_current_user)
 ) -> dict:
 
-    user_id = request.state.id
+    user_id = current_user["id"]
 
     result = await update_workspace(workspace_id, user_id, body)
 
@@ -66,13 +116,12 @@ async def update_workspace_route(
 
 
 @router.delete("{workspace_id}", tags=["Workspaces"])
-@validateuser
 async def delete_workspace_route(
     workspace_id: str = Path(..., description="ID of the workspace to delete"),
-    request: Request = None
+    current_user: dict = Depends(get_current_user)
 ):
-    user_id = request.state.id
+    user_id = current_user["id"]
 
     result = await delete_workspace(workspace_id, user_id)
 
-    return result
\ No newline at end of file
+    return result
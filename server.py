@@ -0,0 +1,70 @@
+"""
+Entrada de producción con varios workers de uvicorn.
+
+    python server.py
+
+WEB_CONCURRENCY fija el número de workers; por defecto se usa uno por CPU disponible
+para el contenedor (cuota de cgroup o afinidad). uvicorn arranca cada worker como un
+proceso nuevo (spawn) que importa main por su cuenta, así que el cliente de MongoDB y
+la app de Firebase se crean dentro de cada worker; utils.mongodb además descarta
+clientes heredados si el pid cambia.
+
+Los workers comparten su estado en WORKER_STATE_DIR para que /ready y /metrics
+respondan por el contenedor completo.
+
+La caché de respuestas se indexa por la versión del workspace (utils.response_cache),
+por lo que el backend memory no sirve datos viejos entre workers; cada worker solo
+guarda su propia copia. Con RESPONSE_CACHE_BACKEND=redis la comparten.
+"""
+import os
+import math
+import shutil
+import tempfile
+
+import uvicorn
+
+
+def available_cpus() -> int:
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+
+    # Límite de CPU del contenedor (cgroup v2): "max 100000" o "<cuota> <periodo>"
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            cpus = min(cpus, max(1, math.ceil(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+
+def main():
+    workers = int(os.getenv("WEB_CONCURRENCY") or 0) or available_cpus()
+    state_dir = os.getenv("WORKER_STATE_DIR")
+    created_state_dir = False
+    if workers > 1 and not state_dir:
+        state_dir = tempfile.mkdtemp(prefix="trello-workers-")
+        created_state_dir = True
+    if state_dir:
+        os.environ["WORKER_STATE_DIR"] = state_dir
+
+    try:
+        uvicorn.run(
+            "main:app",
+            host=os.getenv("HOST", "0.0.0.0"),
+            port=int(os.getenv("PORT", "8000")),
+            workers=workers,
+            proxy_headers=True,
+            forwarded_allow_ips="*",
+            timeout_keep_alive=int(os.getenv("KEEP_ALIVE_TIMEOUT", "5")),
+        )
+    finally:
+        if created_state_dir:
+            shutil.rmtree(state_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
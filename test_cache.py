@@ -0,0 +1,55 @@
+import pytest
+import utils.cache
+from utils.cache import TTLCache, MISSING
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(utils.cache.time, "monotonic", lambda: now[0])
+    return now
+
+def test_get_set_and_stats(clock):
+    cache = TTLCache(maxsize=10, ttl=30)
+    assert cache.get("a") is MISSING
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    assert "a" in cache
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+def test_entries_expire(clock):
+    cache = TTLCache(maxsize=10, ttl=30)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=5)
+    clock[0] += 10
+    assert cache.get("b", None) is None
+    assert "b" not in cache
+    assert cache.get("a") == 1
+    clock[0] += 30
+    assert "a" not in cache
+
+def test_lru_eviction(clock):
+    cache = TTLCache(maxsize=2, ttl=30)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert "a" in cache and "c" in cache
+    assert "b" not in cache
+    assert len(cache) == 2
+
+def test_non_positive_ttl_is_not_stored(clock):
+    cache = TTLCache(maxsize=10, ttl=30)
+    cache.set("a", 1, ttl=0)
+    cache.set("b", 1, ttl=-5)
+    assert len(cache) == 0
+
+def test_pop_and_clear(clock):
+    cache = TTLCache(maxsize=10, ttl=30)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.pop("a")
+    cache.pop("missing")
+    assert "a" not in cache and "b" in cache
+    cache.clear()
+    assert len(cache) == 0
@@ -0,0 +1,30 @@
+import pytest
+from utils.fields import TASK_FIELDS, LIST_FIELDS, parse_fields, select_projection, find_projection, pick_fields
+
+
+def test_parse_fields_none():
+    assert parse_fields(None, TASK_FIELDS) is None
+    assert parse_fields("", TASK_FIELDS) is None
+
+def test_parse_fields_order_and_id():
+    assert parse_fields(" rank,title ", TASK_FIELDS) == ("id", "title", "rank")
+    assert parse_fields("title,rank", TASK_FIELDS) == parse_fields("rank,title", TASK_FIELDS)
+
+def test_parse_fields_unknown():
+    with pytest.raises(ValueError):
+        parse_fields("title,password", TASK_FIELDS)
+
+def test_select_projection():
+    project = {"_id": 0, "id": "$_id", "title": 1, "description": 1, "rank": 1}
+    assert select_projection(project, None) is project
+    assert select_projection(project, ("id", "title")) == {"_id": 0, "id": "$_id", "title": 1}
+
+def test_select_projection_id_key():
+    project = {"_id": 1, "title": 1, "list_title": "$list_data.title"}
+    assert select_projection(project, ("id", "list_title"), id_key="_id") == {"_id": 1, "list_title": "$list_data.title"}
+
+def test_find_projection_and_pick():
+    fields = parse_fields("title", LIST_FIELDS)
+    assert find_projection(None) is None
+    assert find_projection(fields, required=("id_list",)) == {"title": 1, "id_list": 1}
+    assert pick_fields({"_id": 5, "title": "Todo", "id_list": "x"}, fields) == {"id": "5", "title": "Todo"}
@@ -0,0 +1,59 @@
+import pytest
+from bson import ObjectId
+from utils.pagination import encode_cursor, decode_cursor, decode_keyset_cursor, paginate, keyset_stages, keyset_match
+
+
+def test_cursor_round_trip():
+    oid = ObjectId()
+    cursor = encode_cursor(oid)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == oid
+
+@pytest.mark.parametrize("cursor", ["", "not-base64!", "e30", "eyJpZCI6Inh5eiJ9"])
+def test_malformed_cursor_raises(cursor):
+    # "e30" es {} y "eyJpZCI6Inh5eiJ9" es {"id":"xyz"}
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+def test_paginate_last_page_has_no_cursor():
+    items = [{"id": ObjectId()} for _ in range(3)]
+    page, next_cursor = paginate(items, 3)
+    assert page == items and next_cursor is None
+
+def test_paginate_returns_cursor_of_last_item():
+    items = [{"_id": ObjectId()} for _ in range(4)]
+    page, next_cursor = paginate(items, 3, id_field="_id")
+    assert page == items[:3]
+    assert decode_cursor(next_cursor) == items[2]["_id"]
+
+def test_keyset_cursor_round_trip():
+    oid = ObjectId()
+    items = [{"_id": ObjectId(), "id_list": "l1", "rank": "V"}, {"_id": oid, "id_list": "l2", "rank": "W"}, {"_id": ObjectId()}]
+    _, next_cursor = paginate(items, 2, id_field="_id", keys=("id_list", "rank"))
+    assert decode_keyset_cursor(next_cursor, ("id_list", "rank")) == ("l2", "W", oid)
+
+def test_keyset_cursor_without_keys_is_invalid():
+    with pytest.raises(ValueError):
+        decode_keyset_cursor(encode_cursor(ObjectId()), ("rank",))
+
+def test_keyset_stages_order_by_keys_then_id():
+    oid = ObjectId()
+    match, sort, limit = keyset_stages(("V", oid), 10, ("rank",))
+    assert match == {"$match": {"$or": [{"rank": {"$gt": "V"}}, {"rank": "V", "_id": {"$gt": oid}}]}}
+    assert list(sort["$sort"]) == ["rank", "_id"]
+    assert limit == {"$limit": 11}
+
+def test_keyset_cursor_with_missing_rank():
+    oid = ObjectId()
+    page, next_cursor = paginate([{"id": oid}, {"id": ObjectId()}], 1, keys=("rank",))
+    after = decode_keyset_cursor(next_cursor, ("rank",))
+    assert after == (None, oid)
+    assert keyset_match(("rank",), after) == {"$or": [
+        {"rank": {"$ne": None}},
+        {"rank": None, "_id": {"$gt": oid}},
+    ]}
+
+def test_keyset_stages_by_id_only():
+    oid = ObjectId()
+    assert keyset_stages(oid, 5)[0] == {"$match": {"_id": {"$gt": oid}}}
+    assert keyset_stages(None, 5) == [{"$sort": {"_id": 1}}, {"$limit": 6}]
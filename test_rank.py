@@ -0,0 +1,62 @@
+import random
+import pytest
+from utils.rank import rank_between, rank_after, ranks_between, spread_ranks, DIGITS, RankBoundsError
+
+
+def test_rank_between_orders():
+    ranks = [None, "1", "V", "V1", "W", "z", "zz"]
+    for low, high in zip(ranks, ranks[1:]):
+        middle = rank_between(low, high)
+        assert (low or "") < middle < high, f"{low} < {middle} < {high}"
+        assert not middle.endswith(DIGITS[0])
+
+def test_rank_between_adjacent():
+    middle = rank_between("V", "W")
+    assert "V" < middle < "W"
+
+def test_rank_between_invalid():
+    with pytest.raises(ValueError):
+        rank_between("W", "V")
+
+def test_equal_bounds_need_rebalance():
+    # Dos altas concurrentes al final calculan el mismo rank_after
+    duplicated = rank_after("1")
+    assert duplicated == rank_after("1")
+    with pytest.raises(RankBoundsError):
+        rank_between(duplicated, duplicated)
+    with pytest.raises(RankBoundsError):
+        ranks_between(duplicated, duplicated, 3)
+    fixed = spread_ranks(2)
+    assert fixed[0] < rank_between(*fixed) < fixed[1]
+
+def test_random_inserts_keep_order():
+    ranks = [rank_after(None)]
+    rng = random.Random(7)
+    for _ in range(2000):
+        i = rng.randint(0, len(ranks))
+        low = ranks[i - 1] if i > 0 else None
+        high = ranks[i] if i < len(ranks) else None
+        ranks.insert(i, rank_between(low, high))
+    assert ranks == sorted(ranks)
+    assert len(set(ranks)) == len(ranks)
+
+def test_rank_after_stays_short():
+    rank = None
+    for _ in range(500):
+        new_rank = rank_after(rank)
+        assert rank is None or new_rank > rank
+        rank = new_rank
+    assert len(rank) <= 10
+
+def test_ranks_between_count():
+    ranks = ranks_between("A", "B", 100)
+    assert len(ranks) == 100
+    assert ranks == sorted(ranks)
+    assert "A" < ranks[0] and ranks[-1] < "B"
+
+def test_spread_ranks():
+    ranks = spread_ranks(10000)
+    assert len(ranks) == 10000
+    assert ranks == sorted(ranks)
+    assert len(set(ranks)) == len(ranks)
+    assert rank_after(ranks[-1]) > ranks[-1]
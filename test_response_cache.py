@@ -0,0 +1,144 @@
+import asyncio
+from utils.response_cache import ResponseCache, MemoryBackend, RedisBackend, cache_key
+
+
+class FakeRedisServer:
+    """Servidor RESP mínimo con los comandos que usa RedisBackend"""
+
+    def __init__(self):
+        self.data = {}
+        self.server = None
+        # SET sobre estas llaves contesta -OOM, como un Redis sin memoria
+        self.fail_keys = set()
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _read_command(self, reader):
+        line = await reader.readline()
+        if not line:
+            return None
+        args = []
+        for _ in range(int(line[1:-2])):
+            length = int((await reader.readline())[1:-2])
+            args.append((await reader.readexactly(length + 2))[:-2])
+        return args
+
+    def _execute(self, args):
+        name = args[0].decode().upper()
+        if name == "GET":
+            value = self.data.get(args[1])
+            return b"$-1\r\n" if value is None else b"$%d\r\n%s\r\n" % (len(value), value)
+        if name == "SET":
+            if args[1] in self.fail_keys:
+                return b"-OOM command not allowed when used memory > 'maxmemory'\r\n"
+            self.data[args[1]] = args[2]
+            return b"+OK\r\n"
+        if name == "SADD":
+            self.data.setdefault(args[1], set()).add(args[2])
+            return b":1\r\n"
+        if name == "PEXPIRE":
+            return b":1\r\n"
+        if name == "SMEMBERS":
+            members = self.data.get(args[1], set())
+            return b"*%d\r\n" % len(members) + b"".join(b"$%d\r\n%s\r\n" % (len(m), m) for m in members)
+        if name == "DEL":
+            removed = sum(1 for key in args[1:] if self.data.pop(key, None) is not None)
+            return b":%d\r\n" % removed
+        return b"-ERR unknown command\r\n"
+
+    async def _handle(self, reader, writer):
+        while True:
+            args = await self._read_command(reader)
+            if args is None:
+                break
+            writer.write(self._execute(args))
+            await writer.drain()
+        writer.close()
+
+
+async def _exercise(cache):
+    assert await cache.get("tasks:w1:all") is None
+    await cache.set("tasks:w1:all", {"success": True, "data": [{"title": "A"}]}, tag="w1")
+    await cache.set("lists:w2:all", {"success": True, "data": []}, tag="w2")
+    assert await cache.get("tasks:w1:all") == {"success": True, "data": [{"title": "A"}]}
+
+    await cache.invalidate("w1")
+    assert await cache.get("tasks:w1:all") is None
+    assert await cache.get("lists:w2:all") == {"success": True, "data": []}
+
+
+def test_memory_backend():
+    cache = ResponseCache(MemoryBackend(100), ttl=30)
+    asyncio.run(_exercise(cache))
+    stats = cache.stats()
+    assert stats["hits"] == 2 and stats["misses"] == 2
+
+def test_redis_backend_against_fake_server():
+    async def run():
+        server = FakeRedisServer()
+        port = await server.start()
+        cache = ResponseCache(RedisBackend(f"redis://127.0.0.1:{port}/0"), ttl=30)
+        try:
+            await _exercise(cache)
+        finally:
+            await server.stop()
+        assert cache.stats()["errors"] == 0
+
+    asyncio.run(run())
+
+def test_too_large_values_are_skipped():
+    cache = ResponseCache(MemoryBackend(100), ttl=30, max_bytes=10)
+    asyncio.run(cache.set("tasks:w1:all", {"data": "x" * 100}, tag="w1"))
+    assert cache.stats()["skipped_too_large"] == 1
+
+def test_stale_version_is_never_served():
+    async def run():
+        cache = ResponseCache(MemoryBackend(100), ttl=30)
+        # Lectura que vio la versión 3 y guarda después de que una escritura subió a 4
+        await cache.set(cache_key("tasks", "w1", 3, None), {"data": ["old"]}, tag="w1")
+        assert await cache.get(cache_key("tasks", "w1", 4, None)) is None
+        assert await cache.get(cache_key("tasks", "w1", 3, None)) == {"data": ["old"]}
+
+    asyncio.run(run())
+
+def test_missing_version_is_not_cached():
+    cache = ResponseCache(MemoryBackend(100), ttl=30)
+    assert cache_key("tasks", "w1", None) is None
+    asyncio.run(cache.set(None, {"data": []}, tag="w1"))
+    assert asyncio.run(cache.get(None)) is None
+    assert cache.stats()["stores"] == 0
+
+def test_error_reply_mid_pipeline_keeps_connection_in_sync():
+    async def run():
+        server = FakeRedisServer()
+        port = await server.start()
+        server.fail_keys.add(b"tasks:B:1")
+        cache = ResponseCache(RedisBackend(f"redis://127.0.0.1:{port}/0"), ttl=30)
+        try:
+            await cache.set("tasks:A:1", {"data": ["A"]}, tag="A")
+            await cache.set("tasks:B:1", {"data": ["B"]}, tag="B")
+            assert cache.stats()["errors"] == 1
+            # Ninguna respuesta del pipeline fallido queda pendiente para el siguiente comando
+            assert await cache.get("tasks:C:9") is None
+            assert await cache.get("tasks:A:1") == {"data": ["A"]}
+        finally:
+            await server.stop()
+
+    asyncio.run(run())
+
+def test_corrupt_entry_is_a_miss():
+    async def run():
+        backend = MemoryBackend(100)
+        await backend.set("tasks:w1:1", b"{not json", 30, "w1")
+        cache = ResponseCache(backend, ttl=30)
+        assert await cache.get("tasks:w1:1") is None
+        stats = cache.stats()
+        assert stats["errors"] == 1 and stats["misses"] == 1 and stats["hits"] == 0
+
+    asyncio.run(run())
@@ -0,0 +1,24 @@
+import pytest
+from utils.search import normalize, title_terms, parse_query, prefix_regex
+
+
+def test_normalize_accents_and_case():
+    assert normalize("Revisión ÁGIL") == "revision agil"
+
+def test_title_terms_unique_in_order():
+    assert title_terms("Write the report Report 2") == ["write", "the", "report", "2"]
+
+def test_parse_query_prefix():
+    assert parse_query("write rep") == (["write"], "rep")
+    assert parse_query("rep") == ([], "rep")
+
+def test_parse_query_complete_words():
+    assert parse_query("write rep ") == (["write", "rep"], None)
+    assert parse_query("write rep", prefix=False) == (["write", "rep"], None)
+
+def test_parse_query_empty():
+    with pytest.raises(ValueError):
+        parse_query(" -- ")
+
+def test_prefix_regex():
+    assert prefix_regex("rep") == "^rep"
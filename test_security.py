@@ -0,0 +1,79 @@
+import os
+import time
+
+os.environ.setdefault("SECRET_KEY", "test-secret-key-test-secret-key-test-secret")
+
+import jwt
+import pytest
+from fastapi import HTTPException
+
+import utils.cache
+import utils.security
+from utils.security import SECRET_KEY, create_jwt_token, decode_token
+
+
+@pytest.fixture
+def decode_calls(monkeypatch):
+    """Cuenta las verificaciones reales de firma; vacía la caché de claims entre pruebas"""
+    calls = []
+    real_decode = jwt.decode
+
+    def counting_decode(*args, **kwargs):
+        calls.append(args[0])
+        return real_decode(*args, **kwargs)
+
+    monkeypatch.setattr(utils.security.jwt, "decode", counting_decode)
+    utils.security._token_cache.clear()
+    return calls
+
+def _token(exp_in: float, **claims) -> str:
+    payload = {"id": "u1", "name": "Test", "email": "test@example.com", "active": True, "admin": False,
+               "exp": int(time.time() + exp_in), **claims}
+    return jwt.encode(payload, SECRET_KEY, algorithm="HS256")
+
+def test_decode_is_cached(decode_calls):
+    token = create_jwt_token("Test", "test@example.com", True, True, "u1")
+    first = decode_token(token)
+    second = decode_token(token)
+    assert first == second
+    assert first["role"] == "admin"
+    assert len(decode_calls) == 1
+
+def test_cache_entry_expires_at_exp(decode_calls, monkeypatch):
+    token = _token(exp_in=60)
+    decode_token(token)
+    decode_token(token)
+    assert len(decode_calls) == 1
+
+    # La entrada dura lo que le queda al token: pasado el exp se vuelve a verificar
+    now = time.monotonic()
+    monkeypatch.setattr(utils.cache.time, "monotonic", lambda: now + 61)
+    decode_token(token)
+    assert len(decode_calls) == 2
+
+def test_invalid_tokens_are_rejected_and_not_cached(decode_calls):
+    inactive = _token(exp_in=60, active=False)
+    for _ in range(2):
+        with pytest.raises(HTTPException) as error:
+            decode_token(inactive)
+        assert error.value.status_code == 401
+    assert len(decode_calls) == 2
+
+    with pytest.raises(HTTPException):
+        decode_token(_token(exp_in=-10))
+    with pytest.raises(HTTPException):
+        decode_token("not-a-token")
+
+def test_metrics_token(monkeypatch, decode_calls):
+    from fastapi.security import HTTPAuthorizationCredentials
+    from utils.security import require_metrics_token
+
+    def bearer(token):
+        return HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+    monkeypatch.setattr(utils.security, "METRICS_TOKEN", "static-scrape-token")
+    assert require_metrics_token(bearer("static-scrape-token")) is None
+    assert require_metrics_token(bearer(create_jwt_token("Admin", "a@example.com", True, True, "u1"))) is None
+    for credentials in (None, bearer("wrong-token"), bearer(create_jwt_token("User", "u@example.com", True, False, "u2"))):
+        with pytest.raises(HTTPException):
+            require_metrics_token(credentials)
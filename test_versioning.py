@@ -0,0 +1,31 @@
+from utils.versioning import make_etag, etag_matches, etag_headers
+
+
+def test_make_etag_is_weak_and_varies_by_representation():
+    etag = make_etag("w1", 3, "/workspaces/w1/tasks?|application/json")
+    assert etag.startswith('W/"w1-3-') and etag.endswith('"')
+    assert etag == make_etag("w1", 3, "/workspaces/w1/tasks?|application/json")
+    assert etag != make_etag("w1", 3, "/workspaces/w1/tasks?limit=10|application/json")
+    assert etag != make_etag("w1", 4, "/workspaces/w1/tasks?|application/json")
+
+def test_etag_matches_exact_weak_and_strong():
+    etag = make_etag("w1", 3)
+    assert etag_matches(etag, etag)
+    # Comparación débil: el mismo valor sin W/ también coincide
+    assert etag_matches(etag.removeprefix("W/"), etag)
+    assert not etag_matches(make_etag("w1", 2), etag)
+
+def test_etag_matches_star_and_lists():
+    etag = make_etag("w1", 3)
+    assert etag_matches("*", etag)
+    assert etag_matches(f'W/"other", {etag}', etag)
+    assert etag_matches(f'"a","b",{etag}', etag)
+    assert not etag_matches('W/"a", W/"b"', etag)
+
+def test_etag_matches_without_header():
+    assert not etag_matches(None, make_etag("w1", 1))
+    assert not etag_matches("", make_etag("w1", 1))
+
+def test_etag_headers():
+    assert etag_headers(None) == {}
+    assert etag_headers('W/"x"') == {"ETag": 'W/"x"', "Cache-Control": "private, no-cache"}
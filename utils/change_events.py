@@ -0,0 +1,231 @@
+"""
+Eventos de cambios del tablero (listas y tareas) para el endpoint SSE.
+
+Cada proceso abre un solo change stream sobre la base de datos y reparte los eventos
+entre los suscriptores según su id_workspace. Los últimos eventos se guardan en un
+buffer circular para que un cliente que se reconecta con Last-Event-ID reciba lo que
+se perdió; si su evento ya salió del buffer recibe un evento "reset" y debe volver
+a pedir el tablero completo.
+
+El buffer es de cada worker. Con varios workers (server.py) el cliente puede
+reconectarse a otro proceso que no tiene su Last-Event-ID; en ese caso también recibe
+"reset", así que un cliente nunca pierde eventos sin enterarse, pero tras una
+reconexión puede tener que recargar aunque no se haya perdido nada.
+
+Los eventos delete no traen el documento. Para saber a qué workspace pertenecen se
+usa la pre-imagen (changeStreamPreAndPostImages, MongoDB 6+) y, si no está habilitada
+o el servidor es anterior a 6.0, el último id_workspace visto para ese documento.
+"""
+import os
+import json
+import asyncio
+import logging
+from collections import deque
+from typing import Optional
+
+from utils.cache import TTLCache
+from utils.mongodb import get_async_collection
+
+logger = logging.getLogger(__name__)
+
+SSE_QUEUE_SIZE = int(os.getenv("SSE_QUEUE_SIZE", "256"))
+SSE_REPLAY_SIZE = int(os.getenv("SSE_REPLAY_SIZE", "5000"))
+SSE_HEARTBEAT = float(os.getenv("SSE_HEARTBEAT", "15"))
+SSE_RETRY_MS = int(os.getenv("SSE_RETRY_MS", "3000"))
+_WATCH_RETRY_DELAY = 5
+# fullDocumentBeforeChange existe desde MongoDB 6.0; antes el servidor rechaza el watch
+_PRE_IMAGES_VERSION = (6, 0)
+
+# colección -> nombre del recurso en el tipo de evento
+_RESOURCES = {"tasks": "task", "lists": "list"}
+# campos que convierten un update en un move
+_MOVE_FIELDS = {"id_list", "id_list_obj", "rank"}
+
+
+def format_sse(data: dict, event: str, event_id: Optional[str] = None) -> str:
+    lines = []
+    if event_id:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append("data: " + json.dumps(data, default=str, ensure_ascii=False))
+    return "\n".join(lines) + "\n\n"
+
+
+class Subscription:
+
+    def __init__(self, workspace_id: str):
+        self.workspace_id = workspace_id
+        self.queue = asyncio.Queue(maxsize=SSE_QUEUE_SIZE)
+        self.overflowed = False
+
+    def push(self, item: tuple):
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(item)
+        except asyncio.QueueFull:
+            # Un cliente lento no debe frenar a los demás: se le pide recargar
+            self.overflowed = True
+
+
+class ChangeHub:
+
+    def __init__(self):
+        self._subscribers = {}
+        self._replay = deque(maxlen=SSE_REPLAY_SIZE)
+        self._workspace_of = TTLCache(maxsize=SSE_REPLAY_SIZE * 10, ttl=24 * 3600)
+        self._resume_token = None
+        self._task = None
+        self.events = 0
+        self.dropped = 0
+
+    # ---------------------------------------------------------------- lifecycle
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _watch_options(self, database) -> dict:
+        options = {"full_document": "updateLookup"}
+        info = await database.command("buildInfo")
+        if tuple(info.get("versionArray", [])[:2]) >= _PRE_IMAGES_VERSION:
+            options["full_document_before_change"] = "whenAvailable"
+        return options
+
+    async def _run(self):
+        database = get_async_collection("tasks").database
+        pipeline = [{"$match": {"ns.coll": {"$in": list(_RESOURCES)}}}]
+        options = None
+        while True:
+            try:
+                if options is None:
+                    options = await self._watch_options(database)
+                async with await database.watch(
+                    pipeline,
+                    resume_after=self._resume_token,
+                    **options,
+                ) as stream:
+                    async for change in stream:
+                        self._resume_token = stream.resume_token
+                        self._dispatch(change)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Change stream failed, retrying in {_WATCH_RETRY_DELAY}s: {e}")
+                await asyncio.sleep(_WATCH_RETRY_DELAY)
+
+    # ---------------------------------------------------------------- fan-out
+
+    def _dispatch(self, change: dict):
+        event = self._to_event(change)
+        if event is None:
+            return
+        workspace_id, name, payload = event
+        event_id = change["_id"]["_data"]
+        self._replay.append((event_id, workspace_id, name, payload))
+        self.events += 1
+        for subscription in self._subscribers.get(workspace_id, ()):
+            subscription.push((event_id, name, payload))
+
+    def _to_event(self, change: dict):
+        resource = _RESOURCES.get(change.get("ns", {}).get("coll"))
+        operation = change.get("operationType")
+        if resource is None or operation not in ("insert", "update", "replace", "delete"):
+            return None
+
+        document_id = str(change["documentKey"]["_id"])
+        document = change.get("fullDocument") or change.get("fullDocumentBeforeChange") or {}
+        workspace_id = document.get("id_workspace")
+        if workspace_id:
+            self._workspace_of.set(document_id, workspace_id)
+        else:
+            workspace_id = self._workspace_of.get(document_id, None)
+        if not workspace_id:
+            self.dropped += 1
+            return None
+
+        if operation == "delete":
+            self._workspace_of.pop(document_id)
+            action = "deleted"
+        elif operation == "insert":
+            action = "inserted"
+        else:
+            updated = change.get("updateDescription", {}).get("updatedFields", {})
+            action = "moved" if _MOVE_FIELDS.intersection(updated) else "updated"
+
+        data = None
+        if operation != "delete" and change.get("fullDocument"):
+            data = {**change["fullDocument"], "_id": document_id}
+            data.pop("id_list_obj", None)
+            data.pop("title_terms", None)
+        payload = {"id": document_id, "id_workspace": workspace_id, "data": data}
+        return workspace_id, f"{resource}.{action}", payload
+
+    # ---------------------------------------------------------------- suscriptores
+
+    def _replay_after(self, workspace_id: str, last_event_id: str) -> Optional[list]:
+        """Eventos del workspace posteriores a last_event_id, o None si ya no está en el buffer"""
+        missed = None
+        for event_id, event_workspace, name, payload in self._replay:
+            if missed is not None and event_workspace == workspace_id:
+                missed.append((event_id, name, payload))
+            elif event_id == last_event_id:
+                missed = []
+        return missed
+
+    async def subscribe(self, workspace_id: str, last_event_id: Optional[str] = None):
+        """
+        Generador de mensajes SSE para un workspace. Envía un comentario cada
+        SSE_HEARTBEAT segundos para que los proxies no cierren la conexión
+        """
+        self.start()
+        subscription = Subscription(workspace_id)
+        self._subscribers.setdefault(workspace_id, set()).add(subscription)
+        # Se calcula antes del primer yield para no duplicar eventos que lleguen a la cola
+        missed = self._replay_after(workspace_id, last_event_id) if last_event_id else []
+        try:
+            yield f"retry: {SSE_RETRY_MS}\n\n"
+            if last_event_id:
+                if missed is None:
+                    yield format_sse({"id_workspace": workspace_id}, "reset")
+                else:
+                    for event_id, name, payload in missed:
+                        yield format_sse(payload, name, event_id)
+
+            while not subscription.overflowed:
+                try:
+                    event_id, name, payload = await asyncio.wait_for(subscription.queue.get(), SSE_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                yield format_sse(payload, name, event_id)
+
+            yield format_sse({"id_workspace": workspace_id}, "reset")
+        finally:
+            subscribers = self._subscribers.get(workspace_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[workspace_id]
+
+    def stats(self) -> dict:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "workspaces": len(self._subscribers),
+            "subscribers": sum(len(s) for s in self._subscribers.values()),
+            "events": self.events,
+            "dropped_unknown_workspace": self.dropped,
+            "replay_buffer": len(self._replay),
+        }
+
+
+change_hub = ChangeHub()
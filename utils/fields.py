@@ -0,0 +1,55 @@
+"""
+Sparse fieldsets: ?fields=title,rank en las lecturas de tareas, listas y workspaces.
+
+El parámetro se traduce a la proyección de Mongo (en los $project de pipelines/ o en
+el find_one), así que los campos que no se pidieron no salen de la base. El id
+siempre se incluye porque lo usan la paginación y los clientes para identificar el documento.
+"""
+from typing import Optional
+
+TASK_FIELDS = ("id", "title", "description", "id_list", "rank", "list_title")
+BOARD_TASK_FIELDS = ("id", "title", "description", "rank")
+SEARCH_FIELDS = ("id", "title", "description", "id_list", "rank")
+LIST_FIELDS = ("id", "title", "description", "id_workspace", "rank")
+WORKSPACE_FIELDS = ("id", "name", "description", "id_user")
+
+
+def parse_fields(fields: Optional[str], allowed: tuple) -> Optional[tuple]:
+    """
+    Convierte "title, rank" en ("id", "title", "rank") respetando el orden de allowed,
+    para que la misma selección produzca siempre la misma llave de caché.
+    None si no se pidió nada (documento completo); ValueError con un campo desconocido
+    """
+    if not fields:
+        return None
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = requested.difference(allowed)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}. Allowed: {', '.join(allowed)}")
+    return tuple(field for field in allowed if field == "id" or field in requested)
+
+
+def select_projection(project: dict, fields: Optional[tuple], id_key: str = "id") -> dict:
+    """
+    Recorta un $project de inclusión a los campos pedidos. id_key es el nombre con el
+    que sale el id en ese $project ("id" o "_id"); la exclusión "_id": 0 se conserva
+    """
+    if fields is None:
+        return project
+    wanted = {id_key if field == "id" else field for field in fields}
+    return {key: value for key, value in project.items() if key in wanted or (key == "_id" and value == 0)}
+
+
+def find_projection(fields: Optional[tuple], required: tuple = ()) -> Optional[dict]:
+    """Proyección para find_one: los campos pedidos más los que el controlador necesita para validar"""
+    if fields is None:
+        return None
+    return {field: 1 for field in (*fields, *required) if field != "id"}
+
+
+def pick_fields(document: dict, fields: tuple) -> dict:
+    """Arma la respuesta de un find_one proyectado; id sale como texto del _id"""
+    return {
+        field: str(document["_id"]) if field == "id" else document.get(field)
+        for field in fields
+    }
@@ -0,0 +1,54 @@
+import os
+import asyncio
+import httpx
+from dotenv import load_dotenv
+
+load_dotenv()
+
+MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+MAX_CONCURRENCY = int(os.getenv("HTTP_MAX_CONCURRENCY", "50"))
+CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "3"))
+READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "10"))
+
+_client = None
+_semaphore = None
+
+
+def init_http_client():
+    """Crea el cliente HTTP compartido (keep-alive + pool de conexiones). Se llama desde el lifespan"""
+    global _client, _semaphore
+    if _client is None:
+        _client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=MAX_CONNECTIONS,
+                max_keepalive_connections=MAX_KEEPALIVE,
+            ),
+            timeout=httpx.Timeout(
+                connect=CONNECT_TIMEOUT,
+                read=READ_TIMEOUT,
+                write=READ_TIMEOUT,
+                pool=CONNECT_TIMEOUT,
+            ),
+        )
+        _semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+    return _client
+
+
+def get_http_client():
+    return _client or init_http_client()
+
+
+async def close_http_client():
+    global _client, _semaphore
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+        _semaphore = None
+
+
+async def post_json(url: str, payload: dict, params: dict = None) -> httpx.Response:
+    """POST con el cliente compartido, limitando las llamadas externas simultáneas"""
+    client = get_http_client()
+    async with _semaphore:
+        return await client.post(url, json=payload, params=params)
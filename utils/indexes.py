@@ -0,0 +1,141 @@
+import argparse
+import asyncio
+import json
+import logging
+
+from pymongo import ASCENDING, TEXT
+
+from utils.mongodb import get_async_mongo_client, DB
+
+logger = logging.getLogger(__name__)
+
+# Collation usada para las comparaciones sin distinguir mayúsculas/minúsculas.
+# Las consultas deben usar exactamente la misma collation para poder usar el índice.
+CASE_INSENSITIVE = {"locale": "en", "strength": 2}
+
+"""
+Índices declarados por colección. ensure_indexes() los crea si faltan y los
+recrea si existe uno con el mismo nombre pero distinta definición.
+"""
+INDEXES = {
+    "lists": [
+        {"name": "id_workspace_title_ci", "keys": [("id_workspace", ASCENDING), ("title", ASCENDING)], "collation": CASE_INSENSITIVE},
+        {"name": "id_workspace_id", "keys": [("id_workspace", ASCENDING), ("_id", ASCENDING)]},
+        # Incluye _id para el orden (rank, _id) de la paginación por cursor
+        {"name": "id_workspace_rank", "keys": [("id_workspace", ASCENDING), ("rank", ASCENDING), ("_id", ASCENDING)]},
+    ],
+    "tasks": [
+        {"name": "id_list_rank", "keys": [("id_list", ASCENDING), ("rank", ASCENDING)]},
+        # Incluye _id para el orden (id_list, rank, _id) de la paginación por cursor
+        {"name": "id_workspace_id_list_rank", "keys": [("id_workspace", ASCENDING), ("id_list", ASCENDING), ("rank", ASCENDING), ("_id", ASCENDING)]},
+        {"name": "id_workspace_id", "keys": [("id_workspace", ASCENDING), ("_id", ASCENDING)]},
+        {"name": "id_workspace_title_ci", "keys": [("id_workspace", ASCENDING), ("title", ASCENDING)], "collation": CASE_INSENSITIVE},
+        # Búsqueda (utils/search.py): $text con igualdad en id_workspace y prefijos sobre title_terms
+        {"name": "id_workspace_text", "keys": [("id_workspace", ASCENDING), ("title", TEXT), ("description", TEXT)], "weights": {"title": 5, "description": 1}},
+        {"name": "id_workspace_title_terms", "keys": [("id_workspace", ASCENDING), ("title_terms", ASCENDING)]},
+    ],
+    "workspaces": [
+        {"name": "id_user_name_ci", "keys": [("id_user", ASCENDING), ("name", ASCENDING)], "collation": CASE_INSENSITIVE},
+        {"name": "id_user_id", "keys": [("id_user", ASCENDING), ("_id", ASCENDING)]},
+    ],
+    "users": [
+        {"name": "email_ci", "keys": [("email", ASCENDING)], "collation": CASE_INSENSITIVE},
+    ],
+}
+
+
+# Opciones de create_index que se copian de la declaración
+_INDEX_OPTIONS = ("collation", "weights")
+
+
+def _key_items(spec: dict) -> list:
+    """listIndexes reporta los campos de un índice de texto como _fts/_ftsx; los campos van en weights"""
+    keys = [(field, kind) for field, kind in spec["keys"] if kind != TEXT]
+    if len(keys) == len(spec["keys"]):
+        return spec["keys"]
+    return keys + [("_fts", "text"), ("_ftsx", 1)]
+
+
+def _same_definition(existing: dict, spec: dict) -> bool:
+    if list(existing["key"].items()) != _key_items(spec):
+        return False
+    if spec.get("weights") and existing.get("weights") != spec["weights"]:
+        return False
+
+    collation = existing.get("collation")
+    wanted = spec.get("collation")
+    if not wanted:
+        return collation is None
+    if not collation:
+        return False
+    return all(collation.get(k) == v for k, v in wanted.items())
+
+
+async def _index_stats(collection) -> dict:
+    cursor = await collection.aggregate([{"$indexStats": {}}])
+    stats = await cursor.to_list()
+    return {s["name"]: s["accesses"]["ops"] for s in stats}
+
+
+async def inspect_indexes() -> dict:
+    """
+    Compara los índices existentes con los declarados, sin modificar nada
+    """
+    db = get_async_mongo_client()[DB]
+    report = {}
+
+    for col_name, specs in INDEXES.items():
+        collection = db[col_name]
+        existing = {ix["name"]: ix async for ix in await collection.list_indexes()}
+        usage = await _index_stats(collection)
+        declared = {spec["name"] for spec in specs}
+
+        report[col_name] = {
+            "missing": [s["name"] for s in specs if s["name"] not in existing],
+            "conflicting": [
+                s["name"] for s in specs
+                if s["name"] in existing and not _same_definition(existing[s["name"]], s)
+            ],
+            "undeclared": [name for name in existing if name != "_id_" and name not in declared],
+            "unused": [name for name in existing if name != "_id_" and usage.get(name, 0) == 0],
+        }
+
+    return report
+
+
+async def ensure_indexes() -> dict:
+    """
+    Crea los índices que faltan y recrea los que tienen una definición distinta
+    """
+    db = get_async_mongo_client()[DB]
+    report = await inspect_indexes()
+
+    for col_name, specs in INDEXES.items():
+        collection = db[col_name]
+        pending = set(report[col_name]["missing"]) | set(report[col_name]["conflicting"])
+
+        for spec in specs:
+            if spec["name"] not in pending:
+                continue
+            if spec["name"] in report[col_name]["conflicting"]:
+                await collection.drop_index(spec["name"])
+            options = {"name": spec["name"]}
+            options.update({option: spec[option] for option in _INDEX_OPTIONS if spec.get(option)})
+            await collection.create_index(spec["keys"], **options)
+            logger.info(f"Index {col_name}.{spec['name']} created")
+
+    return report
+
+
+async def _main(dry_run: bool):
+    report = await inspect_indexes() if dry_run else await ensure_indexes()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Crea o revisa los índices declarados en utils/indexes.py")
+    parser.add_argument("--dry-run", action="store_true", help="Solo reporta índices faltantes, distintos o sin uso")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_main(args.dry_run))
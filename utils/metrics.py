@@ -0,0 +1,280 @@
+"""
+Métricas en formato de texto de Prometheus, expuestas en /metrics.
+
+    http_requests_total                 requests por método, ruta y status
+    http_request_duration_seconds       histograma de latencia por método y ruta
+    http_requests_in_flight             requests en curso por método
+    mongodb_command_duration_seconds    histograma de duración por colección y comando
+    mongodb_command_failures_total      comandos fallidos por colección y comando
+
+La ruta es la plantilla del router (/workspaces/{workspace_id}/tasks), no la URL,
+para que el número de series no crezca con los ids. p50/p99 por ruta:
+
+    histogram_quantile(0.99, sum by (le, route) (rate(http_request_duration_seconds_bucket[5m])))
+"""
+import time
+import threading
+from typing import Optional
+
+from pymongo import monitoring
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+MONGO_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labels: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {labels: (list(value) if isinstance(value, list) else value) for labels, value in self._series.items()}
+
+    def header(self) -> list:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, labels: tuple = (), amount: float = 1):
+        with self._lock:
+            self._series[labels] = self._series.get(labels, 0) + amount
+
+    def render(self, series: dict = None) -> list:
+        lines = self.header()
+        for labels, value in sorted((series if series is not None else self.snapshot()).items()):
+            lines.append(f"{self.name}{_format_labels(self.labels, labels)} {value}")
+        return lines
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, labels: tuple = (), amount: float = 1):
+        self.inc(labels, -amount)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = buckets
+
+    def observe(self, labels: tuple, value: float):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # [conteo por bucket..., suma, total]
+                series = self._series[labels] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self, all_series: dict = None) -> list:
+        lines = self.header()
+        for labels, series in sorted((all_series if all_series is not None else self.snapshot()).items()):
+            for bound, count in zip(self.buckets, series):
+                le = 'le="%s"' % bound
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, labels, le)} {count}")
+            le = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.labels, labels, le)} {series[-1]}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, labels)} {series[-2]}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, labels)} {series[-1]}")
+        return lines
+
+
+HTTP_REQUESTS = Counter("http_requests_total", "HTTP requests by route and status", ("method", "route", "status"))
+HTTP_LATENCY = Histogram("http_request_duration_seconds", "HTTP request latency", ("method", "route"))
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests being served", ("method",))
+MONGO_LATENCY = Histogram("mongodb_command_duration_seconds", "MongoDB command duration", ("collection", "command"), MONGO_BUCKETS)
+MONGO_FAILURES = Counter("mongodb_command_failures_total", "Failed MongoDB commands", ("collection", "command"))
+
+REGISTRY = [HTTP_REQUESTS, HTTP_LATENCY, HTTP_IN_FLIGHT, MONGO_LATENCY, MONGO_FAILURES]
+
+
+def _merge(a, b):
+    if isinstance(a, list):
+        return [x + y for x, y in zip(a, b)]
+    return a + b
+
+
+def export_state() -> dict:
+    """Series de este proceso en un formato JSON, para sumarlas con las de otros workers"""
+    return {metric.name: [[list(labels), value] for labels, value in metric.snapshot().items()] for metric in REGISTRY}
+
+
+def render_metrics(other_states: list = ()) -> str:
+    """
+    other_states son los export_state() de los demás workers; contadores, gauges e
+    histogramas se suman serie por serie
+    """
+    lines = []
+    for metric in REGISTRY:
+        series = metric.snapshot()
+        for state in other_states:
+            for labels, value in state.get(metric.name, []):
+                labels = tuple(labels)
+                series[labels] = _merge(series[labels], value) if labels in series else value
+        lines.extend(metric.render(series))
+    return "\n".join(lines) + "\n"
+
+
+def route_template(scope: dict) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+async def metrics_middleware(request, call_next):
+    method = request.method
+    HTTP_IN_FLIGHT.inc((method,))
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        HTTP_IN_FLIGHT.dec((method,))
+        route = route_template(request.scope)
+        HTTP_LATENCY.observe((method, route), time.perf_counter() - start)
+        HTTP_REQUESTS.inc((method, route, str(status)))
+
+
+#------------------------------------------------------------------------------------
+
+def _collection_of(command_name: str, command: dict) -> str:
+    if command_name == "getMore":
+        return command.get("collection", "-")
+    target = command.get(command_name)
+    return target if isinstance(target, str) else "-"
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """
+    Registra la duración de cada comando. La colección solo viene en el evento
+    started, así que se guarda hasta que llega succeeded o failed
+    """
+
+    def __init__(self):
+        self._pending = {}
+
+    def _finish(self, event) -> Optional[tuple]:
+        collection = self._pending.pop((event.connection_id, event.request_id), None)
+        if collection is None:
+            return None
+        return (collection, event.command_name)
+
+    def started(self, event):
+        self._pending[(event.connection_id, event.request_id)] = _collection_of(event.command_name, event.command)
+
+    def succeeded(self, event):
+        labels = self._finish(event)
+        if labels:
+            MONGO_LATENCY.observe(labels, event.duration_micros / 1e6)
+
+    def failed(self, event):
+        labels = self._finish(event)
+        if labels:
+            MONGO_LATENCY.observe(labels, event.duration_micros / 1e6)
+            MONGO_FAILURES.inc(labels)
+
+
+mongo_command_metrics = MongoCommandMetrics()
+
+
+#------------------------------------------------------------------------------------
+
+POOL_CONNECTIONS = Gauge("mongodb_pool_connections", "Open connections in the pool", ("address",))
+POOL_CHECKED_OUT = Gauge("mongodb_pool_checked_out", "Connections currently checked out", ("address",))
+POOL_WAITING = Gauge("mongodb_pool_waiting", "Operations waiting for a connection", ("address",))
+POOL_CHECKOUT_TIME = Histogram("mongodb_pool_checkout_seconds", "Time spent waiting for a pooled connection", ("address",), MONGO_BUCKETS)
+POOL_CHECKOUT_FAILURES = Counter("mongodb_pool_checkout_failures_total", "Failed connection checkouts", ("address", "reason"))
+POOL_CLEARED = Counter("mongodb_pool_cleared_total", "Times the pool was cleared", ("address",))
+
+REGISTRY += [POOL_CONNECTIONS, POOL_CHECKED_OUT, POOL_WAITING, POOL_CHECKOUT_TIME, POOL_CHECKOUT_FAILURES, POOL_CLEARED]
+
+
+def _address(event) -> tuple:
+    host, port = event.address
+    return (f"{host}:{port}",)
+
+
+class MongoPoolMetrics(monitoring.ConnectionPoolListener):
+    """Estado del pool de conexiones por servidor, para dimensionar maxPoolSize"""
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        POOL_CLEARED.inc(_address(event))
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        POOL_CONNECTIONS.inc(_address(event))
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        POOL_CONNECTIONS.dec(_address(event))
+
+    def connection_check_out_started(self, event):
+        POOL_WAITING.inc(_address(event))
+
+    def connection_check_out_failed(self, event):
+        labels = _address(event)
+        POOL_WAITING.dec(labels)
+        POOL_CHECKOUT_FAILURES.inc(labels + (str(event.reason),))
+
+    def connection_checked_out(self, event):
+        labels = _address(event)
+        POOL_WAITING.dec(labels)
+        POOL_CHECKED_OUT.inc(labels)
+        # duration existe desde pymongo 4.7
+        duration = getattr(event, "duration", None)
+        if duration is not None:
+            POOL_CHECKOUT_TIME.observe(labels, duration)
+
+    def connection_checked_in(self, event):
+        POOL_CHECKED_OUT.dec(_address(event))
+
+
+mongo_pool_metrics = MongoPoolMetrics()
+
+
+def pool_stats() -> dict:
+    stats = {}
+    for metric, key in ((POOL_CONNECTIONS, "connections"), (POOL_CHECKED_OUT, "checked_out"), (POOL_WAITING, "waiting")):
+        for (address,), value in metric.snapshot().items():
+            stats.setdefault(address, {})[key] = value
+    for (address,), series in POOL_CHECKOUT_TIME.snapshot().items():
+        total, count = series[-2], series[-1]
+        stats.setdefault(address, {})["checkouts"] = count
+        stats[address]["avg_checkout_ms"] = round(total / count * 1000, 3) if count else 0.0
+    return stats
@@ -0,0 +1,101 @@
+import argparse
+import asyncio
+import logging
+
+from pymongo import UpdateMany, UpdateOne
+
+from utils.mongodb import get_async_mongo_client, DB
+from utils.rank_rebalance import backfill_missing_ranks, flag_existing_long_ranks
+from utils.search import title_terms
+
+logger = logging.getLogger(__name__)
+
+
+async def backfill_task_workspace(batch_size: int = 500) -> int:
+    """
+    Copia id_workspace y el ObjectId de id_list en las tareas que todavía no los tienen.
+    Se ejecuta una operación UpdateMany por lista, enviadas en lotes con bulk_write
+    """
+    db = get_async_mongo_client()[DB]
+    lists_cursor = db["lists"].find({}, {"_id": 1, "id_workspace": 1})
+
+    operations = []
+    modified = 0
+    async for list_doc in lists_cursor:
+        operations.append(UpdateMany(
+            {"id_list": str(list_doc["_id"]), "id_workspace": {"$exists": False}},
+            {"$set": {"id_workspace": list_doc["id_workspace"], "id_list_obj": list_doc["_id"]}}
+        ))
+        if len(operations) >= batch_size:
+            result = await db["tasks"].bulk_write(operations, ordered=False)
+            modified += result.modified_count
+            operations = []
+
+    if operations:
+        result = await db["tasks"].bulk_write(operations, ordered=False)
+        modified += result.modified_count
+
+    logger.info(f"Backfilled id_workspace on {modified} tasks")
+    return modified
+
+
+async def enable_pre_images() -> None:
+    """
+    Habilita las pre-imágenes de change streams en lists y tasks (MongoDB 6+)
+    para que los eventos delete del endpoint SSE traigan el id_workspace
+    """
+    db = get_async_mongo_client()[DB]
+    for name in ("lists", "tasks"):
+        await db.command("collMod", name, changeStreamPreAndPostImages={"enabled": True})
+    logger.info("Enabled change stream pre-images on lists and tasks")
+
+
+async def backfill_title_terms(batch_size: int = 1000) -> int:
+    """
+    Calcula title_terms (palabras normalizadas del título, para la búsqueda por prefijo)
+    en las tareas que no lo tienen
+    """
+    db = get_async_mongo_client()[DB]
+    cursor = db["tasks"].find({"title_terms": {"$exists": False}}, {"title": 1}, batch_size=batch_size)
+
+    operations = []
+    modified = 0
+    async for task in cursor:
+        operations.append(UpdateOne(
+            {"_id": task["_id"]},
+            {"$set": {"title_terms": title_terms(task.get("title", ""))}}
+        ))
+        if len(operations) >= batch_size:
+            result = await db["tasks"].bulk_write(operations, ordered=False)
+            modified += result.modified_count
+            operations = []
+
+    if operations:
+        result = await db["tasks"].bulk_write(operations, ordered=False)
+        modified += result.modified_count
+
+    logger.info(f"Backfilled title_terms on {modified} tasks")
+    return modified
+
+
+MIGRATIONS = {
+    "task_workspace": backfill_task_workspace,
+    "ranks": backfill_missing_ranks,
+    "long_ranks": flag_existing_long_ranks,
+    "pre_images": enable_pre_images,
+    "title_terms": backfill_title_terms,
+}
+
+
+async def _main(names: list):
+    for name in names:
+        await MIGRATIONS[name]()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ejecuta los backfills de datos existentes")
+    parser.add_argument("names", nargs="*", choices=list(MIGRATIONS), help="Migraciones a ejecutar (por defecto todas)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_main(args.names or list(MIGRATIONS)))
@@ -1,7 +1,11 @@
 import os
+import logging
 from dotenv import load_dotenv
-from pymongo import MongoClient
+from pymongo import MongoClient, AsyncMongoClient, ReadPreference
+from pymongo.read_preferences import read_pref_mode_from_name, make_read_preference
 from pymongo.server_api import ServerApi
+from utils.metrics import mongo_command_metrics, mongo_pool_metrics
+from utils.slow_queries import slow_query_recorder
 
 load_dotenv()
 
@@ -13,26 +17,169 @@ if not DB:
 if not URI:
     raise ValueError("MongoDB URI not found. Set MONGODB_URI or URI environment variable")
 
+# Atlas requiere TLS; un mongod local (benchmarks) normalmente no
+TLS = os.getenv("MONGODB_TLS", "true").lower() not in ("0", "false", "no")
+
+logger = logging.getLogger(__name__)
+
+
+def _env_int(name: str):
+    value = os.getenv(name)
+    return int(value) if value else None
+
+
+# Pool: sin variable se usa el default del driver (maxPoolSize=100, minPoolSize=0).
+# Con varios workers cada proceso tiene su propio pool: workers * MONGO_MAX_POOL_SIZE
+# debe caber en el límite de conexiones del cluster
+POOL_OPTIONS = {
+    key: value for key, value in {
+        "maxPoolSize": _env_int("MONGO_MAX_POOL_SIZE"),
+        "minPoolSize": _env_int("MONGO_MIN_POOL_SIZE"),
+        "maxIdleTimeMS": _env_int("MONGO_MAX_IDLE_TIME_MS"),
+        "waitQueueTimeoutMS": _env_int("MONGO_WAIT_QUEUE_TIMEOUT_MS"),
+    }.items() if value is not None
+}
+
+# Módulo que necesita cada compresor; zlib viene con Python
+_COMPRESSOR_MODULES = {"zstd": "zstandard", "snappy": "snappy", "zlib": "zlib"}
+
+
+def _available_compressors(value: str) -> list:
+    compressors = []
+    for name in (c.strip() for c in value.split(",") if c.strip()):
+        module = _COMPRESSOR_MODULES.get(name)
+        if module is None:
+            logger.warning(f"Unknown compressor {name}, ignored")
+            continue
+        try:
+            __import__(module)
+        except ImportError:
+            logger.warning(f"Compressor {name} requires the {module} package, ignored")
+            continue
+        compressors.append(name)
+    return compressors
+
+
+COMPRESSORS = _available_compressors(os.getenv("MONGO_COMPRESSORS", ""))
+
+# Preferencia de lectura para las rutas de solo lectura (listados, tablero).
+# Leer de secundarios puede regresar datos un poco atrasados respecto a la versión
+# del workspace, que siempre se lee del primario: un ETag o la caché de respuestas
+# pueden quedar asociados a un snapshot viejo hasta la siguiente escritura o el TTL
+READ_PREFERENCE = os.getenv("MONGO_READ_PREFERENCE", "primary")
+MAX_STALENESS_SECONDS = _env_int("MONGO_MAX_STALENESS_SECONDS")
+
 
 _client = None
+_async_client = None
+# pid del proceso que creó los clientes: un worker hecho con fork no debe
+# reutilizar los sockets del padre
+_client_pid = None
+
+def _client_options() -> dict:
+    listeners = [mongo_command_metrics, mongo_pool_metrics]
+    if slow_query_recorder is not None:
+        listeners.append(slow_query_recorder)
+    options = {
+        "server_api": ServerApi("1"),
+        "tls": TLS,
+        "serverSelectionTimeoutMS": 5000,
+        "event_listeners": listeners,
+    }
+    if TLS:
+        options["tlsAllowInvalidCertificates"] = True
+    if COMPRESSORS:
+        options["compressors"] = ",".join(COMPRESSORS)
+    options.update(POOL_OPTIONS)
+    return options
+
+
+def _read_preference():
+    if READ_PREFERENCE == "primary":
+        return ReadPreference.PRIMARY
+    mode = read_pref_mode_from_name(READ_PREFERENCE)
+    return make_read_preference(mode, None, MAX_STALENESS_SECONDS or -1)
+
+# Se resuelve al importar para que un nombre inválido falle al arrancar
+_READ_PREF = _read_preference()
+
+def _discard_inherited_clients():
+    """
+    Si los clientes vienen de otro proceso (fork) se olvidan sin cerrarlos;
+    cerrarlos cortaría las conexiones que el padre sigue usando
+    """
+    global _client, _async_client, _client_pid
+    pid = os.getpid()
+    if _client_pid != pid:
+        _client = None
+        _async_client = None
+        _client_pid = pid
 
 def get_mongo_client():
+    """Cliente síncrono, usado por scripts, tests y herramientas de línea de comandos"""
     global _client
+    _discard_inherited_clients()
     if _client is None:
-        _client = MongoClient(
-            URI,
-            server_api=ServerApi("1"),
-            tls=True,
-            tlsAllowInvalidCertificates=True,
-            serverSelectionTimeoutMS=5000  
-        )
+        _client = MongoClient(URI, **_client_options())
     return _client
 
+def get_async_mongo_client():
+    """Cliente asíncrono compartido, usado por los controllers dentro del event loop"""
+    global _async_client
+    _discard_inherited_clients()
+    if _async_client is None:
+        _async_client = AsyncMongoClient(URI, **_client_options())
+    return _async_client
+
 def get_collection(col):
     """Obtiene una colección de MongoDB"""
     client = get_mongo_client()
     return client[DB][col]
 
+def get_async_collection(col):
+    """Obtiene una colección de MongoDB para usar con await"""
+    client = get_async_mongo_client()
+    return client[DB][col]
+
+class LazyCollection:
+    """
+    Colección que se resuelve en su primer uso, para que importar un controller no
+    cree el cliente. Se vuelve a resolver si el cliente cambia (close_mongo_clients)
+    """
+
+    def __init__(self, name: str, read: bool = False):
+        self._name = name
+        self._read = read
+        self._client = None
+        self._collection = None
+
+    def _resolve(self):
+        client = get_async_mongo_client()
+        if client is not self._client:
+            collection = client[DB][self._name]
+            if self._read:
+                collection = collection.with_options(read_preference=_READ_PREF)
+            self._client, self._collection = client, collection
+        return self._collection
+
+    def __getattr__(self, attr):
+        return getattr(self._resolve(), attr)
+
+def lazy_collection(col, read: bool = False) -> LazyCollection:
+    """
+    Para las colecciones a nivel de módulo en los controllers.
+    read=True aplica MONGO_READ_PREFERENCE (solo rutas de lectura)
+    """
+    return LazyCollection(col, read)
+
+def pool_config() -> dict:
+    return {
+        **POOL_OPTIONS,
+        "compressors": COMPRESSORS,
+        "read_preference": READ_PREFERENCE,
+        "max_staleness_seconds": MAX_STALENESS_SECONDS,
+    }
+
 def t_connection():
     try:
         client = get_mongo_client()
@@ -40,4 +187,22 @@ def t_connection():
         return True
     except Exception as e:
         print(f"Error connecting to MongoDB: {e}")
-        return False
\ No newline at end of file
+        return False
+
+async def t_connection_async():
+    try:
+        client = get_async_mongo_client()
+        await client.admin.command("ping")
+        return True
+    except Exception as e:
+        print(f"Error connecting to MongoDB: {e}")
+        return False
+
+async def close_mongo_clients():
+    global _client, _async_client
+    if _async_client is not None:
+        await _async_client.close()
+        _async_client = None
+    if _client is not None:
+        _client.close()
+        _client = None
@@ -0,0 +1,82 @@
+import base64
+import json
+from typing import Optional
+
+from bson import ObjectId
+from bson.errors import InvalidId
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(last_id, **keys) -> str:
+    """
+    Cursor opaco a partir del _id del último documento de la página y, cuando la
+    página no se ordena solo por _id, de los valores de sus llaves de orden
+    """
+    raw = json.dumps({"id": str(last_id), **keys}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _load_cursor(cursor: str) -> dict:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        data["id"] = ObjectId(data["id"])
+        return data
+    except (ValueError, KeyError, TypeError, InvalidId):
+        raise ValueError("Invalid cursor")
+
+
+def decode_cursor(cursor: str) -> ObjectId:
+    return _load_cursor(cursor)["id"]
+
+
+def decode_keyset_cursor(cursor: str, keys: tuple) -> tuple:
+    """(valor de cada llave de keys..., _id) de un cursor de encode_cursor(last_id, **keys)"""
+    data = _load_cursor(cursor)
+    if any(key not in data for key in keys):
+        raise ValueError("Invalid cursor")
+    return (*(data[key] for key in keys), data["id"])
+
+
+def paginate(items: list, limit: int, id_field: str = "id", keys: tuple = ()) -> tuple:
+    """
+    Recibe hasta limit + 1 documentos (ordenados por keys y _id) y regresa la página
+    junto con el cursor de la siguiente, o None si ya no hay más
+    """
+    if len(items) <= limit:
+        return items, None
+    page = items[:limit]
+    last = page[-1]
+    return page, encode_cursor(last[id_field], **{key: last.get(key) for key in keys})
+
+
+def keyset_match(keys: tuple, after: tuple) -> dict:
+    """
+    Documentos posteriores a after en el orden (keys..., _id):
+    {$or: [{k1: {$gt: v1}}, {k1: v1, k2: {$gt: v2}}, ..., {k1: v1, ..., _id: {$gt: id}}]}
+
+    Un valor None (documentos viejos sin rank) va antes que cualquier otro en el orden
+    de MongoDB, pero {$gt: None} no encuentra nada: lo posterior a None es {$ne: None}
+    """
+    fields = (*keys, "_id")
+    branches = []
+    for i, field in enumerate(fields):
+        branch = {fields[j]: after[j] for j in range(i)}
+        branch[field] = {"$ne": None} if after[i] is None else {"$gt": after[i]}
+        branches.append(branch)
+    return branches[0] if len(branches) == 1 else {"$or": branches}
+
+
+def keyset_stages(after, limit: int, keys: tuple = ()) -> list:
+    """
+    Etapas $match/$sort/$limit para paginar por (keys..., _id); after es el _id (sin keys)
+    o la tupla de decode_keyset_cursor. Pide un documento extra para saber si hay otra página
+    """
+    stages = []
+    if after is not None:
+        stages.append({"$match": keyset_match(keys, after if keys else (after,))})
+    stages.append({"$sort": {**{key: 1 for key in keys}, "_id": 1}})
+    stages.append({"$limit": limit + 1})
+    return stages
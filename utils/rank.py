@@ -0,0 +1,99 @@
+"""
+Ranks lexicográficos para ordenar tareas dentro de una lista (y listas dentro de un workspace).
+
+Un rank es un string de dígitos base 62 que se compara byte a byte, así que insertar
+un elemento entre dos vecinos solo requiere calcular un string intermedio y escribir
+un documento. Ningún rank termina en "0", lo que garantiza que siempre hay espacio
+entre dos ranks distintos.
+"""
+import math
+from typing import Optional
+
+DIGITS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+BASE = len(DIGITS)
+_INDEX = {digit: i for i, digit in enumerate(DIGITS)}
+
+
+class RankBoundsError(ValueError):
+    """Los vecinos tienen el mismo rank o están invertidos (p. ej. dos altas concurrentes al final)"""
+
+
+def _digit(rank: str, position: int) -> int:
+    return _INDEX[rank[position]]
+
+
+def rank_between(before: Optional[str], after: Optional[str]) -> str:
+    """
+    Regresa un rank estrictamente mayor que before y menor que after.
+    None significa que no hay vecino de ese lado
+    """
+    if before is not None and after is not None and before >= after:
+        raise RankBoundsError(f"Invalid rank bounds: {before!r} >= {after!r}")
+
+    result = []
+    position = 0
+    bounded = after is not None
+    while True:
+        low = _digit(before, position) if before and position < len(before) else 0
+        high = _digit(after, position) if bounded else BASE
+
+        if high - low > 1:
+            result.append(DIGITS[(low + high) // 2])
+            return "".join(result)
+
+        result.append(DIGITS[low])
+        if high - low == 1:
+            bounded = False
+        position += 1
+
+
+def rank_after(rank: Optional[str]) -> str:
+    """
+    Rank para agregar al final. Incrementa el primer dígito que todavía tiene espacio,
+    lo que mantiene los ranks cortos cuando se agregan muchos elementos seguidos
+    """
+    if not rank:
+        return DIGITS[1]
+    for position, digit in enumerate(rank):
+        value = _INDEX[digit]
+        if value < BASE - 1:
+            return rank[:position] + DIGITS[value + 1]
+    return rank + DIGITS[1]
+
+
+def ranks_between(before: Optional[str], after: Optional[str], count: int) -> list:
+    """
+    count ranks ordenados entre before y after, partiendo el intervalo a la mitad
+    para que la longitud crezca de forma logarítmica
+    """
+    if count <= 0:
+        return []
+    middle = rank_between(before, after)
+    left = count // 2
+    return (
+        ranks_between(before, middle, left)
+        + [middle]
+        + ranks_between(middle, after, count - left - 1)
+    )
+
+
+def spread_ranks(count: int) -> list:
+    """
+    count ranks de ancho fijo repartidos en la mitad inferior del espacio,
+    dejando espacio libre al final para los elementos que se agreguen después.
+    Los usa el rebalanceo para reemplazar ranks que crecieron demasiado
+    """
+    if count <= 0:
+        return []
+    width = max(1, math.ceil(math.log(2 * (count + 1), BASE)))
+    step = (BASE ** width // 2) // (count + 1)
+
+    ranks = []
+    for i in range(1, count + 1):
+        value = i * step
+        digits = []
+        for _ in range(width):
+            value, remainder = divmod(value, BASE)
+            digits.append(DIGITS[remainder])
+        ranks.append("".join(reversed(digits)).rstrip(DIGITS[0]))
+    return ranks
@@ -0,0 +1,149 @@
+import os
+import asyncio
+import logging
+from datetime import datetime, timezone
+
+from bson import ObjectId
+from pymongo import UpdateOne
+
+from utils.mongodb import get_async_collection
+from utils.rank import spread_ranks
+from utils.versioning import mark_workspace_changed
+from utils.worker_state import is_leader
+
+logger = logging.getLogger(__name__)
+
+RANK_MAX_LENGTH = int(os.getenv("RANK_MAX_LENGTH", "24"))
+RANK_REBALANCE_INTERVAL = float(os.getenv("RANK_REBALANCE_INTERVAL", "600"))
+
+# colección -> campo que agrupa los elementos ordenados por rank
+_GROUPS = {
+    "tasks": "id_list",
+    "lists": "id_workspace",
+}
+
+# Grupos con algún rank más largo que RANK_MAX_LENGTH, marcados al escribirlo.
+# La longitud de un string no se puede indexar, así que el rebalanceo lee esta
+# colección (pocos documentos, por _id) en lugar de recorrer tasks y lists
+_PENDING = "rank_rebalance"
+
+
+async def rebalance_group(col: str, group_id: str) -> int:
+    """
+    Reasigna ranks cortos y equidistantes a todos los elementos de un grupo
+    (las tareas de una lista o las listas de un workspace), respetando el orden actual.
+    Los elementos sin rank quedan al principio, ordenados por _id
+    """
+    collection = get_async_collection(col)
+    field = _GROUPS[col]
+
+    documents = await collection.find(
+        {field: group_id},
+        {"_id": 1}
+    ).sort([("rank", 1), ("_id", 1)]).to_list()
+
+    ranks = spread_ranks(len(documents))
+    operations = [
+        UpdateOne({"_id": doc["_id"]}, {"$set": {"rank": rank}})
+        for doc, rank in zip(documents, ranks)
+    ]
+    if operations:
+        await collection.bulk_write(operations, ordered=False)
+        workspace_id = await _workspace_of(col, group_id)
+        if workspace_id:
+            await mark_workspace_changed(workspace_id)
+    return len(operations)
+
+
+async def _workspace_of(col: str, group_id: str):
+    if col == "lists":
+        return group_id
+    list_data = await get_async_collection("lists").find_one({"_id": ObjectId(group_id)}, {"id_workspace": 1})
+    return list_data.get("id_workspace") if list_data else None
+
+
+async def _groups_matching(col: str, condition: dict) -> list:
+    field = _GROUPS[col]
+    cursor = await get_async_collection(col).aggregate([
+        {"$match": condition},
+        {"$group": {"_id": f"${field}"}}
+    ])
+    return [doc["_id"] for doc in await cursor.to_list() if doc["_id"]]
+
+
+async def flag_long_ranks(col: str, group_id: str, ranks: list, max_length: int = RANK_MAX_LENGTH) -> bool:
+    """
+    Marca el grupo para el siguiente rebalanceo si alguno de los ranks que se van a
+    escribir es más largo que max_length. Solo los inserts entre vecinos alargan los
+    ranks (rank_after los mantiene cortos), así que casi nunca escribe
+    """
+    if not any(len(rank) > max_length for rank in ranks):
+        return False
+    await get_async_collection(_PENDING).update_one(
+        {"_id": {"col": col, "group": group_id}},
+        {"$set": {"flagged_at": datetime.now(timezone.utc)}},
+        upsert=True
+    )
+    return True
+
+
+async def rebalance_long_ranks() -> dict:
+    """
+    Rebalancea solo los grupos marcados por flag_long_ranks
+    """
+    pending = get_async_collection(_PENDING)
+    rebalanced = {col: 0 for col in _GROUPS}
+    for flag in await pending.find({}).to_list():
+        col, group_id = flag["_id"]["col"], flag["_id"]["group"]
+        if col in _GROUPS:
+            await rebalance_group(col, group_id)
+            rebalanced[col] += 1
+        # Si se volvió a marcar mientras se rebalanceaba, queda para la siguiente vuelta
+        await pending.delete_one({"_id": flag["_id"], "flagged_at": flag["flagged_at"]})
+
+    for col, count in rebalanced.items():
+        if count:
+            logger.info(f"Rebalanced ranks in {count} groups of {col}")
+    return rebalanced
+
+
+async def flag_existing_long_ranks(max_length: int = RANK_MAX_LENGTH) -> dict:
+    """
+    Marca los grupos con ranks largos escritos antes de flag_long_ranks.
+    Recorre las colecciones completas, por eso es una migración y no parte del loop
+    """
+    flagged = {}
+    for col in _GROUPS:
+        groups = await _groups_matching(col, {
+            "rank": {"$type": "string"},
+            "$expr": {"$gt": [{"$strLenCP": "$rank"}, max_length]}
+        })
+        for group_id in groups:
+            await flag_long_ranks(col, group_id, ["0" * (max_length + 1)], max_length)
+        flagged[col] = len(groups)
+    return flagged
+
+
+async def backfill_missing_ranks() -> dict:
+    """
+    Asigna rank a los documentos creados antes de que existiera el campo
+    """
+    backfilled = {}
+    for col in _GROUPS:
+        groups = await _groups_matching(col, {"rank": {"$exists": False}})
+        for group_id in groups:
+            await rebalance_group(col, group_id)
+        backfilled[col] = len(groups)
+    return backfilled
+
+
+async def rebalance_loop(interval: float = RANK_REBALANCE_INTERVAL):
+    """Tarea de fondo que se arranca en el lifespan; con varios workers solo rebalancea el líder"""
+    while True:
+        await asyncio.sleep(interval)
+        if not is_leader():
+            continue
+        try:
+            await rebalance_long_ranks()
+        except Exception as e:
+            logger.error(f"Rank rebalance failed: {e}")
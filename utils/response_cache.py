@@ -0,0 +1,265 @@
+"""
+Caché de respuestas para las lecturas de listas y tareas de un workspace.
+
+Las entradas se guardan serializadas, con la versión del workspace en la llave
+(cache_key) y etiquetadas con su id. Una escritura sube la versión (mark_workspace_changed),
+así que las entradas anteriores dejan de coincidir; invalidate solo libera su espacio.
+
+Backends:
+    memory  LRU en memoria del proceso (por defecto)
+    redis   cualquier servidor que hable el protocolo RESP de Redis (REDIS_URL)
+    none    desactivada
+
+Como la versión se lee de la base en cada request, el backend memory es correcto
+con varios workers (server.py) aunque invalidate solo alcance al proceso que escribió:
+los demás workers nunca sirven una entrada de otra versión, solo la conservan hasta
+que vence el TTL o sale del LRU. redis evita que cada worker calcule su propia copia.
+"""
+import os
+import json
+import asyncio
+import logging
+from datetime import datetime
+from typing import Optional
+from urllib.parse import urlparse
+
+from utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+RESPONSE_CACHE_BACKEND = os.getenv("RESPONSE_CACHE_BACKEND", "memory")
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "30"))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "2000"))
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(1024 * 1024)))
+REDIS_URL = os.getenv("REDIS_URL", "redis://127.0.0.1:6379/0")
+
+
+def _json_default(value):
+    # Igual que el encoder de FastAPI para que una respuesta cacheada sea idéntica a una fresca
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+class MemoryBackend:
+
+    def __init__(self, max_entries: int):
+        self._entries = TTLCache(maxsize=max_entries, ttl=RESPONSE_CACHE_TTL)
+        self._tags = {}
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self._entries.get(key, None)
+
+    async def set(self, key: str, data: bytes, ttl: float, tag: str):
+        self._entries.set(key, data, ttl)
+        keys = self._tags.setdefault(tag, set())
+        keys.add(key)
+        # Quita del índice las llaves que ya salieron del LRU
+        stale = [k for k in keys if k not in self._entries]
+        keys.difference_update(stale)
+
+    async def invalidate(self, tag: str):
+        for key in self._tags.pop(tag, ()):
+            self._entries.pop(key)
+
+
+class RedisError(Exception):
+    pass
+
+
+class RedisReplyError(RedisError):
+    """Respuesta de error (-ERR, -OOM, ...) de un comando; la conexión sigue sincronizada"""
+
+
+class RedisBackend:
+    """
+    Cliente RESP mínimo sobre una sola conexión. Los comandos de cada operación
+    se envían juntos (pipelining) para pagar un solo round trip
+    """
+
+    def __init__(self, url: str):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "127.0.0.1"
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self._reader = None
+        self._writer = None
+        self._lock = asyncio.Lock()
+
+    @staticmethod
+    def _encode(*args) -> bytes:
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode()
+            parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+        return b"".join(parts)
+
+    async def _read_reply(self):
+        line = await self._reader.readline()
+        if not line:
+            raise ConnectionError("Redis connection closed")
+        prefix, body = line[:1], line[1:-2]
+        if prefix == b"+":
+            return body.decode()
+        if prefix == b"-":
+            # Se regresa en vez de lanzarse para que _send lea las respuestas restantes
+            return RedisReplyError(body.decode())
+        if prefix == b":":
+            return int(body)
+        if prefix == b"$":
+            length = int(body)
+            if length < 0:
+                return None
+            return (await self._reader.readexactly(length + 2))[:-2]
+        if prefix == b"*":
+            length = int(body)
+            if length < 0:
+                return None
+            return [await self._read_reply() for _ in range(length)]
+        raise RedisError(f"Unexpected reply: {line!r}")
+
+    async def _connect(self):
+        self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        if self.password:
+            await self._send([("AUTH", self.password)])
+        if self.db:
+            await self._send([("SELECT", self.db)])
+
+    async def _send(self, commands: list) -> list:
+        """
+        Envía los comandos juntos y lee todas sus respuestas antes de reportar el primer
+        error, para no dejar respuestas pendientes que contestarían al siguiente comando
+        """
+        self._writer.write(b"".join(self._encode(*command) for command in commands))
+        await self._writer.drain()
+        replies = [await self._read_reply() for _ in commands]
+        for reply in replies:
+            if isinstance(reply, RedisReplyError):
+                raise reply
+        return replies
+
+    async def _pipeline(self, *commands) -> list:
+        async with self._lock:
+            try:
+                if self._writer is None:
+                    await self._connect()
+                return await self._send(list(commands))
+            except RedisReplyError:
+                raise
+            except BaseException:
+                # Error de red, respuesta inesperada o cancelación a media lectura: la conexión
+                # puede tener respuestas sin leer y no se reutiliza
+                await self._close()
+                raise
+
+    async def _close(self):
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return (await self._pipeline(("GET", key)))[0]
+
+    async def set(self, key: str, data: bytes, ttl: float, tag: str):
+        ttl_ms = int(ttl * 1000)
+        await self._pipeline(
+            ("SET", key, data, "PX", ttl_ms),
+            ("SADD", f"tag:{tag}", key),
+            ("PEXPIRE", f"tag:{tag}", ttl_ms),
+        )
+
+    async def invalidate(self, tag: str):
+        keys = (await self._pipeline(("SMEMBERS", f"tag:{tag}")))[0] or []
+        await self._pipeline(("DEL", f"tag:{tag}", *keys))
+
+
+class ResponseCache:
+
+    def __init__(self, backend, ttl: float = RESPONSE_CACHE_TTL, max_bytes: int = RESPONSE_CACHE_MAX_BYTES):
+        self.backend = backend
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.skipped = 0
+        self.invalidations = 0
+        self.errors = 0
+
+    async def get(self, key: Optional[str]) -> Optional[dict]:
+        if self.backend is None or key is None:
+            return None
+        try:
+            data = await self.backend.get(key)
+            value = None if data is None else json.loads(data)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Response cache get failed: {e}")
+            value = None
+
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value
+
+    async def set(self, key: Optional[str], value: dict, tag: str):
+        if self.backend is None or key is None:
+            return
+        data = json.dumps(value, default=_json_default).encode()
+        if len(data) > self.max_bytes:
+            self.skipped += 1
+            return
+        try:
+            await self.backend.set(key, data, self.ttl, tag)
+            self.stores += 1
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Response cache set failed: {e}")
+
+    async def invalidate(self, tag: str):
+        if self.backend is None:
+            return
+        try:
+            await self.backend.invalidate(tag)
+            self.invalidations += 1
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Response cache invalidation failed: {e}")
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__ if self.backend else None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "stores": self.stores,
+            "skipped_too_large": self.skipped,
+            "invalidations": self.invalidations,
+            "errors": self.errors,
+        }
+
+
+def cache_key(kind: str, workspace_id: str, version: Optional[int], *variant) -> Optional[str]:
+    """
+    Llave de una lectura del workspace en la versión que leyó conditional_get.
+    Una respuesta calculada antes de una escritura queda guardada con la versión
+    anterior y nunca se sirve con el ETag nuevo. None (workspace sin versión) no se cachea
+    """
+    if version is None:
+        return None
+    return ":".join([kind, workspace_id, str(version), *(str(v) for v in variant)])
+
+
+def _create_backend(name: str):
+    if name == "memory":
+        return MemoryBackend(RESPONSE_CACHE_MAX_ENTRIES)
+    if name == "redis":
+        return RedisBackend(REDIS_URL)
+    return None
+
+
+response_cache = ResponseCache(_create_backend(RESPONSE_CACHE_BACKEND))
@@ -0,0 +1,26 @@
+"""
+Respuesta JSON serializada con orjson.
+
+Las rutas de lectura regresan FastJSONResponse directamente para saltarse
+jsonable_encoder, que recorre cada dict del resultado antes de serializarlo.
+orjson escribe datetime de forma nativa y ObjectId (o cualquier otro tipo de bson)
+como texto, así que los pipelines pueden regresar _id sin convertirlo con $toString.
+"""
+import orjson
+from fastapi.responses import JSONResponse
+
+
+def _default(value):
+    # ObjectId, Decimal128, ...: mismo texto que str(), como hacía jsonable_encoder
+    return str(value)
+
+
+def dumps(content) -> bytes:
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class FastJSONResponse(JSONResponse):
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return dumps(content)
@@ -0,0 +1,58 @@
+"""
+Búsqueda de tareas dentro de un workspace (GET /workspaces/{id}/search?q=).
+
+Dos caminos, ambos acotados por id_workspace en el índice:
+
+    texto   las palabras completas van a $text sobre el índice id_workspace_text
+            (title con más peso que description) y se ordenan por textScore
+    prefijo la última palabra, mientras se escribe, se compara con title_terms
+            (palabras del título normalizadas) con un regex anclado ^, que se
+            resuelve como un rango del índice id_workspace_title_terms
+
+"write rep" busca tareas con "write" cuyo título tenga una palabra que empiece con "rep";
+con un espacio al final ("write report ") todas las palabras se consideran completas.
+"""
+import re
+import unicodedata
+from typing import Optional
+
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+# La paginación es por skip; más allá de esto conviene refinar la búsqueda
+MAX_SEARCH_SKIP = 1000
+MAX_QUERY_TERMS = 10
+# Índice de utils/indexes.py que resuelve la búsqueda por prefijo
+PREFIX_INDEX = "id_workspace_title_terms"
+
+_WORD = re.compile(r"[0-9a-z]+")
+
+
+def normalize(text: str) -> str:
+    """Minúsculas y sin acentos, para que "Revisión" y "revision" sean el mismo término"""
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).lower()
+
+
+def title_terms(title: str) -> list:
+    """Palabras distintas del título, en el orden en que aparecen; se guardan en cada tarea"""
+    return list(dict.fromkeys(_WORD.findall(normalize(title))))
+
+
+def parse_query(q: str, prefix: bool = True) -> tuple:
+    """
+    Separa q en (palabras completas, prefijo). El prefijo es la última palabra cuando
+    prefix es True y q no termina en espacio; None si no hay prefijo
+    """
+    words = _WORD.findall(normalize(q))[:MAX_QUERY_TERMS]
+    if not words:
+        raise ValueError("Search query must contain at least one letter or number")
+
+    partial: Optional[str] = None
+    if prefix and not q[-1].isspace():
+        partial = words.pop()
+    return words, partial
+
+
+def prefix_regex(partial: str) -> str:
+    # partial solo tiene [0-9a-z], pero se escapa igual por si cambia _WORD
+    return f"^{re.escape(partial)}"
@@ -1,20 +1,30 @@
 import os
-import secrets
+import hmac
+import time
 import hashlib
-import base64
 import jwt
 
 from datetime import datetime, timedelta
-from fastapi import HTTPException, Depends, Request
+from fastapi import HTTPException, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from dotenv import load_dotenv
 from jwt import PyJWTError
-from functools import wraps
+
+from utils.cache import TTLCache, MISSING
 
 load_dotenv()
 
 SECRET_KEY = os.getenv("SECRET_KEY")
+# Token estático para el scrape de Prometheus; los JWT de admin vencen en una hora
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
 security = HTTPBearer()
+_optional_security = HTTPBearer(auto_error=False)
+
+# Claims ya verificados, indexados por el sha256 del token. Cada entrada expira junto con el token
+_token_cache = TTLCache(
+    maxsize=int(os.getenv("JWT_CACHE_SIZE", "10000")),
+    ttl=3600,
+)
 
 def create_jwt_token(
           name:str
@@ -40,178 +50,68 @@ def create_jwt_token(
     return token
 
 
-def validateuser(func):
-    @wraps(func)
-    async def wrapper( *args, **kwargs ):
-        request = kwargs.get('request')
-        if not request:
-            raise HTTPException( status_code=400, detail="Request object not found"  )
-
-
-        if request.method == "OPTIONS":
-            result = func(*args, **kwargs)
-            if hasattr(result, '__await__'):
-                return await result
-            return result
-        
-        authorization: str = request.headers.get("Authorization")
-        if not authorization:
-            raise HTTPException( status_code=400, detail="Authorization header missing"  )
-
-        schema, token = authorization.split()
-        if schema.lower() != "bearer":
-            raise HTTPException( status_code=400, detail="Invalid auth schema"  )
-
-        try:
-            payload = jwt.decode( token , SECRET_KEY, algorithms=["HS256"] )
-
-            email = payload.get("email")
-            name = payload.get("name")
-            active = payload.get("active")
-            exp = payload.get("exp")
-            id = payload.get("id")
-
-            if email is None:
-                raise HTTPException( status_code=401 , detail="Token Invalid" )
-
-            if datetime.utcfromtimestamp(exp) < datetime.utcnow():
-                raise HTTPException( status_code=401 , detail="Expired token" )
-
-            if not active:
-                raise HTTPException( status_code=401 , detail="Inactive user" )
-
-            request.state.email = email
-            request.state.name = name
-            request.state.id = id
-            request.state.admin = payload.get("admin", False)
-
-
-        except PyJWTError:
-            raise HTTPException( status_code=401, detail="Invalid token or expired token"  )
-
-        result = func( *args, **kwargs )
-        if hasattr(result, '__await__'):
-            return await result
-        return result
-    return wrapper
-
-
-def validateadmin(func):
-    @wraps(func)
-    async def wrapper( *args, **kwargs ):
-        request = kwargs.get('request')
-        if not request:
-            raise HTTPException( status_code=400, detail="Request object not found"  )
-
-        authorization: str = request.headers.get("Authorization")
-        if not authorization:
-            raise HTTPException( status_code=400, detail="Authorization header missing"  )
 
-        schema, token = authorization.split()
-        if schema.lower() != "bearer":
-            raise HTTPException( status_code=400, detail="Invalid auth schema"  )
+def decode_token(token: str) -> dict:
+    """
+    Verifica un token HS256 y regresa los datos del usuario.
+    El resultado se guarda en caché hasta el exp del token, así un cliente que
+    reutiliza su token no paga la verificación de la firma en cada request
+    """
+    key = hashlib.sha256(token.encode()).digest()
+    user = _token_cache.get(key)
+    if user is not MISSING:
+        return user
 
-        try:
-            payload = jwt.decode( token , SECRET_KEY, algorithms=["HS256"] )
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=["HS256"], options={"require": ["exp"]})
+    except PyJWTError:
+        raise HTTPException(status_code=401, detail="Invalid token or expired token")
 
-            email = payload.get("email")
-            name = payload.get("name")
-            active = payload.get("active")
-            admin = payload.get("admin")
-            exp = payload.get("exp")
-            id = payload.get("id")
+    if payload.get("email") is None:
+        raise HTTPException(status_code=401, detail="Token Invalid")
 
-            if email is None:
-                raise HTTPException( status_code=401 , detail="Token Invalid" )
+    if not payload.get("active"):
+        raise HTTPException(status_code=401, detail="Inactive user")
 
-            if datetime.utcfromtimestamp(exp) < datetime.utcnow():
-                raise HTTPException( status_code=401 , detail="Expired token" )
+    admin = bool(payload.get("admin", False))
+    user = {
+        "id": payload.get("id"),
+        "email": payload.get("email"),
+        "name": payload.get("name"),
+        "active": True,
+        "admin": admin,
+        "role": "admin" if admin else "user"
+    }
 
-            if not active or not admin:
-                raise HTTPException( status_code=401 , detail="Inactive user or not admin" )
+    _token_cache.set(key, user, payload["exp"] - time.time())
+    return user
 
-            request.state.email = email
-            request.state.firstname = firstname
-            request.state.admin = admin
-            request.state.id = id
 
+# Funciones para FastAPI Dependency Injection
+def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
+    """Validar token JWT para usuarios autenticados - Para usar con Depends()"""
+    return decode_token(credentials.credentials)
 
-        except PyJWTError:
-            raise HTTPException( status_code=401, detail="Invalid token or expired token"  )
 
-        result = func( *args, **kwargs )
-        if hasattr(result, '__await__'):
-            return await result
-        return result
-    return wrapper
+def require_admin(user: dict = Depends(get_current_user)) -> dict:
+    """Validar que el usuario autenticado sea administrador - Para usar con Depends()"""
+    if not user["admin"]:
+        raise HTTPException(status_code=401, detail="Inactive user or not admin")
+    return user
 
 
-# Funciones para FastAPI Dependency Injection
-def validate_token(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
-    """Validar token JWT para usuarios autenticados - Para usar con Depends()"""
-    token = credentials.credentials
-    
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
-        
-        email = payload.get("email")
-        name = payload.get("name")
-        active = payload.get("active")
-        admin = payload.get("admin", False)
-        exp = payload.get("exp")
-        user_id = payload.get("id")
-        
-        if email is None:
-            raise HTTPException(status_code=401, detail="Token Invalid")
-        
-        if datetime.utcfromtimestamp(exp) < datetime.utcnow():
-            raise HTTPException(status_code=401, detail="Expired token")
-        
-        if not active:
-            raise HTTPException(status_code=401, detail="Inactive user")
-        
-        return {
-            "id": user_id,
-            "email": email,
-            "name": tname,
-            "active": active,
-            "role": "admin" if admin else "user"
-        }
-        
-    except PyJWTError:
-        raise HTTPException(status_code=401, detail="Invalid token or expired token")
+def require_metrics_token(credentials: HTTPAuthorizationCredentials = Depends(_optional_security)) -> None:
+    """
+    Validar el bearer de /metrics: METRICS_TOKEN (bearer_token del scrape_config)
+    o el JWT de un administrador - Para usar con Depends()
+    """
+    if credentials is None:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    if METRICS_TOKEN and hmac.compare_digest(credentials.credentials.encode(), METRICS_TOKEN.encode()):
+        return
+    if not decode_token(credentials.credentials)["admin"]:
+        raise HTTPException(status_code=401, detail="Inactive user or not admin")
 
 
-def validate_admin(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
-    """Validar token JWT para administradores - Para usar con Depends()"""
-    token = credentials.credentials
-    
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
-        
-        email = payload.get("email")
-        name = payload.get("name")
-        active = payload.get("active")
-        admin = payload.get("admin", False)
-        exp = payload.get("exp")
-        user_id = payload.get("id")
-        
-        if email is None:
-            raise HTTPException(status_code=401, detail="Token Invalid")
-        
-        if datetime.utcfromtimestamp(exp) < datetime.utcnow():
-            raise HTTPException(status_code=401, detail="Expired token")
-        
-        if not active or not admin:
-            raise HTTPException(status_code=401, detail="Inactive user or not admin")
-        
-        return {
-            "id": user_id,
-            "email": email,
-            "name": name,
-            "active": active,
-            "role": "admin"
-        }
-        
-    except PyJWTError:
-        raise HTTPException(status_code=401, detail="Invalid token or expired token")
\ No newline at end of file
+def token_cache_stats() -> dict:
+    return _token_cache.stats()
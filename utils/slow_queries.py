@@ -0,0 +1,167 @@
+"""
+Registro de comandos lentos de MongoDB.
+
+Se activa solo con SLOW_QUERY_MS (umbral en milisegundos); sin esa variable el
+listener ni siquiera se registra en el cliente. Cada comando que supera el umbral
+se guarda con la ruta que lo originó en un buffer circular de SLOW_QUERY_BUFFER
+entradas, visible en GET /debug/slow-queries (solo admins).
+
+Con SLOW_QUERY_EXPLAIN=1 además se ejecuta explain (queryPlanner) en segundo plano
+para anotar si el plan ganador usa COLLSCAN o IXSCAN y con qué índices.
+"""
+import os
+import json
+import time
+import asyncio
+import logging
+from collections import deque
+from contextvars import ContextVar
+from typing import Optional
+
+from bson import json_util
+from pymongo import monitoring
+
+logger = logging.getLogger(__name__)
+
+SLOW_QUERY_MS = os.getenv("SLOW_QUERY_MS")
+SLOW_QUERY_BUFFER = int(os.getenv("SLOW_QUERY_BUFFER", "100"))
+SLOW_QUERY_EXPLAIN = os.getenv("SLOW_QUERY_EXPLAIN", "").lower() in ("1", "true", "yes")
+
+_EXPLAINABLE = {"find", "aggregate", "count", "distinct", "update", "delete", "findAndModify"}
+# Campos que agrega el driver y no aportan al diagnóstico
+_DRIVER_FIELDS = {"lsid", "txnNumber", "apiVersion", "apiStrict", "apiDeprecationErrors"}
+
+# scope ASGI del request en curso; la ruta se resuelve al registrar el comando
+_current_scope: ContextVar[Optional[dict]] = ContextVar("slow_query_scope", default=None)
+
+
+def _route_of(scope: Optional[dict]) -> Optional[str]:
+    if scope is None:
+        return None
+    route = scope.get("route")
+    path = getattr(route, "path", None) or scope.get("path")
+    return f"{scope.get('method')} {path}"
+
+
+def _clean_command(command: dict) -> dict:
+    cleaned = {}
+    for key, value in command.items():
+        if key in _DRIVER_FIELDS or key.startswith("$"):
+            continue
+        if key == "documents":
+            cleaned[key] = f"<{len(value)} documents>"
+            continue
+        cleaned[key] = value
+    return cleaned
+
+
+def _plan_stages(plan, stages: list, indexes: list):
+    if isinstance(plan, dict):
+        if isinstance(plan.get("stage"), str):
+            stages.append(plan["stage"])
+        if isinstance(plan.get("indexName"), str):
+            indexes.append(plan["indexName"])
+        for value in plan.values():
+            _plan_stages(value, stages, indexes)
+    elif isinstance(plan, list):
+        for value in plan:
+            _plan_stages(value, stages, indexes)
+
+
+def summarize_plan(explain: dict) -> dict:
+    stages, indexes = [], []
+    _plan_stages(explain, stages, indexes)
+    if "COLLSCAN" in stages:
+        summary = "COLLSCAN"
+    elif "IXSCAN" in stages or "EXPRESS_IXSCAN" in stages:
+        summary = "IXSCAN"
+    else:
+        summary = stages[0] if stages else None
+    return {"plan": summary, "indexes": sorted(set(indexes))}
+
+
+class SlowQueryRecorder(monitoring.CommandListener):
+
+    def __init__(self, threshold_ms: float, size: int = SLOW_QUERY_BUFFER, explain: bool = SLOW_QUERY_EXPLAIN):
+        self.threshold_ms = threshold_ms
+        self.explain = explain
+        self.entries = deque(maxlen=size)
+        self._pending = {}
+        # El event loop solo guarda referencias débiles a sus tareas
+        self._explains = set()
+
+    def started(self, event):
+        if event.command_name == "explain":
+            return
+        self._pending[(event.connection_id, event.request_id)] = (event.command, _current_scope.get())
+
+    def succeeded(self, event):
+        self._finish(event, None)
+
+    def failed(self, event):
+        self._finish(event, str(event.failure.get("errmsg", "")) if isinstance(event.failure, dict) else str(event.failure))
+
+    def _finish(self, event, error: Optional[str]):
+        pending = self._pending.pop((event.connection_id, event.request_id), None)
+        if pending is None:
+            return
+        duration_ms = event.duration_micros / 1000
+        if duration_ms < self.threshold_ms:
+            return
+
+        command, scope = pending
+        target = command.get(event.command_name)
+        entry = {
+            "timestamp": time.time(),
+            "duration_ms": round(duration_ms, 3),
+            "database": event.database_name,
+            "collection": target if isinstance(target, str) else command.get("collection"),
+            "command_name": event.command_name,
+            "command": _clean_command(command),
+            "route": _route_of(scope),
+            "error": error,
+            "plan": None,
+            "indexes": None,
+        }
+        self.entries.append(entry)
+
+        if self.explain and event.command_name in _EXPLAINABLE:
+            try:
+                task = asyncio.get_running_loop().create_task(self._explain(entry))
+            except RuntimeError:
+                # Cliente síncrono fuera del event loop: se guarda sin plan
+                return
+            self._explains.add(task)
+            task.add_done_callback(self._explain_done)
+
+    def _explain_done(self, task: asyncio.Task):
+        self._explains.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Slow query explain failed: {task.exception()!r}")
+
+    async def _explain(self, entry: dict):
+        from utils.mongodb import get_async_mongo_client
+        try:
+            result = await get_async_mongo_client()[entry["database"]].command(
+                {"explain": entry["command"], "verbosity": "queryPlanner"}
+            )
+            entry.update(summarize_plan(result))
+        except Exception as e:
+            entry["plan"] = f"explain failed: {e}"
+
+    def recent(self, limit: int = None) -> list:
+        """Entradas más recientes primero, en Extended JSON para que ObjectId y fechas sean serializables"""
+        entries = list(self.entries)[::-1]
+        entries = entries[:limit] if limit else entries
+        return json.loads(json_util.dumps(entries))
+
+
+slow_query_recorder = SlowQueryRecorder(float(SLOW_QUERY_MS)) if SLOW_QUERY_MS else None
+
+
+async def slow_query_middleware(request, call_next):
+    token = _current_scope.set(request.scope)
+    try:
+        return await call_next(request)
+    finally:
+        _current_scope.reset(token)
@@ -0,0 +1,109 @@
+"""
+Tiempos de arranque.
+
+En el proceso: main.py registra cuánto tardó en importarse la app y el lifespan
+mide cada fase de inicialización con startup_phase(); se consultan en /stats/startup.
+
+Reporte de importación por módulo (corre `python -X importtime` en un subproceso):
+
+    python -m utils.startup --top 25
+    python -m utils.startup --json > startup.json
+"""
+import re
+import sys
+import json
+import time
+import argparse
+import subprocess
+from contextlib import contextmanager
+
+_report = {"import_seconds": None, "phases": {}, "startup_seconds": None}
+_started_at = None
+
+
+def record_import(seconds: float):
+    _report["import_seconds"] = round(seconds, 4)
+
+
+@contextmanager
+def startup_phase(name: str):
+    global _started_at
+    if _started_at is None:
+        _started_at = time.perf_counter()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _report["phases"][name] = round(time.perf_counter() - start, 4)
+
+
+def startup_finished():
+    if _started_at is not None:
+        _report["startup_seconds"] = round(time.perf_counter() - _started_at, 4)
+
+
+def startup_report() -> dict:
+    return {**_report, "phases": dict(_report["phases"])}
+
+
+#------------------------------------------------------------------------------------
+
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def parse_importtime(output: str) -> list:
+    """
+    Convierte la salida de -X importtime en [{module, self_ms, cumulative_ms, depth}].
+    depth 0 son los imports directos del módulo raíz
+    """
+    modules = []
+    for line in output.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, module = match.groups()
+        modules.append({
+            "module": module,
+            "self_ms": int(self_us) / 1000,
+            "cumulative_ms": int(cumulative_us) / 1000,
+            "depth": (len(indent) - 1) // 2,
+        })
+    return modules
+
+
+def import_report(module: str = "main", top: int = 25) -> dict:
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True
+    )
+    wall = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr else "import failed")
+
+    modules = parse_importtime(result.stderr)
+    root = next((m for m in modules if m["module"] == module), None)
+    return {
+        "module": module,
+        "process_seconds": round(wall, 4),
+        "import_ms": root["cumulative_ms"] if root else None,
+        "slowest_cumulative": sorted(modules, key=lambda m: m["cumulative_ms"], reverse=True)[:top],
+        "slowest_self": sorted(modules, key=lambda m: m["self_ms"], reverse=True)[:top],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tiempo de importación por módulo de la app")
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--json", action="store_true", help="Salida en JSON")
+    args = parser.parse_args()
+
+    report = import_report(args.module, args.top)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"import {report['module']}: {report['import_ms']} ms (process {report['process_seconds']} s)")
+        print(f"{'cumulative ms':>14} {'self ms':>10}  module")
+        for m in report["slowest_cumulative"]:
+            print(f"{m['cumulative_ms']:>14.1f} {m['self_ms']:>10.1f}  {m['module']}")
@@ -0,0 +1,44 @@
+import os
+
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+
+from utils.responses import dumps
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+CURSOR_BATCH_SIZE = int(os.getenv("CURSOR_BATCH_SIZE", "500"))
+MAX_CURSOR_BATCH_SIZE = 10000
+
+
+def wants_ndjson(request: Request) -> bool:
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+async def ndjson_lines(cursor):
+    """
+    Escribe cada documento del cursor como una línea JSON conforme van llegando los lotes,
+    sin juntar todo el resultado en memoria
+    """
+    try:
+        async for document in cursor:
+            yield dumps(document) + b"\n"
+    finally:
+        await cursor.close()
+
+
+class CursorStreamingResponse(StreamingResponse):
+    """
+    Respuesta NDJSON dueña del cursor: lo cierra al terminar aunque el generador nunca
+    haya empezado (cliente desconectado antes del primer lote, error al enviar los headers),
+    caso en el que el finally de ndjson_lines no se ejecuta
+    """
+
+    def __init__(self, cursor, headers: dict = None):
+        self.cursor = cursor
+        super().__init__(ndjson_lines(cursor), media_type=NDJSON_MEDIA_TYPE, headers=headers)
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            await self.cursor.close()
@@ -0,0 +1,78 @@
+import hashlib
+from typing import Optional
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import Request, Response
+
+from utils.mongodb import get_async_collection
+from utils.response_cache import response_cache
+
+
+async def mark_workspace_changed(workspace_id: str):
+    """
+    Incrementa la versión del workspace. Se llama después de cada escritura
+    de listas o tareas para invalidar los ETag y la caché de respuestas de sus lecturas
+    """
+    await get_async_collection("workspaces").update_one(
+        {"_id": ObjectId(workspace_id)},
+        {"$inc": {"version": 1}}
+    )
+    await response_cache.invalidate(workspace_id)
+
+
+async def get_workspace_version(workspace_id: str) -> Optional[int]:
+    try:
+        workspace = await get_async_collection("workspaces").find_one(
+            {"_id": ObjectId(workspace_id)},
+            {"version": 1}
+        )
+    except InvalidId:
+        return None
+    if not workspace:
+        return None
+    return workspace.get("version", 0)
+
+
+def make_etag(workspace_id: str, version: int, variant: str = "") -> str:
+    """
+    ETag débil para una lectura del workspace. variant distingue las distintas
+    representaciones (query string, Accept) de la misma versión
+    """
+    digest = hashlib.sha1(variant.encode()).hexdigest()[:10]
+    return f'W/"{workspace_id}-{version}-{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    if "*" in candidates:
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.removeprefix("W/") == opaque for candidate in candidates)
+
+
+async def conditional_get(request: Request, workspace_id: str) -> tuple:
+    """
+    Calcula el ETag de la lectura actual con una consulta por _id.
+    Regresa (respuesta 304, etag, version) si el cliente ya tiene esa versión, o
+    (None, etag, version) para que la ruta ejecute la consulta normal; version se pasa
+    a cache_key. etag y version son None si el workspace no existe
+    """
+    version = await get_workspace_version(workspace_id)
+    if version is None:
+        return None, None, None
+
+    variant = f"{request.url.path}?{request.url.query}|{request.headers.get('accept', '')}"
+    etag = make_etag(workspace_id, version, variant)
+
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=etag_headers(etag)), etag, version
+    return None, etag, version
+
+
+def etag_headers(etag: Optional[str]) -> dict:
+    if not etag:
+        return {}
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
@@ -0,0 +1,129 @@
+"""
+Estado compartido entre los workers de server.py.
+
+Cada worker escribe cada WORKER_STATE_INTERVAL segundos su estado (ready, ping a la
+base y las series de métricas) en WORKER_STATE_DIR/<pid>.json. /ready y /metrics
+leen los archivos de los demás workers para responder por todo el contenedor, sin
+importar qué worker atiende el request.
+
+Sin WORKER_STATE_DIR (un solo proceso, uvicorn main:app) no se escribe nada.
+
+is_leader() elige un solo worker para las tareas de mantenimiento (índices y rebalanceo
+de ranks) con un flock sobre WORKER_STATE_DIR/leader.lock.
+"""
+import os
+import json
+import fcntl
+import time
+import asyncio
+import logging
+from typing import Optional
+
+from utils.metrics import export_state
+from utils.mongodb import t_connection_async
+
+logger = logging.getLogger(__name__)
+
+WORKER_STATE_DIR = os.getenv("WORKER_STATE_DIR")
+WORKER_STATE_INTERVAL = float(os.getenv("WORKER_STATE_INTERVAL", "5"))
+# Un archivo más viejo que esto es de un worker que murió sin limpiar
+_STALE_AFTER = WORKER_STATE_INTERVAL * 3
+
+_database_ok = False
+_leader_lock = None
+
+
+def _path(pid: int) -> str:
+    return os.path.join(WORKER_STATE_DIR, f"{pid}.json")
+
+
+def local_state() -> dict:
+    return {
+        "pid": os.getpid(),
+        "updated_at": time.time(),
+        "ready": _database_ok,
+        "metrics": export_state(),
+    }
+
+
+def _write_state():
+    path = _path(os.getpid())
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(local_state(), f)
+    os.replace(tmp, path)
+
+
+async def publish_loop(interval: float = WORKER_STATE_INTERVAL):
+    """Tarea de fondo del lifespan: hace ping a la base y publica el estado"""
+    global _database_ok
+    while True:
+        _database_ok = await t_connection_async()
+        if WORKER_STATE_DIR:
+            try:
+                _write_state()
+            except OSError as e:
+                logger.warning(f"Could not write worker state: {e}")
+        await asyncio.sleep(interval)
+
+
+def remove_state():
+    global _leader_lock
+    if _leader_lock is not None:
+        _leader_lock.close()
+        _leader_lock = None
+    if WORKER_STATE_DIR:
+        try:
+            os.remove(_path(os.getpid()))
+        except FileNotFoundError:
+            pass
+
+
+def is_leader() -> bool:
+    """
+    True solo en el worker que tiene el lock. El sistema libera el flock cuando ese
+    proceso muere, así que el siguiente worker que pregunte toma su lugar.
+    Sin WORKER_STATE_DIR el proceso es el único y siempre es líder
+    """
+    global _leader_lock
+    if not WORKER_STATE_DIR or _leader_lock is not None:
+        return True
+    lock = open(os.path.join(WORKER_STATE_DIR, "leader.lock"), "a")
+    try:
+        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock.close()
+        return False
+    _leader_lock = lock
+    return True
+
+
+def other_workers() -> list:
+    """Estados publicados por los demás workers vivos"""
+    if not WORKER_STATE_DIR:
+        return []
+    states, now, own = [], time.time(), f"{os.getpid()}.json"
+    for name in os.listdir(WORKER_STATE_DIR):
+        if not name.endswith(".json") or name == own:
+            continue
+        try:
+            with open(os.path.join(WORKER_STATE_DIR, name)) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if now - state.get("updated_at", 0) <= _STALE_AFTER:
+            states.append(state)
+    return states
+
+
+def readiness(database_ok: Optional[bool] = None) -> dict:
+    """
+    Ready si este worker y todos los demás tienen conexión a la base.
+    database_ok permite pasar un ping recién hecho por este worker
+    """
+    own = {"pid": os.getpid(), "ready": _database_ok if database_ok is None else database_ok}
+    workers = [own] + [{"pid": s["pid"], "ready": s["ready"]} for s in other_workers()]
+    return {
+        "ready": all(w["ready"] for w in workers),
+        "workers": sorted(workers, key=lambda w: w["pid"]),
+    }
@@ -0,0 +1,68 @@
+import os
+from contextvars import ContextVar
+from typing import Optional
+
+from bson import ObjectId
+
+from utils.cache import TTLCache, MISSING
+from utils.mongodb import get_async_collection
+
+# Dueño de cada workspace (None si el workspace no existe)
+_owner_cache = TTLCache(
+    maxsize=int(os.getenv("WORKSPACE_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("WORKSPACE_CACHE_TTL", "60")),
+)
+# Los workspaces inexistentes se recuerdan menos tiempo
+_MISSING_TTL = min(_owner_cache.ttl, 5)
+
+# Memo por request: un mismo request nunca consulta dos veces el mismo workspace
+_request_memo: ContextVar[Optional[dict]] = ContextVar("workspace_request_memo", default=None)
+
+
+def begin_request_scope():
+    return _request_memo.set({})
+
+
+def end_request_scope(token):
+    _request_memo.reset(token)
+
+
+async def get_workspace_owner(workspace_id: str, fresh: bool = False) -> Optional[str]:
+    """
+    Regresa el id_user dueño del workspace, o None si el workspace no existe.
+
+    La caché es de cada worker y delete_workspace solo la invalida en el suyo, así que
+    otro worker puede seguir viendo el workspace hasta WORKSPACE_CACHE_TTL. Las escrituras
+    usan fresh=True para consultar MongoDB y no crear listas o tareas en un workspace borrado
+    """
+    memo = _request_memo.get()
+    if not fresh and memo is not None and workspace_id in memo:
+        return memo[workspace_id]
+
+    owner = MISSING if fresh else _owner_cache.get(workspace_id)
+    if owner is MISSING:
+        workspace = await get_async_collection("workspaces").find_one(
+            {"_id": ObjectId(workspace_id)},
+            {"id_user": 1}
+        )
+        owner = str(workspace["id_user"]) if workspace else None
+        _owner_cache.set(workspace_id, owner, None if owner else _MISSING_TTL)
+
+    if memo is not None:
+        memo[workspace_id] = owner
+    return owner
+
+
+def prime_workspace_owner(workspace_id: str, owner: str):
+    _owner_cache.set(workspace_id, owner)
+
+
+def invalidate_workspace_owner(workspace_id: str):
+    _owner_cache.pop(workspace_id)
+    memo = _request_memo.get()
+    if memo is not None:
+        memo.pop(workspace_id, None)
+
+
+def workspace_cache_stats() -> dict:
+    return _owner_cache.stats()